@@ -0,0 +1 @@
+from .main import AdaptiveSampler
@@ -0,0 +1,99 @@
+from collections import deque
+from statistics import pstdev
+from time import monotonic
+from typing import Any, Deque, Dict, Optional
+
+
+class AdaptiveSampler:
+    """
+    Sampling interval following the activity of the profiled process.
+
+    The interval is halved, down to min_interval, while the process is busy changing:
+    a tag was just printed, its RSS moved or its CPU usage varies. It grows back, up to
+    max_interval, while the process is steady (e.g. sleeping).
+
+    The CPU usage of a single sample is quantized by the kernel clock ticks (10ms), so its
+    variability is measured on time-weighted averages over cpu_span seconds instead.
+    """
+
+    def __init__(self, min_interval: float = 0.005, max_interval: float = 0.5, initial_interval: float = 0.05, cpu_span: float = 0.1, window: int = 3, cpu_high: float = 10.0, cpu_low: float = 2.0, rss_change: float = 0.01, tag_hold: float = 0.5):
+        """
+        Initialize AdaptiveSampler.
+
+        Args:
+            min_interval (float): Shortest sampling interval in seconds. Defaults to 5ms.
+            max_interval (float): Longest sampling interval in seconds. Defaults to 500ms.
+            initial_interval (float): Interval of the first samples, within the bounds. Defaults to 50ms.
+            cpu_span (float): Seconds averaged into each CPU usage point. Defaults to 0.1.
+            window (int): Last CPU usage points whose deviation is measured. Defaults to 3.
+            cpu_high (float): Deviation of the CPU usage (percentage points) above which sampling speeds up. Defaults to 10.
+            cpu_low (float): Deviation of the CPU usage (percentage points) below which sampling slows down. Defaults to 2.
+            rss_change (float): Relative RSS change between two samples that speeds up sampling. Defaults to 1%.
+            tag_hold (float): Seconds sampling stays at min_interval after a tag. Defaults to 0.5.
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Intervals must satisfy 0 < min_interval <= max_interval")
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._interval = min(max(initial_interval, min_interval), max_interval)
+        self._cpu_span = cpu_span
+        self._cpu_high = cpu_high
+        self._cpu_low = cpu_low
+        self._rss_change = rss_change
+        self._tag_hold = tag_hold
+
+        self._cpu_points: Deque[float] = deque(maxlen=window)
+        self._span_usage = 0.0
+        self._span_time = 0.0
+        self._last_rss: Optional[float] = None
+        # Set from the output reader thread
+        self._last_tag: Optional[float] = None
+
+    @property
+    def interval(self) -> float:
+        """Current sampling interval in seconds."""
+        return self._interval
+
+    def notify_tag(self) -> None:
+        """
+        Signal that the program printed a tag. Thread safe.
+        """
+        self._last_tag = monotonic()
+
+    def _cpu_deviation(self, cpu_usage: float, sample_interval: float) -> Optional[float]:
+        """
+        Add a sample to the current CPU span and get the deviation of the last spans, None until there are two.
+        """
+        self._span_usage += cpu_usage * sample_interval
+        self._span_time += sample_interval
+        if self._span_time >= self._cpu_span:
+            self._cpu_points.append(self._span_usage / self._span_time)
+            self._span_usage, self._span_time = 0.0, 0.0
+        if len(self._cpu_points) < 2:
+            return None
+        return pstdev(self._cpu_points)
+
+    def next_interval(self, sample: Dict[str, Any], sample_interval: float) -> float:
+        """
+        Update the interval with a new sample.
+
+        Args:
+            sample (Dict[str, Any]): Raw stats of the sample by column.
+            sample_interval (float): Seconds covered by the sample.
+
+        Returns:
+            float: Seconds to wait before the next sample.
+        """
+        rss = float(sample["ram_usage"])
+        rss_moved = self._last_rss is not None and abs(rss - self._last_rss) > self._rss_change * max(self._last_rss, 1e-9)
+        self._last_rss = rss
+        cpu_deviation = self._cpu_deviation(cpu_usage=float(sample["cpu_usage"]), sample_interval=sample_interval)
+        tagged = self._last_tag is not None and monotonic() - self._last_tag < self._tag_hold
+
+        if tagged:
+            self._interval = self._min_interval
+        elif rss_moved or (cpu_deviation is not None and cpu_deviation >= self._cpu_high):
+            self._interval = max(self._min_interval, self._interval / 2)
+        elif cpu_deviation is not None and cpu_deviation <= self._cpu_low:
+            self._interval = min(self._max_interval, self._interval * 1.5)
+        return self._interval
@@ -1,4 +1,4 @@
-from .main import set_tag, set_output_filename
+from .main import add_tag_listener, measure, set_tag, set_output_filename, set_run_info
 
 def __getattr__(name):
     if name == "FileStats":
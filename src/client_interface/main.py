@@ -1,15 +1,53 @@
-from src.const import PREFIX_MEASURE_TAG, PREFIX_MEASURE_TAG_FILE_NAME
-from src.util import DatetimeHelper
+# Imported by the profiled programs: their startup and logging must not change with it, so this
+# module only imports builtin modules and src.const, and the rest lazily (json, functools)
+from __future__ import annotations
+
+from _thread import _local
+from itertools import count
+from time import clock_gettime_ns
+import os
+import sys
+
+from src.const import MEASURE_CLOCK, MEASURE_OCCURRENCE_SEPARATOR, MEASURE_PATH_SEPARATOR, PREFIX_MEASURE_TAG, PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO, PROFILER_ACTIVE_ENV_VAR
+
+# The annotations are not evaluated, typing is only imported by type checkers
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+# Checked once, so measure() costs nothing in programs run without the profiler
+_PROFILER_ACTIVE = bool(os.environ.get(PROFILER_ACTIVE_ENV_VAR))
+_START_PREFIX = f"{PREFIX_MEASURE_TAG}start_"
+_FINISH_PREFIX = f"{PREFIX_MEASURE_TAG}finish_"
+# Paths of the regions open in each thread, innermost last
+_open_regions = _local()
+# Occurrence counter of each region path
+_occurrences: Dict[str, Iterator[int]] = {}
+# Called with each tag and its timestamp (in-target agents following the windows)
+_tag_listeners: List[Callable[[str, int], None]] = []
+
+
+def add_tag_listener(listener: Callable[[str, int], None]) -> None:
+    """
+    Call a function with the name and timestamp (ns of the measure clock) of every tag the program prints.
+
+    Args:
+        listener (Callable[[str, int], None]): Function called in the thread printing the tag.
+    """
+    _tag_listeners.append(listener)
 
 
 def set_tag(tag_name: str) -> None:
     """
-    Print a tag with the current datetime in seconds since the epoch.
+    Print a tag with the current time of the measure clock in nanoseconds.
 
     Args:
         tag_name (str): The name of the tag.
     """
-    print(f"{PREFIX_MEASURE_TAG}{tag_name}: {DatetimeHelper.current_datetime(from_the_epoch=True)}")
+    timestamp = clock_gettime_ns(MEASURE_CLOCK)
+    print(f"{PREFIX_MEASURE_TAG}{tag_name}: {timestamp}")
+    for listener in _tag_listeners:
+        listener(tag_name, timestamp)
 
 def set_output_filename(filename: str) -> None:
     """
@@ -19,3 +57,113 @@ def set_output_filename(filename: str) -> None:
         tag_name (str): The name of the tag.
     """
     print(f"{PREFIX_MEASURE_TAG_FILE_NAME}: {filename}")
+
+def set_run_info(scenario: str, run_id: Optional[Any] = None, flavor: Optional[str] = None, **parameters: Any) -> None:
+    """
+    Print a tag describing the run, so the profiler can record it in the results catalog.
+
+    Args:
+        scenario (str): Name of the scenario being run.
+        run_id (Any, optional): Identifier of the run (repetition).
+        flavor (str, optional): Flavor of the runtime (e.g. gil, nogil).
+        **parameters (Any): Parameters of the scenario (e.g. num_workers=4). Must be JSON serializable.
+    """
+    import json
+
+    run_info = {"scenario": scenario, "run_id": None if run_id is None else str(run_id), "flavor": flavor, "parameters": parameters}
+    print(f"{PREFIX_MEASURE_TAG_RUN_INFO}: {json.dumps(run_info)}")
+
+
+class _Region:
+    """
+    Region of measure(): prints its start and finish tags around a block or each call of a function.
+    """
+
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __enter__(self) -> "_Region":
+        try:
+            stack = _open_regions.stack
+        except AttributeError:
+            stack = _open_regions.stack = []
+        prefix = f"{stack[-1]}{MEASURE_PATH_SEPARATOR}{self._name}" if stack else self._name
+        counter = _occurrences.get(prefix) or _occurrences.setdefault(prefix, count(1))
+        path = f"{prefix}{MEASURE_OCCURRENCE_SEPARATOR}{next(counter)}"
+        stack.append(path)
+        timestamp = clock_gettime_ns(MEASURE_CLOCK)
+        sys.stdout.write(f"{_START_PREFIX}{path}: {timestamp}\n")
+        if _tag_listeners:
+            for listener in _tag_listeners:
+                listener(f"start_{path}", timestamp)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        timestamp = clock_gettime_ns(MEASURE_CLOCK)
+        path = _open_regions.stack.pop()
+        # Closed even when the block raised, the exception goes on
+        sys.stdout.write(f"{_FINISH_PREFIX}{path}: {timestamp}\n")
+        if _tag_listeners:
+            for listener in _tag_listeners:
+                listener(f"finish_{path}", timestamp)
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        import functools
+
+        @functools.wraps(func)
+        def measured(*args: Any, **kwargs: Any) -> Any:
+            with self:
+                return func(*args, **kwargs)
+        return measured
+
+
+class _NullRegion:
+    """
+    Region of measure() without the profiler: does nothing and leaves the functions untouched.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullRegion":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        return func
+
+
+_NULL_REGION = _NullRegion()
+# Regions keep no state, one per name is reused by every with and call
+_regions: Dict[str, Union[_Region, _NullRegion]] = {}
+
+
+def measure(name: str) -> Union[_Region, _NullRegion]:
+    """
+    Measure a region of the program, as a context manager (with measure("load"): ...)
+    or a decorator (@measure("step")).
+
+    Each time the region is entered, it prints a start_<path> tag and, even if it raises,
+    the paired finish_<path> tag, timestamped with the measure clock. The path joins the regions
+    open in the thread and this one, each with its occurrence number (e.g. train#1/epoch#3),
+    so nested and repeated regions get their own windows (see FileStats.get_windows).
+
+    Without the profiler (the SYSTEM_PROFILER_ACTIVE environment variable it sets), nothing is
+    printed and decorated functions are returned as they are.
+
+    Args:
+        name (str): Name of the region. Must not contain "/", "#" or ":".
+
+    Returns:
+        Union[_Region, _NullRegion]: Context manager and decorator of the region.
+    """
+    region = _regions.get(name)
+    if region is None:
+        if not name or any(char in name for char in (MEASURE_PATH_SEPARATOR, MEASURE_OCCURRENCE_SEPARATOR, ":", "\n")):
+            raise ValueError(f"Invalid region name: {name!r}")
+        region = _regions[name] = _Region(name) if _PROFILER_ACTIVE else _NULL_REGION
+    return region
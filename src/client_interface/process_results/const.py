@@ -7,3 +7,11 @@ CSV_STATS_COL_NAME_VIRTUAL_MEMORY_USAGE = "virtual_memory_usage"
 CSV_STATS_COL_NAME_RAM_USAGE = "ram_usage"
 CSV_STATS_COL_NAME_SWAP_USAGE = "swap_usage"
 CSV_STATS_COL_NAME_ENERGY_CONSUMED = "energy_consumed"
+CSV_STATS_COL_NAME_THREADS = "threads"
+CSV_STATS_COL_NAME_THREADS_RUNNING = "threads_running"
+CSV_STATS_COL_NAME_THREADS_BLOCKED = "threads_blocked"
+CSV_STATS_COL_NAME_THREAD_CPU_TIME = "thread_cpu_time"
+CSV_STATS_COL_NAME_THREAD_WAIT_TIME = "thread_wait_time"
+CSV_STATS_COL_NAME_RAM_PEAK = "ram_peak"
+CSV_STATS_COL_NAME_VIRTUAL_MEMORY_PEAK = "virtual_memory_peak"
+CSV_STATS_COL_NAME_CGROUP_MEMORY_PEAK = "cgroup_memory_peak"
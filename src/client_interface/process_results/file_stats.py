@@ -1,33 +1,75 @@
-from typing import Dict, Optional, Tuple, List
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, List
+import json
+import os
 import re
 
 import numpy as np
 import pandas as pd
 
 from .const import *
+from src.const import ALLOCATIONS_FILE_NAME, ALLOCATIONS_SUFFIX, CLOCK_ANCHOR_FILE_NAME, CLOCK_ANCHOR_SUFFIX, EXIT_SUMMARY_FILE_NAME, EXIT_SUMMARY_SUFFIX, FUNCTIONS_FILE_NAME, FUNCTIONS_SUFFIX, GC_EVENTS_FILE_NAME, GC_EVENTS_SUFFIX, IMPORTS_FILE_NAME, IMPORTS_SUFFIX, MEASURE_OCCURRENCE_SEPARATOR, MEASURE_PATH_SEPARATOR, OFFCPU_FILE_NAME, OFFCPU_SUFFIX, SAMPLE_INTERVAL_COLUMN, SEGMENTS_INDEX_FILE_NAME
 
 
 class FileStats:
     """
     A class for analyzing a CSV file with results from
-    the profiler.
+    the profiler, or a time range of the segments of a continuous profile.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, start: Optional[float] = None, end: Optional[float] = None):
         """
         Initialize FileStats with the file path.
 
         Args:
-            file_path (str): The path to the CSV file.
+            file_path (str): The path to the CSV file, or to the folder of a continuous profile's segments.
+            start (float, optional): Only keep the rows from this uptime (seconds).
+            end (float, optional): Only keep the rows up to this uptime (seconds).
         """
         self._file_path = file_path
-        self._df_stats = pd.read_csv(file_path)
+        if os.path.isdir(file_path):
+            self._df_stats = FileStats.read_segments(directory=file_path, start=start, end=end)
+        else:
+            self._df_stats = pd.read_csv(file_path)
+        # Wall clock anchor of the run, missing for runs profiled before it was recorded
+        self._clock_anchor: Optional[Dict[str, Any]] = None
+        anchor_path = self._sidecar_path(suffix=CLOCK_ANCHOR_SUFFIX, file_name=CLOCK_ANCHOR_FILE_NAME)
+        if os.path.exists(anchor_path):
+            with open(anchor_path) as anchor_file:
+                self._clock_anchor = json.load(anchor_file)
+        if start is not None or end is not None:
+            uptime = self._df_stats[CSV_STATS_COL_NAME_UPTIME]
+            in_range = uptime.between(-np.inf if start is None else start, np.inf if end is None else end)
+            self._df_stats = self._df_stats[in_range].reset_index(drop=True)
         self._num_cores = FileStats.count_cores_in_dataframe(df=self._df_stats)
 
         # Extra attributes
         self._gini_max = (self._num_cores - 1) / self._num_cores
         self._core_columns = [CSV_STATS_COL_NAME_CORE_N_USAGE.format(core_idx=idx) for idx in range(0, self._num_cores)]
 
+    @staticmethod
+    def read_segments(directory: str, start: Optional[float] = None, end: Optional[float] = None) -> pd.DataFrame:
+        """
+        Read the segments of a continuous profile overlapping a time range, using their index.
+
+        Args:
+            directory (str): Folder of the segments.
+            start (float, optional): Start of the range (uptime in seconds). Defaults to the first segment.
+            end (float, optional): End of the range (uptime in seconds). Defaults to the last segment.
+
+        Returns:
+            pd.DataFrame: Rows of the selected segments, in time order.
+        """
+        df_index = pd.read_csv(os.path.join(directory, SEGMENTS_INDEX_FILE_NAME))
+        if start is not None:
+            df_index = df_index[df_index["end"] >= start]
+        if end is not None:
+            df_index = df_index[df_index["start"] <= end]
+        if df_index.empty:
+            raise ValueError(f"No segments of {directory} between {start} and {end}")
+        df_segments = [pd.read_csv(os.path.join(directory, segment)) for segment in df_index["segment"]]
+        return pd.concat(df_segments, ignore_index=True)
+
     @staticmethod
     def count_cores_in_dataframe(df: pd.DataFrame) -> int:
         """
@@ -46,6 +88,28 @@ class FileStats:
         num_cores = len(core_identifiers)
         return num_cores
 
+    def _sidecar_path(self, suffix: str, file_name: str) -> str:
+        """
+        Path of a file completing the stats: <name><suffix> next to the CSV, or file_name in the segments folder.
+        """
+        if os.path.isdir(self._file_path):
+            return os.path.join(self._file_path, file_name)
+        return f"{os.path.splitext(self._file_path)[0]}{suffix}"
+
+    def get_wall_time(self, uptime: float) -> Optional[datetime]:
+        """
+        Convert an uptime of the stats to the wall clock datetime it was measured at, for display.
+
+        Args:
+            uptime (float): Seconds since the creation of the process.
+
+        Returns:
+            Optional[datetime]: Local datetime of the uptime. None if the run has no clock anchor.
+        """
+        if self._clock_anchor is None:
+            return None
+        return datetime.fromtimestamp(self._clock_anchor["process_start_wall_time"] + uptime)
+
     def _find_label_indices(self, label: str) -> List[int]:
         """
         Find the indices of a specific label in the dataframe.
@@ -110,6 +174,259 @@ class FileStats:
                     time_diff[task_name] = dict_labels_times[finish_key] - dict_labels_times[key]
         return time_diff
 
+    def get_windows(self, start_label: str = "start_", finish_label: str = "finish_") -> pd.DataFrame:
+        """
+        Get the windows of the measured regions (measure()) as a hierarchy.
+
+        Args:
+            start_label (str): The starting label prefix. Defaults to "start_".
+            finish_label (str): The finishing label prefix. Defaults to "finish_".
+
+        Returns:
+            pd.DataFrame: One row per window, indexed by its path (e.g. "train#1/epoch#3"), with its
+            "name", "occurrence", "parent" path (None at the top level), "depth", "start", "finish"
+            and "duration" (NaN finish when it was never closed). Windows of plain tags have no occurrence.
+        """
+        dict_labels_times = self._df_stats.dropna(subset=[CSV_STATS_COL_NAME_LABEL]).set_index(CSV_STATS_COL_NAME_LABEL)[CSV_STATS_COL_NAME_UPTIME].to_dict()
+
+        windows = []
+        for key, start in dict_labels_times.items():
+            if not key.startswith(start_label):
+                continue
+            path = key[len(start_label):]
+            parent, _, last = path.rpartition(MEASURE_PATH_SEPARATOR)
+            name, _, occurrence = last.rpartition(MEASURE_OCCURRENCE_SEPARATOR)
+            finish = dict_labels_times.get(finish_label + path, np.nan)
+            windows.append({
+                "path": path,
+                "name": name if occurrence.isdigit() else last,
+                "occurrence": int(occurrence) if occurrence.isdigit() else None,
+                "parent": parent or None,
+                "depth": path.count(MEASURE_PATH_SEPARATOR),
+                "start": start,
+                "finish": finish,
+                "duration": finish - start,
+            })
+        columns = ["path", "name", "occurrence", "parent", "depth", "start", "finish", "duration"]
+        return pd.DataFrame(windows, columns=columns).sort_values("start").set_index("path")
+
+    def get_window_functions(self, window: str, top: int = 10, start_label: str = "start_", finish_label: str = "finish_") -> Optional[pd.DataFrame]:
+        """
+        Get the top functions of a window by inclusive time (profiled with --function_timing), joined with the stats of the window.
+
+        Args:
+            window (str): Task or measure() path of the window (e.g. "train#1/epoch#3").
+            top (int): Number of functions returned. Defaults to 10.
+            start_label (str): The starting label prefix. Defaults to "start_".
+            finish_label (str): The finishing label prefix. Defaults to "finish_".
+
+        Returns:
+            Optional[pd.DataFrame]: Functions with their "pid", "function", "file", "line", "calls" and "inclusive_time",
+            the "time_share" of the window duration, and the "window_duration", "window_energy" and "window_cpu_usage".
+            The energy of a function can be estimated as time_share * window_energy. None if the run has no function
+            timings or the window was not found.
+        """
+        functions_path = self._sidecar_path(suffix=FUNCTIONS_SUFFIX, file_name=FUNCTIONS_FILE_NAME)
+        df_window = self._get_df_between_labels(start_label=f"{start_label}{window}", finish_label=f"{finish_label}{window}")
+        if not os.path.exists(functions_path) or df_window is None:
+            return None
+        df_functions = pd.read_csv(functions_path)
+        df_functions = df_functions[df_functions["window"] == window].drop(columns="window")
+        df_functions = df_functions.sort_values("inclusive_time", ascending=False).head(top).reset_index(drop=True)
+
+        duration = df_window[CSV_STATS_COL_NAME_UPTIME].iloc[-1] - df_window[CSV_STATS_COL_NAME_UPTIME].iloc[0]
+        energy = df_window[CSV_STATS_COL_NAME_ENERGY_CONSUMED].iloc[-1] - df_window[CSV_STATS_COL_NAME_ENERGY_CONSUMED].iloc[0]
+        cpu_usage, _ = self._weighted_stats(df=df_window, column=CSV_STATS_COL_NAME_CPU_USAGE)
+        df_functions["time_share"] = df_functions["inclusive_time"] / duration if duration > 0 else np.nan
+        df_functions["window_duration"] = duration
+        df_functions["window_energy"] = energy
+        df_functions["window_cpu_usage"] = cpu_usage
+        return df_functions
+
+    def get_window_allocations(self, window: str, top: int = 10) -> Optional[pd.DataFrame]:
+        """
+        Get the top allocation sites of a window (profiled with --allocation_tracing).
+
+        Args:
+            window (str): Task or measure() path of the window (e.g. "copy_lists").
+            top (int): Number of sites returned. Defaults to 10.
+
+        Returns:
+            Optional[pd.DataFrame]: Sites by decreasing size difference, with their "pid", "file", "line",
+            "size_diff" and "count_diff" (bytes and blocks still allocated at the end of the window minus at
+            its start), and the "window_peak" and "window_traced" memory (bytes) of the window.
+            None if the run has no allocation tracing.
+        """
+        allocations_path = self._sidecar_path(suffix=ALLOCATIONS_SUFFIX, file_name=ALLOCATIONS_FILE_NAME)
+        if not os.path.exists(allocations_path):
+            return None
+        df_allocations = pd.read_csv(allocations_path)
+        df_allocations = df_allocations[df_allocations["window"] == window].drop(columns="window")
+        return df_allocations.sort_values("size_diff", ascending=False).head(top).reset_index(drop=True)
+
+    def get_window_gc(self, window: str, start_label: str = "start_", finish_label: str = "finish_") -> Optional[Dict[str, float]]:
+        """
+        Get the garbage collections of a window (profiled with --gc_tracing).
+
+        Args:
+            window (str): Task or measure() path of the window (e.g. "threads_objects").
+            start_label (str): The starting label prefix. Defaults to "start_".
+            finish_label (str): The finishing label prefix. Defaults to "finish_".
+
+        Returns:
+            Optional[Dict[str, float]]: The "collections" started in the window, by generation too ("generation_0"...),
+            their "collected" and "uncollectable" objects, the "gc_time" (pause seconds within the window, of every
+            process of the program) and its "time_share" of the window duration, and the "pause_p50", "pause_p95",
+            "pause_p99" and "pause_max" durations (s). None if the run has no GC tracing or the window was not found.
+        """
+        events_path = self._sidecar_path(suffix=GC_EVENTS_SUFFIX, file_name=GC_EVENTS_FILE_NAME)
+        df_window = self._get_df_between_labels(start_label=f"{start_label}{window}", finish_label=f"{finish_label}{window}")
+        if not os.path.exists(events_path) or df_window is None:
+            return None
+        start = df_window[CSV_STATS_COL_NAME_UPTIME].iloc[0]
+        finish = df_window[CSV_STATS_COL_NAME_UPTIME].iloc[-1]
+        df_events = pd.read_csv(events_path)
+        # Pauses overlapping the window only count for their part inside it
+        overlap = (np.minimum(df_events["start"] + df_events["duration"], finish) - np.maximum(df_events["start"], start)).clip(lower=0)
+        df_started = df_events[df_events["start"].between(start, finish)]
+        pauses = df_started["duration"]
+
+        gc_stats = {
+            "collections": len(df_started),
+            "collected": int(df_started["collected"].sum()),
+            "uncollectable": int(df_started["uncollectable"].sum()),
+            "gc_time": float(overlap.sum()),
+            "time_share": float(overlap.sum() / (finish - start)) if finish > start else np.nan,
+            "pause_p50": float(pauses.quantile(0.5)) if len(pauses) else np.nan,
+            "pause_p95": float(pauses.quantile(0.95)) if len(pauses) else np.nan,
+            "pause_p99": float(pauses.quantile(0.99)) if len(pauses) else np.nan,
+            "pause_max": float(pauses.max()) if len(pauses) else np.nan,
+        }
+        for generation, count in df_started["generation"].value_counts().sort_index().items():
+            gc_stats[f"generation_{generation}"] = int(count)
+        return gc_stats
+
+    def get_window_offcpu(self, window: str) -> Optional[pd.DataFrame]:
+        """
+        Get the off-CPU time of the threads in a window by wait reason (profiled with --offcpu_sampling).
+
+        Args:
+            window (str): Task or measure() path of the window (e.g. "threads_objects").
+
+        Returns:
+            Optional[pd.DataFrame]: One row per reason ("futex", "io", "sleep", "page_fault", ...), by decreasing
+            time, with the thread "samples" found waiting for it, their estimated "off_cpu_time" (thread seconds)
+            and its "share" of the off-CPU time of the window. None if the run has no off-CPU sampling.
+        """
+        offcpu_path = self._sidecar_path(suffix=OFFCPU_SUFFIX, file_name=OFFCPU_FILE_NAME)
+        if not os.path.exists(offcpu_path):
+            return None
+        df_offcpu = pd.read_csv(offcpu_path)
+        df_offcpu = df_offcpu[df_offcpu["window"] == window].drop(columns="window").set_index("reason")
+        df_offcpu["share"] = df_offcpu["off_cpu_time"] / df_offcpu["off_cpu_time"].sum()
+        return df_offcpu.sort_values("off_cpu_time", ascending=False)
+
+    def get_import_tree(self, max_depth: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Get the imports of the program (profiled with --profile_startup). Its startup is the "startup" tag window.
+
+        Args:
+            max_depth (int, optional): Only keep the imports up to this depth (0 for the top level). Defaults to all.
+
+        Returns:
+            Optional[pd.DataFrame]: Imports in tree order, with their "module", "parent" (empty at the top level), "depth",
+            "self_time" and "cumulative_time" (seconds, the cumulative time includes the imports it triggered) and
+            the uptime they "finished_at". None if the run has no import tree.
+        """
+        imports_path = self._sidecar_path(suffix=IMPORTS_SUFFIX, file_name=IMPORTS_FILE_NAME)
+        if not os.path.exists(imports_path):
+            return None
+        df_imports = pd.read_csv(imports_path)
+        if max_depth is not None:
+            df_imports = df_imports[df_imports["depth"] <= max_depth].reset_index(drop=True)
+        return df_imports
+
+    def get_run_totals(self) -> Dict[str, Any]:
+        """
+        Get the totals of the whole run, preferring the exit summary of the program (its exit time and
+        wait4 resource usage) to the samples, which miss what happened after the last one.
+
+        Returns:
+            Dict[str, Any]: The "duration" (seconds from the creation of the process to its exit), the "cpu_time",
+            "user_time" and "system_time" (seconds), the "peak_ram_usage" (GB, as ram_usage, the highest of the exit and sampled peaks), the "minor_faults",
+            "major_faults", "voluntary_switches" and "involuntary_switches", the "returncode" and the "source" of
+            the totals ("exit" or "samples"). The values the samples do not have are NaN (None for the returncode).
+        """
+        summary_path = self._sidecar_path(suffix=EXIT_SUMMARY_SUFFIX, file_name=EXIT_SUMMARY_FILE_NAME)
+        summary: Dict[str, Any] = {}
+        if os.path.exists(summary_path):
+            with open(summary_path) as summary_file:
+                summary = json.load(summary_file)
+
+        # Fallbacks from the samples
+        df_samples = self._df_stats
+        duration = float(df_samples[CSV_STATS_COL_NAME_UPTIME].max()) if not df_samples.empty else np.nan
+        cpu_time = np.nan
+        if CSV_STATS_COL_NAME_THREAD_CPU_TIME in df_samples.columns and df_samples[CSV_STATS_COL_NAME_THREAD_CPU_TIME].notna().any():
+            cpu_time = float(df_samples[CSV_STATS_COL_NAME_THREAD_CPU_TIME].max())
+        peak_ram_usage = float(df_samples[CSV_STATS_COL_NAME_RAM_USAGE].max()) if CSV_STATS_COL_NAME_RAM_USAGE in df_samples.columns else np.nan
+        if CSV_STATS_COL_NAME_RAM_PEAK in df_samples.columns:
+            peak_ram_usage = float(pd.Series([peak_ram_usage, df_samples[CSV_STATS_COL_NAME_RAM_PEAK].max()]).max())
+        totals = {
+            "duration": duration,
+            "cpu_time": cpu_time,
+            "user_time": np.nan,
+            "system_time": np.nan,
+            "peak_ram_usage": peak_ram_usage,
+            "minor_faults": np.nan,
+            "major_faults": np.nan,
+            "voluntary_switches": np.nan,
+            "involuntary_switches": np.nan,
+            "returncode": None,
+            "source": "samples",
+        }
+        if summary.get("exit_time") is not None:
+            totals["duration"] = summary["exit_time"]
+            totals["source"] = "exit"
+        if summary.get("user_time") is not None:
+            totals["cpu_time"] = summary["user_time"] + summary["system_time"]
+            # The resets of the peak RSS at the tags also reset the one of wait4
+            totals["peak_ram_usage"] = float(pd.Series([summary["max_rss"] / (1024 ** 3), peak_ram_usage]).max())
+            for key in ("user_time", "system_time", "minor_faults", "major_faults", "voluntary_switches", "involuntary_switches", "returncode"):
+                totals[key] = summary[key]
+        return totals
+
+    @staticmethod
+    def _weighted_stats(df: pd.DataFrame, column: str) -> Tuple[float, float]:
+        """
+        Compute the mean and standard deviation of a column, weighted by the sample intervals when available.
+
+        With adaptive sampling, a sample covers a variable amount of time, so plain means would
+        overweight the busy phases sampled at a high rate. The intervals are reliability weights:
+        the variance is corrected like the sample variance of pandas (ddof=1), which it equals
+        when all the intervals are the same.
+
+        Args:
+            df (pd.DataFrame): Rows to summarize.
+            column (str): Column to summarize.
+
+        Returns:
+            Tuple[float, float]: Mean and standard deviation of the column.
+        """
+        if SAMPLE_INTERVAL_COLUMN in df.columns:
+            values = df[column]
+            weights = df[SAMPLE_INTERVAL_COLUMN]
+            valid = values.notna() & weights.notna()
+            values, weights = values[valid].astype(float), weights[valid].astype(float)
+            total_weight = weights.sum()
+            if total_weight > 0:
+                mean = float(np.average(values, weights=weights))
+                # Reliability weights: sum(w) - sum(w^2) / sum(w) instead of n - 1, NaN for a single sample like pandas
+                denominator = total_weight - (weights ** 2).sum() / total_weight
+                variance = float((weights * (values - mean) ** 2).sum() / denominator) if denominator > 0 else np.nan
+                return mean, float(np.sqrt(variance))
+        return df[column].mean(), df[column].std()
+
     def get_average_between_labels(self, start_label: str, finish_label: str) -> Optional[Tuple[float, float, float, float]]:
         """
         Compute the average CPU usage and memory stats between two labels.
@@ -129,12 +446,54 @@ class FileStats:
         df_between_labels = self._get_df_between_labels(start_label=start_label, finish_label=finish_label)
 
         # Calculate the average CPU usage, virtual memory usage, RAM usage, and swap usage for the relevant rows
-        average_cpu_usage = df_between_labels[CSV_STATS_COL_NAME_CPU_USAGE].mean()
-        average_virtual_memory_usage = df_between_labels[CSV_STATS_COL_NAME_VIRTUAL_MEMORY_USAGE].mean()
-        average_ram_usage = df_between_labels[CSV_STATS_COL_NAME_RAM_USAGE].mean()
-        average_swap_usage = df_between_labels[CSV_STATS_COL_NAME_SWAP_USAGE].mean()
+        average_cpu_usage, _ = self._weighted_stats(df=df_between_labels, column=CSV_STATS_COL_NAME_CPU_USAGE)
+        average_virtual_memory_usage, _ = self._weighted_stats(df=df_between_labels, column=CSV_STATS_COL_NAME_VIRTUAL_MEMORY_USAGE)
+        average_ram_usage, _ = self._weighted_stats(df=df_between_labels, column=CSV_STATS_COL_NAME_RAM_USAGE)
+        average_swap_usage, _ = self._weighted_stats(df=df_between_labels, column=CSV_STATS_COL_NAME_SWAP_USAGE)
         return (average_cpu_usage, average_virtual_memory_usage, average_ram_usage, average_swap_usage)
 
+    def get_thread_contention(self, start_label: str, finish_label: str) -> Optional[Dict[str, float]]:
+        """
+        Compute how the threads of the process were scheduled between two labels: running, waiting
+        for a CPU or blocked (e.g. on the GIL, a lock or I/O).
+
+        Returns None if either of the labels was not found, or the thread stats were not collected (--thread_stats).
+
+        Args:
+            start_label (str): The starting label.
+            finish_label (str): The finishing label.
+
+        Returns:
+            Optional[Dict[str, float]]: The "cpu_time" and "run_queue_wait" (seconds the threads spent on a CPU and
+            runnable but waiting for one), the "wait_share" of the runnable time spent waiting, the "effective_parallelism"
+            (CPU seconds per second), the average "threads", and the average fractions of the threads found running
+            or runnable ("running_fraction") and blocked ("blocked_fraction") at the samples. The times are NaN if the
+            kernel has no schedstat.
+        """
+        df_between_labels = self._get_df_between_labels(start_label=start_label, finish_label=finish_label)
+        if df_between_labels is None or CSV_STATS_COL_NAME_THREADS not in df_between_labels.columns or df_between_labels[CSV_STATS_COL_NAME_THREADS].isna().all():
+            return None
+        duration = df_between_labels[CSV_STATS_COL_NAME_UPTIME].iloc[-1] - df_between_labels[CSV_STATS_COL_NAME_UPTIME].iloc[0]
+        cpu_time = df_between_labels[CSV_STATS_COL_NAME_THREAD_CPU_TIME].iloc[-1] - df_between_labels[CSV_STATS_COL_NAME_THREAD_CPU_TIME].iloc[0]
+        wait_time = df_between_labels[CSV_STATS_COL_NAME_THREAD_WAIT_TIME].iloc[-1] - df_between_labels[CSV_STATS_COL_NAME_THREAD_WAIT_TIME].iloc[0]
+
+        # Fractions of the threads at each sample, averaged over the window
+        df_threads = df_between_labels[df_between_labels[CSV_STATS_COL_NAME_THREADS] > 0].copy()
+        df_threads["running_fraction"] = df_threads[CSV_STATS_COL_NAME_THREADS_RUNNING] / df_threads[CSV_STATS_COL_NAME_THREADS]
+        df_threads["blocked_fraction"] = df_threads[CSV_STATS_COL_NAME_THREADS_BLOCKED] / df_threads[CSV_STATS_COL_NAME_THREADS]
+        threads, _ = self._weighted_stats(df=df_threads, column=CSV_STATS_COL_NAME_THREADS)
+        running_fraction, _ = self._weighted_stats(df=df_threads, column="running_fraction")
+        blocked_fraction, _ = self._weighted_stats(df=df_threads, column="blocked_fraction")
+        return {
+            "cpu_time": float(cpu_time),
+            "run_queue_wait": float(wait_time),
+            "wait_share": float(wait_time / (cpu_time + wait_time)) if cpu_time + wait_time > 0 else np.nan,
+            "effective_parallelism": float(cpu_time / duration) if duration > 0 else np.nan,
+            "threads": threads,
+            "running_fraction": running_fraction,
+            "blocked_fraction": blocked_fraction,
+        }
+
     def get_std_between_labels(self, start_label: str, finish_label: str) -> Optional[Tuple[float, float, float]]:
         """
         Compute the standard deviation of CPU usage and memory stats between two labels.
@@ -144,9 +503,9 @@ class FileStats:
         df_between_labels = self._get_df_between_labels(start_label=start_label, finish_label=finish_label)
         if df_between_labels is None or df_between_labels.empty:
             return None
-        std_cpu_usage = df_between_labels[CSV_STATS_COL_NAME_CPU_USAGE].std()
-        std_virtual_memory_usage = df_between_labels[CSV_STATS_COL_NAME_VIRTUAL_MEMORY_USAGE].std()
-        std_ram_usage = df_between_labels[CSV_STATS_COL_NAME_RAM_USAGE].std()
+        _, std_cpu_usage = self._weighted_stats(df=df_between_labels, column=CSV_STATS_COL_NAME_CPU_USAGE)
+        _, std_virtual_memory_usage = self._weighted_stats(df=df_between_labels, column=CSV_STATS_COL_NAME_VIRTUAL_MEMORY_USAGE)
+        _, std_ram_usage = self._weighted_stats(df=df_between_labels, column=CSV_STATS_COL_NAME_RAM_USAGE)
         return (std_cpu_usage, std_virtual_memory_usage, std_ram_usage)
 
     def get_column_std(self, column_name: str) -> float:
@@ -184,6 +543,48 @@ class FileStats:
         max_energy_consumed = df_between_labels[CSV_STATS_COL_NAME_ENERGY_CONSUMED].max()
         return (min_virtual_memory_usage, max_virtual_memory_usage, min_ram_usage, max_ram_usage, min_swap_usage, max_swap_usage, min_energy_consumed, max_energy_consumed)
 
+    def get_memory_peaks(self, start_label: str, finish_label: str) -> Optional[Dict[str, float]]:
+        """
+        Get the memory high-water marks the kernel kept during a window, which include the spikes between two samples.
+
+        The peaks of a sample cover the time since the last reset. With --memory_peak_reset, they are reset after
+        the sample each tag triggers: the window is covered by the samples after the one its start tag triggered,
+        up to the one its finish tag triggered, and its peaks are its own. Without resets (or when the kernel refuses
+        them), they are the peaks since the start of the process up to the end of the window.
+
+        Returns None if either of the labels was not found, or the stats have no memory peaks.
+
+        Args:
+            start_label (str): The starting label.
+            finish_label (str): The finishing label.
+
+        Returns:
+            Optional[Dict[str, float]]: The "ram_peak", "virtual_memory_peak" and "cgroup_memory_peak" (GB, NaN when the
+            process has no cgroup of its own) of the window, and the highest RAM usage of its samples ("sampled_ram_max").
+        """
+        df_between_labels = self._get_df_between_labels(start_label=start_label, finish_label=finish_label)
+        if df_between_labels is None or CSV_STATS_COL_NAME_RAM_PEAK not in df_between_labels.columns:
+            return None
+        start = self._df_stats.loc[self._find_label_indices(start_label)[0], CSV_STATS_COL_NAME_UPTIME]
+        finish = self._df_stats.loc[self._find_label_indices(finish_label)[0], CSV_STATS_COL_NAME_UPTIME]
+        df_samples = self._df_stats[self._df_stats[CSV_STATS_COL_NAME_LABEL].isna()].sort_values(CSV_STATS_COL_NAME_UPTIME)
+        uptime = df_samples[CSV_STATS_COL_NAME_UPTIME]
+        # The first sample from the start holds the peaks before its reset, the first one from the finish closes the window
+        after_start = df_samples[uptime >= start]
+        closing = after_start[after_start[CSV_STATS_COL_NAME_UPTIME] >= finish]
+        df_window = after_start.iloc[1:]
+        if not closing.empty:
+            df_window = df_window[df_window[CSV_STATS_COL_NAME_UPTIME] <= closing[CSV_STATS_COL_NAME_UPTIME].iloc[0]]
+        # Start and finish seen by the same sample
+        if df_window.empty:
+            df_window = after_start.iloc[:1]
+        return {
+            "ram_peak": float(df_window[CSV_STATS_COL_NAME_RAM_PEAK].max()),
+            "virtual_memory_peak": float(df_window[CSV_STATS_COL_NAME_VIRTUAL_MEMORY_PEAK].max()),
+            "cgroup_memory_peak": float(df_window[CSV_STATS_COL_NAME_CGROUP_MEMORY_PEAK].max()),
+            "sampled_ram_max": float(df_between_labels[CSV_STATS_COL_NAME_RAM_USAGE].max()),
+        }
+
     def track_dominant_core_changes_between_labels(self, start_label: str, finish_label: str) -> Tuple[int, float, float]:
         """
         Track changes in the dominant core between specific labels and calculate the total time with dominant cores.
@@ -1,16 +1,76 @@
-from .util import DatetimeHelper
+# Imported by the client interface in the profiled programs: only constants, no import beyond the builtins
+import time
 
 # Execution datetime
-DATETIME_EXECUTION = DatetimeHelper.current_datetime_string()
+DATETIME_EXECUTION = time.strftime("%Y%m%d_%H%M%S")
 
 # Folder paths
 RESULTS_FILE_FOLDER = "results"
 RESULTS_RAW_FILE_FOLDER = "raw"
 RESULTS_PREPROCESSED_FILE_FOLDER = "preprocessed"
-OUTPUT_FILE_PATH = f"{RESULTS_FILE_FOLDER}/{RESULTS_RAW_FILE_FOLDER}/{DATETIME_EXECUTION}_output.txt"
-STATS_FILE_PATH = f"{RESULTS_FILE_FOLDER}/{RESULTS_RAW_FILE_FOLDER}/{DATETIME_EXECUTION}_stats.csv"
-RESULTS_PREPROCESSED_FILE_PATH = f"{RESULTS_FILE_FOLDER}/{RESULTS_PREPROCESSED_FILE_FOLDER}/{DATETIME_EXECUTION}_stats.csv"
+# Templates keyed by the execution id (datetime of the run)
+OUTPUT_FILE_TEMPLATE = f"{RESULTS_FILE_FOLDER}/{RESULTS_RAW_FILE_FOLDER}/{{execution_id}}_output.txt"
+STATS_FILE_TEMPLATE = f"{RESULTS_FILE_FOLDER}/{RESULTS_RAW_FILE_FOLDER}/{{execution_id}}_stats.csv"
+RESULTS_PREPROCESSED_FILE_TEMPLATE = f"{RESULTS_FILE_FOLDER}/{RESULTS_PREPROCESSED_FILE_FOLDER}/{{execution_id}}_stats.csv"
+OUTPUT_FILE_PATH = OUTPUT_FILE_TEMPLATE.format(execution_id=DATETIME_EXECUTION)
+STATS_FILE_PATH = STATS_FILE_TEMPLATE.format(execution_id=DATETIME_EXECUTION)
+RESULTS_PREPROCESSED_FILE_PATH = RESULTS_PREPROCESSED_FILE_TEMPLATE.format(execution_id=DATETIME_EXECUTION)
+CATALOG_FILE_PATH = f"{RESULTS_FILE_FOLDER}/catalog.sqlite"
 
 # Measure tag prefix
 PREFIX_MEASURE_TAG = "measure_label-"
 PREFIX_MEASURE_TAG_FILE_NAME = f"{PREFIX_MEASURE_TAG}filename"
+PREFIX_MEASURE_TAG_RUN_INFO = f"{PREFIX_MEASURE_TAG}run_info"
+# Regions of measure(): start_<path>/finish_<path> tags, the path joining the enclosing
+# regions and the region, each numbered by occurrence (e.g. start_train#1/epoch#3)
+MEASURE_PATH_SEPARATOR = "/"
+MEASURE_OCCURRENCE_SEPARATOR = "#"
+# Set in the environment of the profiled programs, measure() is a no-op without it
+PROFILER_ACTIVE_ENV_VAR = "SYSTEM_PROFILER_ACTIVE"
+# Clock of the samples and tags: it never jumps with NTP steps, and CLOCK_BOOTTIME
+# (Linux) also counts suspends, like the start times of the processes in /proc
+MEASURE_CLOCK = getattr(time, "CLOCK_BOOTTIME", time.CLOCK_MONOTONIC)
+MEASURE_CLOCK_NAME = "CLOCK_BOOTTIME" if hasattr(time, "CLOCK_BOOTTIME") else "CLOCK_MONOTONIC"
+
+# Continuous profiles: a folder of cleaned segments described by an index
+SEGMENTS_FOLDER_TEMPLATE = f"{RESULTS_FILE_FOLDER}/{RESULTS_PREPROCESSED_FILE_FOLDER}/{{execution_id}}_segments"
+SEGMENTS_INDEX_FILE_NAME = "index.csv"
+SEGMENTS_INDEX_COLUMNS = ["segment", "start", "end", "rows", "bytes", "resolution"]
+
+# Column added to the stats with the seconds covered by each sample
+SAMPLE_INTERVAL_COLUMN = "sample_interval"
+
+# Wall clock anchor of a run, next to its cleaned CSV (<name>_clock.json) or in its segments folder
+CLOCK_ANCHOR_SUFFIX = "_clock.json"
+CLOCK_ANCHOR_FILE_NAME = "clock.json"
+
+# In-target agents: configuration (JSON) given to the program, and their files
+AGENTS_ENV_VAR = "SYSTEM_PROFILER_AGENTS"
+# Kernel name (comm, 15 characters at most) of the agent threads, which the thread samplers skip
+AGENT_THREAD_NAME = "system-profiler"
+AGENT_FOLDER_TEMPLATE = f"{RESULTS_FILE_FOLDER}/{RESULTS_RAW_FILE_FOLDER}/{{execution_id}}_agent"
+# Collapsed stacks per window, next to the cleaned CSV (<name>_stacks.txt) or in the segments folder
+STACKS_SUFFIX = "_stacks.txt"
+STACKS_FILE_NAME = "stacks.txt"
+# Top functions by inclusive time per window, next to the cleaned CSV or in the segments folder
+FUNCTIONS_SUFFIX = "_functions.csv"
+FUNCTIONS_FILE_NAME = "functions.csv"
+# Allocation sites per window, next to the cleaned CSV or in the segments folder
+ALLOCATIONS_SUFFIX = "_allocations.csv"
+ALLOCATIONS_FILE_NAME = "allocations.csv"
+# Garbage collection events on the uptime timeline, next to the cleaned CSV or in the segments folder
+GC_EVENTS_SUFFIX = "_gc.csv"
+GC_EVENTS_FILE_NAME = "gc.csv"
+# Cumulative garbage collection pause time (s) of the cleaned stats
+GC_COLUMN = "gc_time"
+# Off-CPU samples of the threads, and their histograms by reason per window next to the cleaned CSV or in the segments folder
+OFFCPU_FILE_TEMPLATE = f"{RESULTS_FILE_FOLDER}/{RESULTS_RAW_FILE_FOLDER}/{{execution_id}}_offcpu.csv"
+OFFCPU_SUFFIX = "_offcpu.csv"
+OFFCPU_FILE_NAME = "offcpu.csv"
+# Standard error of a program profiled with its startup, and its import tree next to the cleaned CSV
+STDERR_FILE_TEMPLATE = f"{RESULTS_FILE_FOLDER}/{RESULTS_RAW_FILE_FOLDER}/{{execution_id}}_stderr.txt"
+IMPORTS_SUFFIX = "_imports.csv"
+IMPORTS_FILE_NAME = "imports.csv"
+# Exit time and resource usage (wait4) of the program, next to the cleaned CSV or in the segments folder
+EXIT_SUMMARY_SUFFIX = "_exit.json"
+EXIT_SUMMARY_FILE_NAME = "exit.json"
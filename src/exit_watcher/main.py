@@ -0,0 +1,137 @@
+from typing import Any, Callable, Dict, Optional
+import json
+import os
+import select
+import threading
+
+import psutil
+
+from src.util import DatetimeHelper, logger
+
+# Resource usage of a reaped child, in the exit summary
+RUSAGE_KEYS = ["returncode", "user_time", "system_time", "max_rss", "minor_faults", "major_faults", "voluntary_switches", "involuntary_switches"]
+
+
+class ExitWatcher(threading.Thread):
+    """
+    A class waiting for the exit of the profiled process, to timestamp it and collect its resource usage.
+
+    The exit is seen through a pidfd (Linux 5.3+), which becomes readable as soon as the process
+    is a zombie, without reaping it: its /proc entries stay readable until the sampling loop
+    finished. Without pidfd, a child is waited for with waitid(WNOWAIT) and another process with psutil.
+
+    A child launched by the profiler is then reaped with wait4, which returns its resource
+    usage: the CPU time and peak RSS of the whole run, including what the last sample missed.
+    """
+
+    def __init__(self, pid: int, child: bool, on_exit: Optional[Callable[[], None]] = None):
+        """
+        Initialize ExitWatcher.
+
+        Args:
+            pid (int): PID of the process to watch.
+            child (bool): Whether the process is a child of the profiler, which can be reaped with wait4.
+            on_exit (Callable[[], None], optional): Called from the watcher once the process exited.
+        """
+        super().__init__(name="system-profiler-exit", daemon=True)
+        self._pid = pid
+        self._child = child
+        self._on_exit = on_exit
+        self._exited = threading.Event()
+        self._exit_ns: Optional[int] = None
+        self._pidfd: Optional[int] = None
+        try:
+            # Opened right away, so the PID cannot be reused before the watcher runs
+            self._pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            pass
+        self._exit_source = "pidfd" if self._pidfd is not None else "waitid" if child else "psutil"
+
+    @property
+    def exited(self) -> bool:
+        """Whether the process exited."""
+        return self._exited.is_set()
+
+    @property
+    def exit_ns(self) -> Optional[int]:
+        """Time the process exited at, in nanoseconds of the measure clock (None while it runs)."""
+        return self._exit_ns
+
+    def run(self) -> None:
+        try:
+            if self._pidfd is not None:
+                poller = select.poll()
+                poller.register(self._pidfd, select.POLLIN)
+                poller.poll()
+            elif self._child:
+                os.waitid(os.P_PID, self._pid, os.WEXITED | os.WNOWAIT)
+            else:
+                psutil.Process(self._pid).wait()
+        except (OSError, psutil.Error):
+            pass
+        self._exit_ns = DatetimeHelper.clock_ns()
+        self._exited.set()
+        if self._on_exit is not None:
+            self._on_exit()
+
+    def reap(self) -> Optional[Dict[str, Any]]:
+        """
+        Reap the exited child with wait4 and get its exit status and resource usage.
+
+        Must be called once the process exited, before anything else waits for it (e.g. Popen.wait).
+
+        Returns:
+            Optional[Dict[str, Any]]: "returncode", CPU times "user_time" and "system_time" (s), "max_rss" (bytes),
+            "minor_faults", "major_faults", "voluntary_switches" and "involuntary_switches".
+            None if the process is not a child or was already reaped.
+        """
+        if not self._child:
+            return None
+        try:
+            _, status, rusage = os.wait4(self._pid, 0)
+        except ChildProcessError:
+            logger.warning(f"PID {self._pid} was already reaped, its resource usage is not available.")
+            return None
+        finally:
+            self._close()
+        return {
+            "returncode": os.waitstatus_to_exitcode(status),
+            "user_time": rusage.ru_utime,
+            "system_time": rusage.ru_stime,
+            # Kilobytes on Linux
+            "max_rss": rusage.ru_maxrss * 1024,
+            "minor_faults": rusage.ru_minflt,
+            "major_faults": rusage.ru_majflt,
+            "voluntary_switches": rusage.ru_nvcsw,
+            "involuntary_switches": rusage.ru_nivcsw,
+        }
+
+    def _close(self) -> None:
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+
+    def write_summary(self, file_path: str, process_start_ns: int, rusage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Write the exit summary of the run to a JSON file.
+
+        Args:
+            file_path (str): Path of the JSON file.
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+            rusage (Dict[str, Any], optional): Exit status and resource usage returned by reap.
+
+        Returns:
+            Dict[str, Any]: The summary: "pid", "exit_ns", its uptime "exit_time" (s since the creation of the process),
+            "exit_source" ("pidfd", "waitid" or "psutil") and the rusage values (None when not reaped).
+        """
+        self._close()
+        summary: Dict[str, Any] = {
+            "pid": self._pid,
+            "exit_ns": self._exit_ns,
+            "exit_time": (self._exit_ns - process_start_ns) / 1e9 if self._exit_ns is not None else None,
+            "exit_source": self._exit_source,
+        }
+        summary.update(rusage or dict.fromkeys(RUSAGE_KEYS))
+        with open(file_path, "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+        return summary
@@ -1,71 +1,118 @@
-from time import sleep
 import argparse
 import logging
+import signal
 
-from .const import OUTPUT_FILE_PATH, RESULTS_PREPROCESSED_FILE_PATH, STATS_FILE_PATH
-from .stats_cleaner import StatsCleaner
-from .system_stats_collector import SystemStatsCollector
-from .util import FileWriterCsv, FileWriterTxt, logger, run_python_process, run_c_process
+from .const import CATALOG_FILE_PATH
+from .adaptive_sampler import AdaptiveSampler
+from .profile_session import ProfileSession
+from .stats_segments import RetentionPolicy, TriggerConditions
+from .util import logger, parse_cpu_list
 
 
 # ------- Parse terminal arguments
 parser = argparse.ArgumentParser(description="Measure the performance of a given program.")
-parser.add_argument("--file_to_run", required=True, help="Path to the file or module to run.")
+target_group = parser.add_mutually_exclusive_group(required=True)
+target_group.add_argument("--file_to_run", help="Path to the file or module to run.")
+target_group.add_argument("--pid", type=int, help="PID of a running process to attach to (e.g. a long-running service).")
 parser.add_argument("--language", choices=["python", "c"], default="python", help="Type of target: python (script/module) or native executable.")
 parser.add_argument("--is_module", action="store_true", help="Flag indicating whether the provided input is a module (only for --language python).")
+parser.add_argument("--python", default="python3", help="Interpreter used to run python targets.")
 parser.add_argument("--script_args", nargs=argparse.REMAINDER, default=[], help="Optional arguments for the program to run")
 parser.add_argument("--log_collect_time", action="store_true", help="Enable debug logs for the time spent collecting stats each sample.")
+parser.add_argument("--catalog", default=CATALOG_FILE_PATH, help="Path to the SQLite results catalog the run is registered in.")
+parser.add_argument("--target_cpus", type=parse_cpu_list, help="CPUs the program is pinned to (e.g. 2-7).")
+parser.add_argument("--profiler_cpus", type=parse_cpu_list, help="CPUs the profiler is pinned to (e.g. 0-1).")
+parser.add_argument("--duration", type=float, help="With --pid, stop profiling after this many seconds. Defaults to until the process exits or Ctrl+C.")
+parser.add_argument("--program_output", help="With --pid, file the process writes its stdout to, read for its measure tags and run info.")
+parser.add_argument("--segment_duration", type=float, help="Continuous mode: write the stats in segments of this many seconds.")
+parser.add_argument("--segment_size", type=int, help="Continuous mode: write the stats in segments of this many bytes of raw samples.")
+parser.add_argument("--full_resolution", type=float, help="Continuous mode: downsample the segments older than this many seconds.")
+parser.add_argument("--downsample_factor", type=int, default=10, help="Continuous mode: samples merged into one when downsampling.")
+parser.add_argument("--max_age", type=float, help="Continuous mode: drop the segments older than this many seconds.")
+parser.add_argument("--max_bytes", type=int, help="Continuous mode: drop the oldest segments beyond this disk budget.")
+parser.add_argument("--trigger_rss", type=float, help="Triggered mode: capture when the RSS of the process exceeds this many GB.")
+parser.add_argument("--trigger_cpu", type=float, help="Triggered mode: capture when the CPU usage of the process exceeds this percentage...")
+parser.add_argument("--trigger_cpu_samples", type=int, default=1, help="...for this many consecutive samples.")
+parser.add_argument("--trigger_tags", nargs="+", default=[], help="Triggered mode: capture when the program prints one of these tags (e.g. start_flush).")
+parser.add_argument("--trigger_signal", action="store_true", help="Triggered mode: capture when the profiler receives SIGUSR1.")
+parser.add_argument("--pre_trigger", type=float, default=10.0, help="Triggered mode: seconds kept before a trigger.")
+parser.add_argument("--post_trigger", type=float, default=10.0, help="Triggered mode: seconds recorded after the last trigger.")
+parser.add_argument("--max_capture", type=float, default=60.0, help="Triggered mode: seconds a capture holds at most; a trigger that keeps firing goes on in the next capture.")
+parser.add_argument("--adaptive_sampling", action="store_true", help="Sample faster while the program is busy changing or prints tags, slower while it is steady.")
+parser.add_argument("--min_interval", type=float, default=0.005, help="With --adaptive_sampling, shortest sampling interval in seconds.")
+parser.add_argument("--max_interval", type=float, default=0.5, help="With --adaptive_sampling, longest sampling interval in seconds.")
+parser.add_argument("--stack_sampling", action="store_true", help="Sample the Python stacks of the program with an in-target agent, aggregated per tag window.")
+parser.add_argument("--stack_interval", type=float, default=0.01, help="With --stack_sampling, seconds between stack samples.")
+parser.add_argument("--stack_max_overhead", type=float, default=0.02, help="With --stack_sampling, share of the program time the sampling may take before it slows down.")
+parser.add_argument("--function_timing", action="store_true", help="Time the Python functions run inside the tag windows with sys.monitoring (Python 3.12+ programs).")
+parser.add_argument("--function_top", type=int, default=50, help="With --function_timing, functions kept per window by inclusive time.")
+parser.add_argument("--allocation_tracing", action="store_true", help="Attribute the memory allocations of the program to the tag windows with tracemalloc.")
+parser.add_argument("--allocation_top", type=int, default=20, help="With --allocation_tracing, allocation sites kept per window.")
+parser.add_argument("--gc_tracing", action="store_true", help="Record the garbage collections of the program (generation, pause, collected objects) with an in-target agent.")
+parser.add_argument("--offcpu_sampling", action="store_true", help="Sample why the threads of the program are off the CPU (futex, I/O, sleep, page fault) from /proc, per tag window.")
+parser.add_argument("--offcpu_interval", type=float, default=0.1, help="With --offcpu_sampling, seconds between off-CPU samples.")
+parser.add_argument("--profile_startup", action="store_true", help="Run the python program with -X importtime: save its import tree and report its startup as a \"startup\" tag window.")
+parser.add_argument("--thread_stats", action="store_true", help="Scan the threads of the program at every sample: threads running and blocked, on-CPU and run-queue time.")
+parser.add_argument("--memory_peak_reset", action="store_true", help="Reset the memory high-water marks (peak RSS, cgroup memory.peak) of the program at each of its tags, so each window gets its own peak.")
 args = parser.parse_args()
+if args.pid is None and (args.duration is not None or args.program_output is not None):
+    parser.error("--duration and --program_output require --pid")
+if args.pid is not None and args.target_cpus:
+    parser.error("--target_cpus cannot be used with --pid")
+if (args.stack_sampling or args.function_timing or args.allocation_tracing or args.gc_tracing) and (args.pid is not None or args.language != "python"):
+    parser.error("--stack_sampling, --function_timing, --allocation_tracing and --gc_tracing require a python program launched by the profiler")
+triggered = args.trigger_rss is not None or args.trigger_cpu is not None or bool(args.trigger_tags) or args.trigger_signal
+if triggered and (args.segment_duration is not None or args.segment_size is not None):
+    parser.error("The triggered mode cannot be combined with --segment_duration or --segment_size")
+continuous = args.segment_duration is not None or args.segment_size is not None or triggered
+if args.profile_startup and (args.pid is not None or args.language != "python" or continuous):
+    parser.error("--profile_startup requires a python program launched by the profiler, outside of the continuous and triggered modes")
+if args.memory_peak_reset and args.pid is not None and (args.program_output is None or not continuous):
+    parser.error("--memory_peak_reset with --pid requires --program_output and the continuous or triggered mode")
+if not continuous and (args.full_resolution is not None or args.max_age is not None or args.max_bytes is not None):
+    parser.error("--full_resolution, --max_age and --max_bytes require the continuous or triggered mode")
 
 # Adjust log level if timing logs are requested
 if args.log_collect_time:
     logger.setLevel(logging.DEBUG)
 
-# ------- Pre-run process
-values_to_measure = SystemStatsCollector.get_values_to_measure()
-file_stats = FileWriterCsv(file_path=STATS_FILE_PATH)
-file_stats.set_columns(columns=values_to_measure)
-
-
-# ------- Start process and collect stats
-# Run the process and get PID
-if args.language == "python":
-    process = run_python_process(file_or_module=args.file_to_run, is_module=args.is_module, args=args.script_args)
-elif args.language == "c":
-    process = run_c_process(executable_path=args.file_to_run, args=args.script_args)
-else:
-    logger.error(f"Unsupported language: {args.language}")
-    exit()
-
-pid = process.pid
-logger.info(f"PID of the command: {pid}")
-
-# Measure subprocess resources usage
-profiler_measurer = SystemStatsCollector(pid=pid)
-process_creation_time = profiler_measurer.get_process_create_time()
-logger.info(f"Starting the profiling...")
-while process.poll() is None:
-    # Collect stats
-    stats_collected = profiler_measurer.collect_stats(log_timer=args.log_collect_time)
-    # Append new stats if they were successfully collected
-    if stats_collected is not None:
-        file_stats.append_row(row_data=stats_collected)
-        logger.debug(f"New records were successfully written.")
-    # Sampling time of 50ms
-    sleep(0.05)
-
-# ------- Post-run process
-# Write profiling results file
-file_stats.write_to_csv()
-logger.info(f"Profiling results saved to: {STATS_FILE_PATH}")
-
-# Get and write the output of the subprocess once it finishes
-output, _ = process.communicate()
-FileWriterTxt.write_text_to_file(file_path=OUTPUT_FILE_PATH, text=output.decode())
-logger.info(f"Output saved to: {OUTPUT_FILE_PATH}")
-
-# Assign labels to the stats
-logger.info("Processing raw stats file...")
-stats_cleaner = StatsCleaner(stats_file=STATS_FILE_PATH, program_output_file=OUTPUT_FILE_PATH)
-stats_cleaner.run(output_csv_path=RESULTS_PREPROCESSED_FILE_PATH, process_creation_time=process_creation_time)
-logger.info("Raw stats file processed successfully.")
+# ------- Profile the program
+session = ProfileSession(
+    file_to_run=args.file_to_run,
+    language=args.language,
+    is_module=args.is_module,
+    script_args=args.script_args,
+    python_executable=args.python,
+    catalog_path=args.catalog,
+    log_collect_time=args.log_collect_time,
+    target_cpus=args.target_cpus,
+    profiler_cpus=args.profiler_cpus,
+    pid=args.pid,
+    duration=args.duration,
+    program_output=args.program_output,
+    segment_duration=args.segment_duration,
+    segment_size=args.segment_size,
+    retention=RetentionPolicy(full_resolution=args.full_resolution, downsample_factor=args.downsample_factor, max_age=args.max_age, max_bytes=args.max_bytes) if continuous else None,
+    trigger=TriggerConditions(rss_above=args.trigger_rss, cpu_above=args.trigger_cpu, cpu_samples=args.trigger_cpu_samples, tags=args.trigger_tags) if triggered else None,
+    pre_trigger=args.pre_trigger,
+    post_trigger=args.post_trigger,
+    max_capture=args.max_capture,
+    sampler=AdaptiveSampler(min_interval=args.min_interval, max_interval=args.max_interval) if args.adaptive_sampling else None,
+    stack_interval=args.stack_interval if args.stack_sampling else None,
+    stack_max_overhead=args.stack_max_overhead,
+    function_timing=args.function_timing,
+    function_top=args.function_top,
+    allocation_tracing=args.allocation_tracing,
+    allocation_top=args.allocation_top,
+    gc_tracing=args.gc_tracing,
+    offcpu_interval=args.offcpu_interval if args.offcpu_sampling else None,
+    profile_startup=args.profile_startup,
+    memory_peak_reset=args.memory_peak_reset,
+    thread_stats=args.thread_stats,
+)
+if args.trigger_signal:
+    signal.signal(signal.SIGUSR1, lambda signum, frame: session.fire_trigger(reason="SIGUSR1"))
+# An attached process keeps running: Ctrl+C only ends the profiling
+if args.pid is not None:
+    signal.signal(signal.SIGINT, lambda signum, frame: session.stop())
+session.run()
@@ -0,0 +1 @@
+from .main import OffCpuSampler, classify_wait, offcpu_histograms
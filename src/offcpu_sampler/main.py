@@ -0,0 +1,222 @@
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+import csv
+import os
+import platform
+import threading
+
+from src.const import AGENT_THREAD_NAME
+from src.target_agent import read_windows
+from src.util import DatetimeHelper, logger
+
+# Columns of the raw samples: one row per thread found off the CPU
+OFFCPU_SAMPLE_COLUMNS = ["timestamp", "interval", "tid", "state", "reason", "detail"]
+# Columns of the per-window histograms
+OFFCPU_HISTOGRAM_COLUMNS = ["window", "reason", "samples", "off_cpu_time"]
+
+# Wait reasons of the blocking syscalls, by number of each architecture
+SYSCALL_REASONS = {
+    "x86_64": {
+        202: ("futex", "futex"),
+        35: ("nanosleep", "sleep"), 230: ("clock_nanosleep", "sleep"),
+        0: ("read", "io"), 1: ("write", "io"), 17: ("pread64", "io"), 18: ("pwrite64", "io"), 19: ("readv", "io"), 20: ("writev", "io"),
+        7: ("poll", "io"), 23: ("select", "io"), 232: ("epoll_wait", "io"), 270: ("pselect6", "io"), 271: ("ppoll", "io"), 281: ("epoll_pwait", "io"),
+        43: ("accept", "io"), 42: ("connect", "io"), 44: ("sendto", "io"), 45: ("recvfrom", "io"), 46: ("sendmsg", "io"), 47: ("recvmsg", "io"), 288: ("accept4", "io"),
+        74: ("fsync", "io"), 75: ("fdatasync", "io"),
+        61: ("wait4", "child"), 247: ("waitid", "child"),
+    },
+    "aarch64": {
+        98: ("futex", "futex"),
+        101: ("nanosleep", "sleep"), 115: ("clock_nanosleep", "sleep"),
+        63: ("read", "io"), 64: ("write", "io"), 67: ("pread64", "io"), 68: ("pwrite64", "io"), 65: ("readv", "io"), 66: ("writev", "io"),
+        72: ("pselect6", "io"), 73: ("ppoll", "io"), 22: ("epoll_pwait", "io"),
+        202: ("accept", "io"), 203: ("connect", "io"), 206: ("sendto", "io"), 207: ("recvfrom", "io"), 211: ("sendmsg", "io"), 212: ("recvmsg", "io"), 242: ("accept4", "io"),
+        82: ("fsync", "io"), 83: ("fdatasync", "io"),
+        260: ("wait4", "child"), 95: ("waitid", "child"),
+    },
+}
+# Wait reasons of the kernel functions a thread sleeps in (wchan), by keyword
+WCHAN_REASONS = (
+    ("futex", "futex"),
+    ("nanosleep", "sleep"),
+    ("folio", "page_fault"), ("page", "page_fault"), ("fault", "page_fault"), ("swap", "page_fault"),
+    ("pipe", "io"), ("poll", "io"), ("select", "io"), ("sk_wait", "io"), ("sock", "io"), ("tcp", "io"), ("unix", "io"),
+    ("wait_woken", "io"), ("io_schedule", "io"), ("read", "io"), ("write", "io"), ("jbd2", "io"), ("blk", "io"),
+    ("mutex", "lock"), ("rwsem", "lock"),
+    ("do_wait", "child"),
+)
+# Off-CPU states of /proc/<pid>/task/<tid>/stat without a better reason
+STATE_REASONS = {"D": "io", "T": "stopped", "t": "stopped"}
+
+
+def classify_wait(state: str, wchan: Optional[str], syscall: Optional[str]) -> Tuple[str, str]:
+    """
+    Classify why a thread is off the CPU.
+
+    The syscall it is blocked in is the most precise source, then the kernel function it sleeps
+    in, then its state alone.
+
+    Args:
+        state (str): State letter of the thread (e.g. "S" sleeping, "D" uninterruptible).
+        wchan (str, optional): Content of its wchan file, None if not readable.
+        syscall (str, optional): Content of its syscall file, None if not readable.
+
+    Returns:
+        Tuple[str, str]: The reason ("futex", "io", "sleep", "page_fault", "lock" (kernel lock), "child",
+        "stopped" or "other") and the syscall or kernel function it was found in.
+    """
+    syscall_name = None
+    if syscall:
+        number = syscall.split(maxsplit=1)[0]
+        # Blocked outside of a syscall: in the kernel on behalf of the program, e.g. a page fault
+        if number == "-1" and state == "D":
+            return "page_fault", "no syscall"
+        if number.isdigit():
+            syscall_name, reason = SYSCALL_REASONS.get(platform.machine(), {}).get(int(number), (f"syscall {number}", None))
+            if reason is not None:
+                return reason, syscall_name
+    # "0" when the kernel hides its symbols
+    if wchan and wchan != "0":
+        for keyword, reason in WCHAN_REASONS:
+            if keyword in wchan:
+                return reason, wchan
+        return STATE_REASONS.get(state, "other"), wchan
+    return STATE_REASONS.get(state, "other"), syscall_name or state
+
+
+class OffCpuSampler(threading.Thread):
+    """
+    A class sampling, at a low rate, why the threads of a process are off the CPU.
+
+    Every interval, the threads found sleeping or blocked are classified from their
+    /proc/<pid>/task/<tid>/syscall and wchan files (see classify_wait) and written to a CSV,
+    each standing for the seconds since the previous sample. Reading syscall requires ptrace
+    access to the process and wchan may be hidden by the kernel: the sampler then falls back
+    on the sources left, down to the thread state. The agent threads of the profiler in the
+    program are skipped.
+    """
+
+    def __init__(self, pid: int, output_path: str, interval: float = 0.1):
+        """
+        Initialize OffCpuSampler.
+
+        Args:
+            pid (int): Process ID (PID) of the process to sample.
+            output_path (str): Path of the CSV the samples are written to.
+            interval (float): Seconds between samples. Defaults to 100ms.
+        """
+        super().__init__(name="system-profiler-offcpu", daemon=True)
+        self._task_folder = f"/proc/{pid}/task"
+        self._output_path = output_path
+        self._interval = interval
+        self._stop_event = threading.Event()
+        # Sources found restricted are not read again
+        self._sources = {"wchan": True, "syscall": True}
+        self._samples = 0
+
+    @staticmethod
+    def _read(path: str) -> str:
+        """
+        Read a /proc file of a thread, raising OSError if it exited.
+        """
+        with open(path) as proc_file:
+            return proc_file.read().strip()
+
+    def _read_source(self, tid_folder: str, source: str) -> Optional[str]:
+        """
+        Read the wchan or syscall file of a thread, None if it exited or the file is restricted.
+        """
+        if not self._sources[source]:
+            return None
+        try:
+            return self._read(os.path.join(tid_folder, source))
+        except PermissionError:
+            self._sources[source] = False
+            logger.warning(f"/proc/<pid>/task/<tid>/{source} is not readable, the off-CPU reasons are classified without it.")
+        except OSError:
+            pass
+        return None
+
+    def _sample(self, writer: csv.writer, timestamp: int, interval: float) -> bool:
+        """
+        Write the threads found off the CPU. False if the process is gone.
+        """
+        try:
+            tids = os.listdir(self._task_folder)
+        except OSError:
+            return False
+        for tid in tids:
+            tid_folder = os.path.join(self._task_folder, tid)
+            try:
+                # The thread name may contain spaces, the fields start after its closing parenthesis
+                name, fields = self._read(os.path.join(tid_folder, "stat")).split(" (", 1)[1].rsplit(")", 1)
+                state = fields.split()[0]
+            except (OSError, IndexError, ValueError):
+                continue
+            # The agent threads of the profiler in the program
+            if name.startswith(AGENT_THREAD_NAME):
+                continue
+            # Running or runnable, and zombies
+            if state in ("R", "Z", "X"):
+                continue
+            syscall = self._read_source(tid_folder=tid_folder, source="syscall")
+            wchan = self._read_source(tid_folder=tid_folder, source="wchan")
+            reason, detail = classify_wait(state=state, wchan=wchan, syscall=syscall)
+            writer.writerow([timestamp, interval, tid, state, reason, detail])
+        self._samples += 1
+        return True
+
+    def run(self) -> None:
+        with open(self._output_path, "w", newline="") as output_file:
+            writer = csv.writer(output_file)
+            writer.writerow(OFFCPU_SAMPLE_COLUMNS)
+            previous_timestamp = None
+            while not self._stop_event.wait(self._interval):
+                timestamp = DatetimeHelper.clock_ns()
+                interval = (timestamp - previous_timestamp) / 1e9 if previous_timestamp is not None else self._interval
+                previous_timestamp = timestamp
+                if not self._sample(writer=writer, timestamp=timestamp, interval=interval):
+                    break
+
+    def stop(self) -> None:
+        """
+        Stop sampling and close the samples file.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        logger.info(f"Off-CPU sampling: {self._samples} samples every {self._interval * 1000:.0f}ms, saved to: {self._output_path}")
+
+
+def offcpu_histograms(samples_path: str, program_output_file: str, output_path: str) -> int:
+    """
+    Aggregate the off-CPU samples into a histogram of off-CPU time by reason per window.
+
+    A sample counts in every window it falls in (so a region also counts in its parents).
+
+    Args:
+        samples_path (str): Path of the samples written by OffCpuSampler.
+        program_output_file (str): Path to the program output with the tags.
+        output_path (str): Path of the histograms CSV.
+
+    Returns:
+        int: Number of rows written.
+    """
+    windows = read_windows(program_output_file=program_output_file)
+    histograms: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, 0.0])
+    with open(samples_path, newline="") as samples_file:
+        for sample in csv.DictReader(samples_file):
+            timestamp = int(sample["timestamp"])
+            for task, start, finish in windows:
+                if start > timestamp:
+                    break
+                if finish is None or timestamp <= finish:
+                    counts = histograms[(task, sample["reason"])]
+                    counts[0] += 1
+                    counts[1] += float(sample["interval"])
+    with open(output_path, "w", newline="") as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(OFFCPU_HISTOGRAM_COLUMNS)
+        for (task, reason), (samples, off_cpu_time) in sorted(histograms.items()):
+            writer.writerow([task, reason, samples, off_cpu_time])
+    return len(histograms)
@@ -0,0 +1,668 @@
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import os
+import subprocess
+import threading
+
+import psutil
+
+from src.adaptive_sampler import AdaptiveSampler
+from src.const import AGENT_FOLDER_TEMPLATE, ALLOCATIONS_FILE_NAME, ALLOCATIONS_SUFFIX, CATALOG_FILE_PATH, EXIT_SUMMARY_FILE_NAME, EXIT_SUMMARY_SUFFIX, FUNCTIONS_FILE_NAME, FUNCTIONS_SUFFIX, GC_EVENTS_FILE_NAME, IMPORTS_FILE_NAME, IMPORTS_SUFFIX, OFFCPU_FILE_NAME, OFFCPU_FILE_TEMPLATE, OFFCPU_SUFFIX, OUTPUT_FILE_TEMPLATE, PREFIX_MEASURE_TAG, PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO, PROFILER_ACTIVE_ENV_VAR, RESULTS_PREPROCESSED_FILE_TEMPLATE, SAMPLE_INTERVAL_COLUMN, SEGMENTS_FOLDER_TEMPLATE, STACKS_FILE_NAME, STACKS_SUFFIX, STATS_FILE_TEMPLATE, STDERR_FILE_TEMPLATE
+from src.exit_watcher import ExitWatcher
+from src.offcpu_sampler import OffCpuSampler, offcpu_histograms
+from src.results_catalog import ResultsCatalog
+from src.stats_cleaner import StatsCleaner
+from src.startup_profiler import STARTUP_TASK, StartupProfiler
+from src.stats_segments import RetentionPolicy, SegmentedStatsWriter, TriggerConditions, TriggeredStatsWriter
+from src.system_stats_collector import SystemStatsCollector
+from src.target_agent import AllocationTracer, FunctionTimer, GcRecorder, StackSampler, agent_environment, collapse_stacks, merge_agent_tables, read_agent_summaries
+from src.util import DatetimeHelper, FileWriterCsv, FileWriterTxt, logger, run_c_process, run_python_process
+
+# Sampling time of 50ms
+SAMPLING_INTERVAL = 0.05
+
+
+class ProfileSession:
+    """
+    A single profiling run: launch the program (or attach to a running process),
+    sample it until it exits, clean the collected stats and register the run in
+    the results catalog.
+
+    Each session gets its own execution id, so several sessions can run in the same process.
+    """
+
+    def __init__(self, file_to_run: Optional[str] = None, language: str = "python", is_module: bool = False, script_args: Optional[List[str]] = None, python_executable: str = "python3", catalog_path: Optional[str] = CATALOG_FILE_PATH, log_collect_time: bool = False, target_cpus: Optional[Sequence[int]] = None, profiler_cpus: Optional[Sequence[int]] = None, pid: Optional[int] = None, duration: Optional[float] = None, program_output: Optional[str] = None, segment_duration: Optional[float] = None, segment_size: Optional[int] = None, retention: Optional[RetentionPolicy] = None, trigger: Optional[TriggerConditions] = None, pre_trigger: float = 10.0, post_trigger: float = 10.0, max_capture: float = 60.0, sampler: Optional[AdaptiveSampler] = None, stack_interval: Optional[float] = None, stack_max_overhead: float = 0.02, function_timing: bool = False, function_top: int = 50, allocation_tracing: bool = False, allocation_top: int = 20, gc_tracing: bool = False, offcpu_interval: Optional[float] = None, profile_startup: bool = False, memory_peak_reset: bool = False, thread_stats: bool = False):
+        """
+        Initialize ProfileSession with the program to profile.
+
+        Args:
+            file_to_run (str, optional): Path to the file or module to run. Required unless pid is given.
+            language (str): Type of target: "python" (script/module) or "c" (native executable). Defaults to "python".
+            is_module (bool): Whether the provided input is a module (only for python). Defaults to False.
+            script_args (List[str], optional): Arguments for the program to run.
+            python_executable (str): Interpreter used for python targets. Defaults to "python3".
+            catalog_path (str, optional): Results catalog the run is registered in. None disables the registration.
+            log_collect_time (bool): Log the time spent collecting stats each sample. Defaults to False.
+            target_cpus (Sequence[int], optional): CPUs the program is pinned to. Defaults to no pinning.
+            profiler_cpus (Sequence[int], optional): CPUs the profiler (this process) is pinned to. Defaults to no pinning.
+            pid (int, optional): PID of a running process to attach to instead of launching file_to_run.
+            duration (float, optional): Stop sampling an attached process after this many seconds. Defaults to until it exits or stop is called.
+            program_output (str, optional): File the attached process writes its stdout to, read for its measure tags and run info.
+            segment_duration (float, optional): Continuous mode: write the stats in segments of this many seconds.
+            segment_size (int, optional): Continuous mode: write the stats in segments of this many bytes of raw samples.
+            retention (RetentionPolicy, optional): Continuous mode: which old segments are downsampled or dropped. Defaults to keeping them all.
+            trigger (TriggerConditions, optional): Triggered mode: only write captures around the moments these conditions are met.
+            pre_trigger (float): Triggered mode: seconds kept before a trigger. Defaults to 10.
+            post_trigger (float): Triggered mode: seconds recorded after the last trigger. Defaults to 10.
+            max_capture (float): Triggered mode: seconds a capture holds at most, a longer one goes on in the next capture. Defaults to 60.
+            sampler (AdaptiveSampler, optional): Adapts the sampling interval to the activity of the program. Defaults to a fixed 50ms.
+            stack_interval (float, optional): Sample the Python stacks of the program every this many seconds, with an in-target agent. Defaults to no stack sampling.
+            stack_max_overhead (float): Share of the program time the stack sampling may take. Defaults to 2%.
+            function_timing (bool): Time the Python functions run inside the tag windows with sys.monitoring (Python 3.12+). Defaults to False.
+            function_top (int): Functions kept per window by the function timing. Defaults to 50.
+            allocation_tracing (bool): Attribute the memory allocations of the program to the tag windows with tracemalloc. Defaults to False.
+            allocation_top (int): Allocation sites kept per window by the allocation tracing. Defaults to 20.
+            gc_tracing (bool): Record the garbage collections of the program (generation, pause, collected objects) with gc.callbacks. Defaults to False.
+            offcpu_interval (float, optional): Sample why the threads of the program are off the CPU every this many seconds. Defaults to no off-CPU sampling.
+            profile_startup (bool): Run the program with -X importtime, save its import tree and add a "startup" window from its creation to
+                the last import before its first tag. Defaults to False.
+            memory_peak_reset (bool): Reset the memory high-water marks of the program at each of its tags, so the peaks of
+                the samples that follow only cover the current window. Defaults to False (peaks since the start).
+            thread_stats (bool): Scan the threads of the program at every sample (threads running, blocked, on-CPU and
+                run-queue time). Defaults to False (thread columns left empty).
+        """
+        if language not in ("python", "c"):
+            raise ValueError(f"Unsupported language: {language}")
+        if (file_to_run is None) == (pid is None):
+            raise ValueError("Either a file to run or a PID to attach to must be given")
+        if pid is None and (duration is not None or program_output is not None):
+            raise ValueError("duration and program_output only apply when attaching to a PID")
+        # Re-pinning a process we did not start would outlive the session
+        if pid is not None and target_cpus:
+            raise ValueError("target_cpus cannot be used when attaching to a PID")
+        # The agents are injected when the interpreter starts
+        if (stack_interval is not None or function_timing or allocation_tracing or gc_tracing) and (pid is not None or language != "python"):
+            raise ValueError("The in-target agents (stack sampling, function timing, allocation tracing, GC tracing) require a python program launched by the profiler")
+        # The imports are timed by the interpreter, and the window is added to the output once the program exited
+        if profile_startup and (pid is not None or language != "python" or segment_duration is not None or segment_size is not None or trigger is not None):
+            raise ValueError("Startup profiling requires a python program launched by the profiler and profiled to one CSV")
+        # The tags must be read while profiling
+        if memory_peak_reset and pid is not None and (program_output is None or (segment_duration is None and segment_size is None and trigger is None)):
+            raise ValueError("Resetting the memory peaks at the tags of an attached process requires its program_output and a continuous profile")
+        self._file_to_run = file_to_run
+        self._language = language
+        self._is_module = is_module
+        self._script_args = list(script_args or [])
+        self._python_executable = python_executable
+        self._catalog_path = catalog_path
+        self._log_collect_time = log_collect_time
+        self._target_cpus = sorted(target_cpus) if target_cpus else None
+        self._profiler_cpus = sorted(profiler_cpus) if profiler_cpus else None
+        # CPUs the launched program is pinned to, set when the run starts
+        self._launch_cpus: Optional[List[int]] = self._target_cpus
+        self._pid = pid
+        self._duration = duration
+        self._program_output = program_output
+        self._attached: Optional[psutil.Process] = psutil.Process(pid) if pid is not None else None
+        self._stop_event = threading.Event()
+        # Cuts the wait for the next sample short (stop, exit, tag in adaptive mode)
+        self._wake_event = threading.Event()
+        self._segment_duration = segment_duration
+        self._segment_size = segment_size
+        self._retention = retention
+        self._trigger = trigger
+        self._pre_trigger = pre_trigger
+        self._post_trigger = post_trigger
+        self._max_capture = max_capture
+        self._segments_writer: Optional[SegmentedStatsWriter] = None
+        self._sampler = sampler
+        self._stack_interval = stack_interval
+        self._stack_max_overhead = stack_max_overhead
+        self._function_timing = function_timing
+        self._function_top = function_top
+        self._allocation_tracing = allocation_tracing
+        self._allocation_top = allocation_top
+        self._gc_tracing = gc_tracing
+        self._offcpu_interval = offcpu_interval
+        self._profile_startup = profile_startup
+        self._startup_profiler: Optional[StartupProfiler] = None
+        self._memory_peak_reset = memory_peak_reset
+        self._thread_stats = thread_stats
+        # Set by a tag, the memory peaks are reset after the next sample
+        self._reset_peaks_event = threading.Event()
+        if self._target_cpus and self._profiler_cpus and set(self._target_cpus) & set(self._profiler_cpus):
+            logger.warning(f"Target CPUs {self._target_cpus} and profiler CPUs {self._profiler_cpus} overlap.")
+
+        self._execution_id = self._new_execution_id()
+        # A continuous profile only keeps its cleaned segments
+        self._stats_path = SEGMENTS_FOLDER_TEMPLATE.format(execution_id=self._execution_id) if self.continuous else STATS_FILE_TEMPLATE.format(execution_id=self._execution_id)
+        self._output_path = OUTPUT_FILE_TEMPLATE.format(execution_id=self._execution_id)
+        self._agent_path = AGENT_FOLDER_TEMPLATE.format(execution_id=self._execution_id)
+        self._offcpu_path = OFFCPU_FILE_TEMPLATE.format(execution_id=self._execution_id)
+        self._stderr_path = STDERR_FILE_TEMPLATE.format(execution_id=self._execution_id)
+        # Set after run
+        self._preprocessed_path: Optional[str] = None
+        self._run_info: Optional[Dict[str, Any]] = None
+        self._returncode: Optional[int] = None
+        self._process_start_ns: Optional[int] = None
+        # Wall clock reading matched with the measure clock, to display the run times
+        self._clock_anchor: Optional[Dict[str, Any]] = None
+        self._placement: Dict[str, Optional[List[int]]] = {}
+
+    @staticmethod
+    def _new_execution_id() -> str:
+        # Datetime of the run, suffixed when another run already started in the same second
+        execution_id = DatetimeHelper.current_datetime_string()
+        candidate, suffix = execution_id, 0
+        while os.path.exists(STATS_FILE_TEMPLATE.format(execution_id=candidate)) or os.path.exists(SEGMENTS_FOLDER_TEMPLATE.format(execution_id=candidate)):
+            suffix += 1
+            candidate = f"{execution_id}_{suffix}"
+        return candidate
+
+    @property
+    def continuous(self) -> bool:
+        """Whether the stats are written in segments (or triggered captures) as they are collected."""
+        return self._segment_duration is not None or self._segment_size is not None or self._trigger is not None
+
+    @property
+    def stats_path(self) -> str:
+        """Path of the raw stats CSV (folder of the segments in continuous mode)."""
+        return self._stats_path
+
+    @property
+    def output_path(self) -> str:
+        """Path of the captured program output."""
+        return self._output_path
+
+    @property
+    def preprocessed_path(self) -> Optional[str]:
+        """Path of the preprocessed stats CSV (folder of the segments in continuous mode), available after run."""
+        return self._preprocessed_path
+
+    @property
+    def run_info(self) -> Dict[str, Any]:
+        """Run description printed by the program (empty if it did not describe itself)."""
+        return self._run_info or {}
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """Exit code of the program, available after run (None when attached)."""
+        return self._returncode
+
+    @property
+    def placement(self) -> Dict[str, Optional[List[int]]]:
+        """CPUs the program ("target_cpus") and the profiler ("profiler_cpus") ran on, available after run."""
+        return dict(self._placement)
+
+    @property
+    def program_name(self) -> str:
+        """Name of the file or module run (process name when attached), used as scenario when the program does not describe itself."""
+        if self._attached is not None:
+            return self._attached.name()
+        if self._language == "python" and self._is_module:
+            return self._file_to_run.split(".")[-1]
+        return os.path.splitext(os.path.basename(self._file_to_run))[0]
+
+    def _start_process(self) -> subprocess.Popen:
+        """
+        Launch the program to profile.
+        """
+        if self._language == "python":
+            stderr = None
+            if self._profile_startup:
+                self._startup_profiler = StartupProfiler(stderr_path=self._stderr_path)
+                stderr = self._startup_profiler.stderr_fd
+            process = run_python_process(file_or_module=self._file_to_run, is_module=self._is_module, args=self._script_args, python_executable=self._python_executable, cpus=self._launch_cpus, unbuffered=self.continuous or self._sampler is not None or self._memory_peak_reset, env=self._environment(), import_time=self._profile_startup, stderr=stderr)
+            if self._startup_profiler is not None:
+                self._startup_profiler.start()
+            return process
+        return run_c_process(executable_path=self._file_to_run, args=self._script_args, cpus=self._launch_cpus, env=self._environment())
+
+    def _agents(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Options of the in-target agents to start in the program, by name.
+        """
+        agents: Dict[str, Dict[str, Any]] = {}
+        if self._stack_interval is not None:
+            agents[StackSampler.NAME] = {"interval": self._stack_interval, "max_overhead": self._stack_max_overhead}
+        if self._function_timing:
+            agents[FunctionTimer.NAME] = {"top": self._function_top}
+        if self._allocation_tracing:
+            agents[AllocationTracer.NAME] = {"top": self._allocation_top}
+        if self._gc_tracing:
+            agents[GcRecorder.NAME] = {}
+        return agents
+
+    def _environment(self) -> Dict[str, str]:
+        """
+        Variables added to the environment of the program: tells the client interface it is profiled, and starts the agents.
+        """
+        env = {PROFILER_ACTIVE_ENV_VAR: "1"}
+        if self._agents():
+            env.update(agent_environment(directory=self._agent_path, agents=self._agents()))
+        return env
+
+    def _sidecar_path(self, suffix: str, file_name: str) -> str:
+        """
+        Path of a file completing the preprocessed stats: <name><suffix> next to the CSV, or file_name in the segments folder.
+        """
+        if self.continuous:
+            return os.path.join(self._preprocessed_path, file_name)
+        return f"{os.path.splitext(self._preprocessed_path)[0]}{suffix}"
+
+    def _collapse_stacks(self, pid: int) -> None:
+        """
+        Aggregate the stacks sampled by the agent per window, next to the preprocessed stats.
+        """
+        stacks_path = self._sidecar_path(suffix=STACKS_SUFFIX, file_name=STACKS_FILE_NAME)
+        samples = collapse_stacks(directory=self._agent_path, program_output_file=self._output_path, output_path=stacks_path, main_pid=pid)
+        for summary in read_agent_summaries(directory=self._agent_path, agent=StackSampler.NAME):
+            logger.info(f"Stack sampling of PID {summary['pid']}: {summary['samples']} samples every {summary['interval'] * 1000:.1f}ms, overhead {summary['overhead']:.2%}.")
+        logger.info(f"Collapsed stacks ({samples} samples) saved to: {stacks_path}")
+
+    @staticmethod
+    def _affinity(pid: int) -> Optional[List[int]]:
+        # The process may already be gone
+        try:
+            return sorted(os.sched_getaffinity(pid))
+        except OSError:
+            return None
+
+    def stop(self) -> None:
+        """
+        Stop sampling at the next sample, e.g. from a SIGINT handler. The collected stats are still processed.
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def fire_trigger(self, reason: str = "manual") -> None:
+        """
+        Start a capture in triggered mode, e.g. from a signal handler.
+        """
+        if isinstance(self._segments_writer, TriggeredStatsWriter):
+            self._segments_writer.fire(reason)
+
+    @staticmethod
+    def _columns() -> List[str]:
+        """
+        Columns of the raw stats: the collected values and the seconds covered by each sample.
+        """
+        return SystemStatsCollector.get_values_to_measure() + [SAMPLE_INTERVAL_COLUMN]
+
+    def _collect(self, pid: int, is_running: Callable[[], bool], file_stats: FileWriterCsv) -> None:
+        """
+        Sample the process until it exits, the duration is reached or the session is stopped.
+        """
+        profiler_measurer = SystemStatsCollector(pid=pid, thread_stats=self._thread_stats)
+        deadline = monotonic() + self._duration if self._duration is not None else None
+        columns = SystemStatsCollector.get_values_to_measure()
+        interval = self._sampler.interval if self._sampler is not None else SAMPLING_INTERVAL
+        previous_timestamp: Optional[int] = None
+        logger.info(f"Starting the profiling...")
+        # A process that exited at once is still sampled: its /proc stays readable until it is reaped
+        sampled = False
+        while (not sampled or is_running()) and not self._stop_event.is_set():
+            sampled = True
+            if deadline is not None and monotonic() >= deadline:
+                logger.info(f"Profiling duration of {self._duration}s reached.")
+                break
+            # Collect stats
+            stats_collected = profiler_measurer.collect_stats(log_timer=self._log_collect_time)
+            # Append new stats if they were successfully collected
+            if stats_collected is not None:
+                # Seconds since the previous sample, so the analysis can weight samples taken at different rates
+                sample_interval = (stats_collected[0] - previous_timestamp) / 1e9 if previous_timestamp is not None else interval
+                previous_timestamp = stats_collected[0]
+                file_stats.append_row(row_data=stats_collected + [sample_interval])
+                logger.debug(f"New records were successfully written.")
+                if self._sampler is not None:
+                    interval = self._sampler.next_interval(sample=dict(zip(columns, stats_collected)), sample_interval=sample_interval)
+            # The sample closed the peaks of the previous window
+            if self._reset_peaks_event.is_set():
+                self._reset_peaks_event.clear()
+                profiler_measurer.reset_memory_peaks()
+            # Woken up early by stop, by the exit of the process or by a tag
+            self._wake_event.wait(interval)
+            self._wake_event.clear()
+        profiler_measurer.close()
+
+    @staticmethod
+    def _is_attached_tag(line: str, since: int) -> bool:
+        """
+        Whether an output line of an attached process is a measure tag printed after the profiling started (or its run info).
+        """
+        if not line.startswith(PREFIX_MEASURE_TAG):
+            return False
+        if line.startswith((PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO)):
+            return True
+        try:
+            return int(line.strip().rsplit(": ", 1)[1]) >= since
+        except (IndexError, ValueError):
+            return False
+
+    def _attached_output(self, since: int) -> str:
+        """
+        Extract the measure tags and run info the attached process wrote to its output file while it was profiled.
+
+        Args:
+            since (int): Time (ns of the measure clock) the profiling started at. Earlier tags are dropped.
+
+        Returns:
+            str: Program output as the cleaning expects it.
+        """
+        if self._program_output is None:
+            return ""
+        lines = []
+        with open(self._program_output, errors="replace") as output_file:
+            for line in output_file:
+                if self._is_attached_tag(line=line, since=since):
+                    lines.append(line if line.endswith("\n") else f"{line}\n")
+        return "".join(lines)
+
+    def _notify_output(self, line: str) -> None:
+        """
+        Let the adaptive sampler and the memory peaks know about the tags of the program.
+        """
+        if not line.startswith(PREFIX_MEASURE_TAG):
+            return
+        if self._sampler is not None:
+            self._sampler.notify_tag()
+        if self._memory_peak_reset:
+            self._reset_peaks_event.set()
+        if self._sampler is not None or self._memory_peak_reset:
+            # Sample the start of the tagged phase right away
+            self._wake_event.set()
+
+    def _read_output(self, process: subprocess.Popen, lines: List[str]) -> None:
+        """
+        Read the output of the program while it runs, to react to its tags.
+        """
+        for raw_line in iter(process.stdout.readline, b""):
+            line = raw_line.decode(errors="replace")
+            lines.append(line)
+            self._notify_output(line)
+
+    def _drain_output(self, process: subprocess.Popen, segments: SegmentedStatsWriter) -> None:
+        """
+        Stream the output of the program to the output file, handing its tags to the segments as they are printed.
+        """
+        os.makedirs(os.path.dirname(self._output_path), exist_ok=True)
+        with open(self._output_path, "w") as output_file:
+            for raw_line in iter(process.stdout.readline, b""):
+                line = raw_line.decode(errors="replace")
+                output_file.write(line)
+                segments.add_output_line(line)
+                self._notify_output(line)
+
+    def _follow_attached_output(self, since: int, segments: SegmentedStatsWriter) -> None:
+        """
+        Follow the output file of an attached process (like tail -f) until the profiling stops, handing its tags to the segments.
+        """
+        os.makedirs(os.path.dirname(self._output_path), exist_ok=True)
+        pending = ""
+        with open(self._program_output, errors="replace") as source, open(self._output_path, "w") as output_file:
+            while True:
+                line = source.readline()
+                if line:
+                    # Wait for the rest of a line still being written
+                    pending += line
+                    if not pending.endswith("\n"):
+                        continue
+                    if self._is_attached_tag(line=pending, since=since):
+                        output_file.write(pending)
+                        segments.add_output_line(pending)
+                        self._notify_output(pending)
+                    pending = ""
+                    continue
+                if self._stop_event.is_set():
+                    break
+                self._stop_event.wait(SAMPLING_INTERVAL)
+
+    def _add_startup_window(self, output: str) -> str:
+        """
+        Add the tags of the startup window (from the creation of the process to its last import before its first tag) to the output.
+        """
+        first_tag = None
+        for line in output.splitlines():
+            if line.startswith(PREFIX_MEASURE_TAG) and not line.startswith((PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO)):
+                try:
+                    timestamp = int(line.rsplit(": ", 1)[1])
+                except (IndexError, ValueError):
+                    continue
+                first_tag = timestamp if first_tag is None else min(first_tag, timestamp)
+        window = self._startup_profiler.startup_window(process_start_ns=self._process_start_ns, first_tag_ns=first_tag)
+        if window is None:
+            logger.warning("No import was timed, the startup window is not added.")
+            return output
+        logger.info(f"Startup of the program: {(window[1] - window[0]) / 1e9:.3f}s until its last import.")
+        return f"{PREFIX_MEASURE_TAG}start_{STARTUP_TASK}: {window[0]}\n{PREFIX_MEASURE_TAG}finish_{STARTUP_TASK}: {window[1]}\n{output}"
+
+    def _merge_gc_events(self) -> str:
+        """
+        Merge the garbage collection events of each process into the agent folder, still on the measure clock.
+        """
+        events_path = os.path.join(self._agent_path, GC_EVENTS_FILE_NAME)
+        merge_agent_tables(directory=self._agent_path, agent=GcRecorder.NAME, output_path=events_path)
+        for summary in read_agent_summaries(directory=self._agent_path, agent=GcRecorder.NAME):
+            logger.info(f"GC tracing of PID {summary['pid']}: {summary['collections']} collections, {summary['pause_seconds']:.3f}s of pauses.")
+        return events_path
+
+    def _merge_agent_tables(self, agent: str, suffix: str, file_name: str) -> None:
+        """
+        Merge the per-window tables of an agent next to the preprocessed stats.
+        """
+        table_path = self._sidecar_path(suffix=suffix, file_name=file_name)
+        rows = merge_agent_tables(directory=self._agent_path, agent=agent, output_path=table_path)
+        logger.info(f"Per-window {agent} ({rows} rows) saved to: {table_path}")
+
+    def _write_exit_summary(self, exit_watcher: ExitWatcher, rusage: Optional[Dict[str, Any]]) -> None:
+        """
+        Write the exit time and resource usage of the program next to the preprocessed stats.
+        """
+        summary_path = self._sidecar_path(suffix=EXIT_SUMMARY_SUFFIX, file_name=EXIT_SUMMARY_FILE_NAME)
+        summary = exit_watcher.write_summary(file_path=summary_path, process_start_ns=self._process_start_ns, rusage=rusage)
+        if rusage is not None:
+            logger.info(f"Program exited after {summary['exit_time']:.3f}s: {summary['user_time'] + summary['system_time']:.3f}s of CPU, peak RSS {summary['max_rss'] / (1024 ** 2):.1f}MB.")
+        logger.info(f"Exit summary saved to: {summary_path}")
+
+    def _register(self) -> None:
+        """
+        Register the run in the results catalog.
+        """
+        scenario = self.run_info.get("scenario") or self.program_name
+        catalog = ResultsCatalog(catalog_path=self._catalog_path)
+        try:
+            catalog.register_run(
+                scenario=scenario,
+                stats_path=self._stats_path,
+                output_path=self._output_path,
+                preprocessed_path=self._preprocessed_path,
+                flavor=self.run_info.get("flavor"),
+                run_id=self.run_info.get("run_id"),
+                parameters=self.run_info.get("parameters"),
+            )
+        finally:
+            catalog.close()
+        logger.info(f"Run registered in the catalog as scenario '{scenario}': {self._catalog_path}")
+
+    def run(self) -> str:
+        """
+        Profile the program.
+
+        Writes the raw stats, the program output and the preprocessed stats files.
+        In continuous mode, the cleaned segments and their index are written while profiling.
+
+        Returns:
+            str: Path of the preprocessed stats CSV (folder of the segments in continuous mode).
+        """
+        if not self._profiler_cpus:
+            return self._profile()
+        original_cpus = os.sched_getaffinity(0)
+        if self._target_cpus is None:
+            # The program would inherit the profiler CPUs, it keeps the others
+            remaining_cpus = sorted(original_cpus - set(self._profiler_cpus))
+            if remaining_cpus:
+                self._launch_cpus = remaining_cpus
+            else:
+                logger.warning(f"Profiler CPUs {self._profiler_cpus} leave no CPU to the program, it shares them.")
+                self._launch_cpus = sorted(original_cpus)
+        # Keep the sampling loop off the program CPUs
+        os.sched_setaffinity(0, self._profiler_cpus)
+        try:
+            return self._profile()
+        finally:
+            os.sched_setaffinity(0, original_cpus)
+
+    def _profile(self) -> str:
+        """
+        Profile the program, once the profiler is pinned to its CPUs.
+        """
+        # ------- Pre-run process
+        if not self.continuous:
+            file_stats = FileWriterCsv(file_path=self._stats_path)
+            file_stats.set_columns(columns=self._columns())
+
+        # ------- Start (or attach to) the process and collect stats
+        if self._attached is None:
+            process = self._start_process()
+            pid = process.pid
+            logger.info(f"PID of the command: {pid}")
+            # Not polled: the child is only reaped after the sampling, with its resource usage
+            exit_watcher = ExitWatcher(pid=pid, child=True, on_exit=self._wake_event.set)
+        else:
+            pid = self._attached.pid
+            logger.info(f"Attached to PID {pid} ({self.program_name})")
+            exit_watcher = ExitWatcher(pid=pid, child=False, on_exit=self.stop)
+            attach_time = DatetimeHelper.clock_ns()
+        exit_watcher.start()
+        is_running = lambda: not exit_watcher.exited
+        self._process_start_ns = SystemStatsCollector.get_process_start_ns(pid)
+        self._clock_anchor = DatetimeHelper.clock_anchor()
+        self._placement = {"target_cpus": self._affinity(pid), "profiler_cpus": self._affinity(0)}
+        if self._launch_cpus or self._profiler_cpus:
+            logger.info(f"CPU placement: program {self._placement['target_cpus']}, profiler {self._placement['profiler_cpus']}")
+
+        output_reader = None
+        if self._trigger is not None:
+            file_stats = TriggeredStatsWriter(
+                directory=self._stats_path,
+                columns=self._columns(),
+                process_start_ns=self._process_start_ns,
+                conditions=self._trigger,
+                pre_trigger=self._pre_trigger,
+                post_trigger=self._post_trigger,
+                max_capture=self._max_capture,
+                retention=self._retention,
+                clock_anchor=self._clock_anchor,
+            )
+        elif self.continuous:
+            file_stats = SegmentedStatsWriter(
+                directory=self._stats_path,
+                columns=self._columns(),
+                process_start_ns=self._process_start_ns,
+                segment_duration=self._segment_duration,
+                segment_size=self._segment_size,
+                retention=self._retention,
+                clock_anchor=self._clock_anchor,
+            )
+        if self.continuous:
+            self._segments_writer = file_stats
+            # The output is read while profiling, so tags reach their segment and the pipe never fills up
+            if self._attached is None:
+                output_reader = threading.Thread(target=self._drain_output, args=(process, file_stats))
+            elif self._program_output is not None:
+                output_reader = threading.Thread(target=self._follow_attached_output, args=(attach_time, file_stats))
+            if output_reader is not None:
+                output_reader.start()
+        elif self._attached is None and (self._sampler is not None or self._memory_peak_reset):
+            output_lines: List[str] = []
+            output_reader = threading.Thread(target=self._read_output, args=(process, output_lines))
+            output_reader.start()
+        offcpu_sampler = None
+        if self._offcpu_interval is not None:
+            offcpu_sampler = OffCpuSampler(pid=pid, output_path=self._offcpu_path, interval=self._offcpu_interval)
+            offcpu_sampler.start()
+        self._collect(pid=pid, is_running=is_running, file_stats=file_stats)
+        if offcpu_sampler is not None:
+            offcpu_sampler.stop()
+        rusage = None
+        if self._attached is None and exit_watcher.exited:
+            rusage = exit_watcher.reap()
+            if rusage is not None:
+                # Popen.wait and communicate then return at once
+                process.returncode = rusage["returncode"]
+
+        # ------- Post-run process
+        if self.continuous:
+            if self._attached is None:
+                self._returncode = process.wait()
+            self._stop_event.set()
+            if output_reader is not None:
+                output_reader.join()
+            else:
+                FileWriterTxt.write_text_to_file(file_path=self._output_path, text="")
+            file_stats.close()
+            self._preprocessed_path = self._stats_path
+            if self._gc_tracing:
+                StatsCleaner.clean_gc_events(events_file=self._merge_gc_events(), output_path=os.path.join(self._stats_path, GC_EVENTS_FILE_NAME), process_start_ns=self._process_start_ns)
+            self._run_info = file_stats.run_info
+            logger.info(f"Segments saved to: {self._stats_path} (index: {file_stats.index_path})")
+        else:
+            # Write profiling results file (only its header when no sample could be read)
+            if not file_stats.have_rows():
+                logger.warning(f"No stats were collected from PID {pid}, it exited before the first sample.")
+            file_stats.write_to_csv(allow_empty=True)
+            logger.info(f"Profiling results saved to: {self._stats_path}")
+
+            if output_reader is not None:
+                # Already read while profiling
+                self._returncode = process.wait()
+                output_reader.join()
+                output = "".join(output_lines)
+            elif self._attached is None:
+                # Get and write the output of the subprocess once it finishes
+                output, _ = process.communicate()
+                self._returncode = process.returncode
+                output = output.decode()
+            else:
+                # An attached process is left running, and its exit code belongs to its parent
+                output = self._attached_output(since=attach_time)
+            if self._startup_profiler is not None:
+                output = self._add_startup_window(output)
+            FileWriterTxt.write_text_to_file(file_path=self._output_path, text=output)
+            logger.info(f"Output saved to: {self._output_path}")
+
+            # Assign labels to the stats
+            logger.info("Processing raw stats file...")
+            stats_cleaner = StatsCleaner(stats_file=self._stats_path, program_output_file=self._output_path)
+            gc_events_file = self._merge_gc_events() if self._gc_tracing else None
+            stats_cleaner.run(output_csv_path=RESULTS_PREPROCESSED_FILE_TEMPLATE.format(execution_id=self._execution_id), process_start_ns=self._process_start_ns, clock_anchor=self._clock_anchor, gc_events_file=gc_events_file)
+            self._preprocessed_path = stats_cleaner.cleaned_csv_path
+            self._run_info = stats_cleaner.run_info
+            logger.info("Raw stats file processed successfully.")
+
+        if self._stack_interval is not None:
+            self._collapse_stacks(pid=pid)
+        if self._function_timing:
+            self._merge_agent_tables(agent=FunctionTimer.NAME, suffix=FUNCTIONS_SUFFIX, file_name=FUNCTIONS_FILE_NAME)
+            if not any(summary["available"] for summary in read_agent_summaries(directory=self._agent_path, agent=FunctionTimer.NAME)):
+                logger.warning("Function timing requires sys.monitoring (Python 3.12+), no function was timed.")
+        if self._allocation_tracing:
+            self._merge_agent_tables(agent=AllocationTracer.NAME, suffix=ALLOCATIONS_SUFFIX, file_name=ALLOCATIONS_FILE_NAME)
+        if self._startup_profiler is not None:
+            imports_path = self._sidecar_path(suffix=IMPORTS_SUFFIX, file_name=IMPORTS_FILE_NAME)
+            imports = self._startup_profiler.write_import_tree(output_path=imports_path, process_start_ns=self._process_start_ns)
+            logger.info(f"Import tree ({imports} imports) saved to: {imports_path}, standard error to: {self._stderr_path}")
+        if exit_watcher.exited:
+            self._write_exit_summary(exit_watcher=exit_watcher, rusage=rusage)
+        if offcpu_sampler is not None:
+            histograms_path = self._sidecar_path(suffix=OFFCPU_SUFFIX, file_name=OFFCPU_FILE_NAME)
+            rows = offcpu_histograms(samples_path=self._offcpu_path, program_output_file=self._output_path, output_path=histograms_path)
+            logger.info(f"Off-CPU time by reason per window ({rows} rows) saved to: {histograms_path}")
+
+        # Failed runs are kept on disk but not offered to the analysis
+        if self._catalog_path and (self._returncode == 0 or self._attached is not None):
+            self._register()
+        elif self._catalog_path:
+            logger.warning(f"Program exited with code {self._returncode}, the run is not registered in the catalog.")
+        return self._preprocessed_path
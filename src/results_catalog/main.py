@@ -0,0 +1,167 @@
+from typing import Any, Dict, List, Optional
+import json
+import os
+import socket
+import sqlite3
+
+from src.util import DatetimeHelper
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario TEXT NOT NULL,
+    flavor TEXT,
+    run_id TEXT,
+    host TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    stats_path TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    preprocessed_path TEXT NOT NULL UNIQUE,
+    parameters TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_scenario ON runs (scenario, flavor, run_id);
+
+CREATE TABLE IF NOT EXISTS run_parameters (
+    run_pk INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (run_pk, name)
+);
+CREATE INDEX IF NOT EXISTS idx_run_parameters ON run_parameters (name, value);
+"""
+
+
+class ResultsCatalog:
+    """
+    SQLite index of the profiling runs.
+
+    Runs are registered by the profiler when it writes their files, so the identity of a
+    run (scenario, flavor, run id, parameters, host) never has to be recovered from file names.
+    Only the profiler writes to it: the analysis opens it read only.
+    """
+
+    def __init__(self, catalog_path: str, read_only: bool = False):
+        """
+        Open (and create if needed) the catalog database.
+
+        Args:
+            catalog_path (str): Path to the SQLite file.
+            read_only (bool): Open an existing catalog without writing to it (e.g. from the analysis). Defaults to False.
+        """
+        self._catalog_path = catalog_path
+        if read_only:
+            if not os.path.exists(catalog_path):
+                raise FileNotFoundError(f"No results catalog at {catalog_path}")
+            self._connection = sqlite3.connect(f"file:{os.path.abspath(catalog_path)}?mode=ro", uri=True, timeout=30)
+            self._connection.row_factory = sqlite3.Row
+            return
+        directory = os.path.dirname(catalog_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Several profilers may write at the same time
+        self._connection = sqlite3.connect(catalog_path, timeout=30)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._connection.close()
+
+    @staticmethod
+    def _encode_value(value: Any) -> str:
+        """
+        Encode a parameter value so equal values always match in indexed lookups.
+        """
+        return json.dumps(value, sort_keys=True)
+
+    def register_run(self, scenario: str, stats_path: str, output_path: str, preprocessed_path: str, flavor: Optional[str] = None, run_id: Optional[str] = None, parameters: Optional[Dict[str, Any]] = None, host: Optional[str] = None) -> int:
+        """
+        Record a profiled run. Registering the same preprocessed file again replaces its entry.
+
+        Args:
+            scenario (str): Name of the scenario.
+            stats_path (str): Path to the raw stats CSV.
+            output_path (str): Path to the captured program output.
+            preprocessed_path (str): Path to the preprocessed stats CSV.
+            flavor (str, optional): Flavor of the runtime (e.g. gil, nogil).
+            run_id (str, optional): Identifier of the run (repetition).
+            parameters (Dict[str, Any], optional): Parameters of the scenario.
+            host (str, optional): Host name. Defaults to the current host.
+
+        Returns:
+            int: Primary key of the run in the catalog.
+        """
+        parameters = parameters or {}
+        with self._connection:
+            self._connection.execute("DELETE FROM runs WHERE preprocessed_path = ?", (preprocessed_path,))
+            cursor = self._connection.execute(
+                "INSERT INTO runs (scenario, flavor, run_id, host, created_at, stats_path, output_path, preprocessed_path, parameters) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    scenario,
+                    flavor,
+                    None if run_id is None else str(run_id),
+                    host or socket.gethostname(),
+                    DatetimeHelper.current_datetime().isoformat(),
+                    stats_path,
+                    output_path,
+                    preprocessed_path,
+                    json.dumps(parameters, sort_keys=True),
+                ),
+            )
+            run_pk = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO run_parameters (run_pk, name, value) VALUES (?, ?, ?)",
+                [(run_pk, name, self._encode_value(value)) for name, value in parameters.items()],
+            )
+        return run_pk
+
+    def find_runs(self, scenario: str, flavor: Optional[str] = None, run_id: Optional[str] = None, **parameters: Any) -> List[Dict[str, Any]]:
+        """
+        Find the runs of a scenario, optionally filtered by flavor, run id and parameter values.
+
+        Args:
+            scenario (str): Name of the scenario.
+            flavor (str, optional): Flavor to match.
+            run_id (str, optional): Run identifier to match.
+            **parameters (Any): Parameter values to match (e.g. num_workers=4).
+
+        Returns:
+            List[Dict[str, Any]]: Runs ordered by flavor, run id and registration order. The
+            "parameters" entry is decoded into a dictionary.
+        """
+        query = "SELECT runs.* FROM runs"
+        values: List[Any] = []
+        # One join per parameter filter, answered by the (name, value) index
+        for idx, (name, value) in enumerate(parameters.items()):
+            query += f" JOIN run_parameters AS param{idx} ON param{idx}.run_pk = runs.id AND param{idx}.name = ? AND param{idx}.value = ?"
+            values.extend([name, self._encode_value(value)])
+        conditions = ["runs.scenario = ?"]
+        values.append(scenario)
+        if flavor is not None:
+            conditions.append("runs.flavor = ?")
+            values.append(flavor)
+        if run_id is not None:
+            conditions.append("runs.run_id = ?")
+            values.append(str(run_id))
+        query += f" WHERE {' AND '.join(conditions)} ORDER BY runs.flavor, runs.run_id, runs.id"
+
+        runs = []
+        for row in self._connection.execute(query, values):
+            run = dict(row)
+            run["parameters"] = json.loads(run["parameters"])
+            runs.append(run)
+        return runs
+
+    def list_scenarios(self) -> List[str]:
+        """
+        Get the names of the scenarios with registered runs.
+
+        Returns:
+            List[str]: Sorted scenario names.
+        """
+        return [row["scenario"] for row in self._connection.execute("SELECT DISTINCT scenario FROM runs ORDER BY scenario")]
@@ -0,0 +1 @@
+from .main import STARTUP_TASK, StartupProfiler, parse_import_tree
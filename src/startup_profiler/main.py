@@ -0,0 +1,178 @@
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+import csv
+import os
+import sys
+import threading
+
+from src.util import DatetimeHelper, logger
+
+# Lines printed by python -X importtime
+IMPORT_TIME_PREFIX = "import time:"
+# Columns of the import tree, parents before their children
+IMPORT_TREE_COLUMNS = ["module", "parent", "depth", "self_time", "cumulative_time", "finished_at"]
+# Task of the synthetic window covering the startup
+STARTUP_TASK = "startup"
+
+
+def parse_import_tree(lines: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    """
+    Parse the output of python -X importtime into a tree.
+
+    Each import is printed when it finishes, after the imports it triggered, indented two spaces
+    per level: "import time: <self us> | <cumulative us> | <indent><module>".
+
+    Args:
+        lines (List[Tuple[int, str]]): Lines of the output, with the time (ns of the measure clock) they were read at.
+
+    Returns:
+        List[Dict[str, Any]]: Imports in tree order (each parent before its children), with their "module",
+        "parent" (None at the top level), "depth", "self_time" and "cumulative_time" (seconds) and the
+        "finished_at" time (ns of the measure clock).
+    """
+    # Imports whose parent has not been printed yet, with their children
+    pending: List[Tuple[Dict[str, Any], List[Any]]] = []
+    for timestamp, line in lines:
+        try:
+            self_us, cumulative_us, module = line[len(IMPORT_TIME_PREFIX):].rstrip("\n").split("|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            # Header
+            continue
+        module = module[1:]
+        depth = (len(module) - len(module.lstrip(" "))) // 2
+        node = {"module": module.strip(), "parent": None, "depth": depth, "self_time": self_us / 1e6, "cumulative_time": cumulative_us / 1e6, "finished_at": timestamp}
+        # Its children are the deeper imports printed since the previous one of its level
+        first_child = len(pending)
+        while first_child > 0 and pending[first_child - 1][0]["depth"] > depth:
+            first_child -= 1
+        children = pending[first_child:]
+        del pending[first_child:]
+        for child, _ in children:
+            child["parent"] = node["module"]
+        pending.append((node, children))
+
+    tree: List[Dict[str, Any]] = []
+
+    def walk(node: Dict[str, Any], children: List[Any]) -> None:
+        tree.append(node)
+        for child, grandchildren in children:
+            walk(child, grandchildren)
+
+    for node, children in pending:
+        walk(node, children)
+    return tree
+
+
+class StartupProfiler(threading.Thread):
+    """
+    A class reading the standard error of a Python program run with -X importtime.
+
+    The import lines are timestamped when read, to place the imports on the timeline of the
+    stats; the other lines are the errors of the program, passed through to the standard error
+    of the profiler. The whole stream is saved to a file; the pipe keeps being drained if
+    writing it fails, so the program never blocks or dies on its standard error.
+    """
+
+    def __init__(self, stderr_path: str):
+        """
+        Initialize StartupProfiler.
+
+        Args:
+            stderr_path (str): Path of the file the standard error of the program is saved to.
+        """
+        super().__init__(name="system-profiler-startup", daemon=True)
+        self._stderr_path = stderr_path
+        # Opened before the program is launched, so a missing folder fails the run at once
+        os.makedirs(os.path.dirname(stderr_path) or ".", exist_ok=True)
+        self._stderr_file: Optional[TextIO] = open(stderr_path, "w")
+        self._read_fd, self._write_fd = os.pipe()
+        self._import_lines: List[Tuple[int, str]] = []
+
+    @property
+    def stderr_fd(self) -> int:
+        """File descriptor the program writes its standard error to."""
+        return self._write_fd
+
+    def start(self) -> None:
+        """
+        Start reading, once the program was started with stderr_fd. The profiler closes its own copy of it.
+        """
+        os.close(self._write_fd)
+        super().start()
+
+    def run(self) -> None:
+        with os.fdopen(self._read_fd, errors="replace") as stderr_pipe:
+            for line in stderr_pipe:
+                if line.startswith(IMPORT_TIME_PREFIX):
+                    self._import_lines.append((DatetimeHelper.clock_ns(), line))
+                else:
+                    sys.stderr.write(line)
+                self._save(line)
+        self._close_file()
+
+    def _save(self, line: str) -> None:
+        """
+        Write a line to the saved standard error, which is given up on the first error.
+        """
+        if self._stderr_file is None:
+            return
+        try:
+            self._stderr_file.write(line)
+        except OSError as excep:
+            logger.warning(f"Unable to save the standard error to {self._stderr_path} ({excep}), it is only forwarded.")
+            self._close_file()
+
+    def _close_file(self) -> None:
+        if self._stderr_file is None:
+            return
+        try:
+            self._stderr_file.close()
+        except OSError:
+            pass
+        self._stderr_file = None
+
+    def import_tree(self) -> List[Dict[str, Any]]:
+        """
+        Get the imports of the program as a tree, once it exited (see parse_import_tree).
+        """
+        self.join()
+        return parse_import_tree(lines=self._import_lines)
+
+    def startup_window(self, process_start_ns: int, first_tag_ns: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """
+        Get the startup of the program: from its creation to the last import finished before its first tag
+        (the last import at all without tags).
+
+        Args:
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+            first_tag_ns (int, optional): Time of the first tag printed by the program.
+
+        Returns:
+            Optional[Tuple[int, int]]: Start and finish of the startup in nanoseconds of the measure clock.
+            None if no import was read.
+        """
+        self.join()
+        imports_finished = [timestamp for timestamp, _ in self._import_lines if first_tag_ns is None or timestamp <= first_tag_ns]
+        if not imports_finished:
+            return None
+        return process_start_ns, max(imports_finished)
+
+    def write_import_tree(self, output_path: str, process_start_ns: int) -> int:
+        """
+        Write the import tree of the program to a CSV, with the time each import finished at as an uptime (seconds).
+
+        Args:
+            output_path (str): Path of the CSV to write.
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+
+        Returns:
+            int: Number of imports written.
+        """
+        tree = self.import_tree()
+        with open(output_path, "w", newline="") as output_file:
+            writer = csv.writer(output_file)
+            writer.writerow(IMPORT_TREE_COLUMNS)
+            for node in tree:
+                node = dict(node, finished_at=(node["finished_at"] - process_start_ns) / 1e9)
+                writer.writerow([node[column] for column in IMPORT_TREE_COLUMNS])
+        return len(tree)
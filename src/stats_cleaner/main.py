@@ -1,8 +1,11 @@
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
 
 import csv
+import json
+import os
 
-from src.const import PREFIX_MEASURE_TAG, PREFIX_MEASURE_TAG_FILE_NAME
+from src.const import CLOCK_ANCHOR_SUFFIX, GC_COLUMN, GC_EVENTS_SUFFIX, PREFIX_MEASURE_TAG, PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO, SAMPLE_INTERVAL_COLUMN
 from src.util import FileWriterCsv
 from src.system_stats_collector.energy_stats_collector import EnergyStatsCollector, EnergyUnit
 
@@ -22,14 +25,41 @@ class StatsCleaner:
         """
         self._stats_file = stats_file 
         self._program_output_file = program_output_file
-        # List to store labels and timestamps
-        self._labels: List[Tuple[str, float]] = []
+        # List to store labels and timestamps (ns of the measure clock)
+        self._labels: List[Tuple[str, int]] = []
         # List to store rows of stats data
         self._rows_stats: List[Dict] = []
         # List to store columns of the CSV file
         self._file_columns: List[str] = []
         # Output CSV file after processing
         self._output_csv_path: str = None
+        # Path of the cleaned CSV file once written
+        self._cleaned_csv_path: Optional[str] = None
+        # Run description given by the program (scenario, run id, flavor and parameters)
+        self._run_info: Optional[Dict[str, Any]] = None
+        # Last raw energy counter and cumulative energy (J), to chain the next segment of a continuous profile
+        self._last_energy_uj: Optional[int] = None
+        self._total_energy: float = 0.0
+
+    @property
+    def run_info(self) -> Optional[Dict[str, Any]]:
+        """Run description printed by the program with set_run_info, if any."""
+        return self._run_info
+
+    @property
+    def last_energy_uj(self) -> Optional[int]:
+        """Last raw energy counter read (µJ), available after run."""
+        return self._last_energy_uj
+
+    @property
+    def total_energy(self) -> float:
+        """Cumulative energy at the last row (J), available after run."""
+        return self._total_energy
+
+    @property
+    def cleaned_csv_path(self) -> Optional[str]:
+        """Path of the cleaned CSV file, available after run."""
+        return self._cleaned_csv_path
 
     def _read_program_output_file(self) -> None:
         """
@@ -42,12 +72,17 @@ class StatsCleaner:
                     # Split each line by colon and whitespace
                     label, filename = line.strip().split(": ")
                     self._output_csv_path = filename
+
+                elif line.startswith(PREFIX_MEASURE_TAG_RUN_INFO):
+                    # The description is JSON, so only split on the first separator
+                    _, run_info = line.strip().split(": ", 1)
+                    self._run_info = json.loads(run_info)
                 
                 elif line.startswith(PREFIX_MEASURE_TAG):
                     # Split each line by colon and whitespace
                     label, timestamp = line.strip().split(": ")
                     label = label.replace(PREFIX_MEASURE_TAG, "")
-                    self._labels.append((label, float(timestamp)))
+                    self._labels.append((label, int(timestamp)))
 
     def _read_stats_file(self) -> None:
         """
@@ -57,7 +92,11 @@ class StatsCleaner:
             reader = csv.DictReader(csvfile)
             # Store rows and columns
             self._rows_stats = list(reader)
-            self._file_columns = list(self._rows_stats[0].keys()) + ["label"]
+            # Timestamps are integer nanoseconds of the measure clock
+            for row in self._rows_stats:
+                row["uptime"] = int(row["uptime"])
+            # A program exiting before its first sample leaves the header only
+            self._file_columns = list(reader.fieldnames or []) + ["label"]
 
     def _assign_labels(self) -> None:
         """
@@ -67,27 +106,113 @@ class StatsCleaner:
         based on the "uptime" column and assigns the label to a duplicated row.
         Stores the updated data in the _rows_stats attribute.
         """
+        # Samples in time order (already sorted when read), searched by bisection
+        samples = sorted(self._rows_stats, key=lambda row: row["uptime"])
+        uptimes = [row["uptime"] for row in samples]
         # For each label and timestamp pair, assign label to the closest row
         for label, timestamp in self._labels:
-            closest_row = min(self._rows_stats, key=lambda row: abs(float(row["uptime"]) - timestamp))
+            # Without samples, the label rows only place the tags (whole-run totals are in the exit summary)
+            if not samples:
+                self._rows_stats.append({"uptime": timestamp, "label": label})
+                continue
+            after = bisect_left(uptimes, timestamp)
+            if after == len(uptimes) or (after > 0 and timestamp - uptimes[after - 1] <= uptimes[after] - timestamp):
+                # First of the samples sharing that uptime, like the earliest closest row
+                closest_row = samples[bisect_left(uptimes, uptimes[after - 1])]
+            else:
+                closest_row = samples[after]
             duplicated_row = closest_row.copy()
             duplicated_row["uptime"] = timestamp
             duplicated_row["label"] = label
+            # The label row repeats a sample, it must not count twice in time-weighted stats
+            if SAMPLE_INTERVAL_COLUMN in duplicated_row:
+                duplicated_row[SAMPLE_INTERVAL_COLUMN] = 0.0
             self._rows_stats.append(duplicated_row)
 
-    def _update_uptime(self, process_creation_time: float) -> None:
+    def _update_uptime(self, process_start_ns: int) -> None:
         """
-        Convert the uptime column from seconds from the epoch to seconds from
+        Convert the uptime column from nanoseconds of the measure clock to seconds from
         the creation of the process.
 
         Args:
-            process_creation_time (float): Time when the process was created given in seconds from the epoch.
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
         """
         # For each row, its uptime is computed taking the creation time as reference
         for row in self._rows_stats:
-            row["uptime"] = float(row["uptime"]) - process_creation_time
+            row["uptime"] = (row["uptime"] - process_start_ns) / 1e9
+
+    @staticmethod
+    def write_clock_anchor(file_path: str, clock_anchor: Dict[str, Any], process_start_ns: int) -> None:
+        """
+        Write the wall clock anchor of a run, to display its uptimes as datetimes.
 
-    def normalize_consumed_energy(self) -> None:
+        Args:
+            file_path (str): Path of the JSON file to write.
+            clock_anchor (Dict[str, Any]): Anchor read during the run (DatetimeHelper.clock_anchor).
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+        """
+        anchor = dict(clock_anchor)
+        anchor["process_start_ns"] = process_start_ns
+        # Wall time of the uptime 0
+        anchor["process_start_wall_time"] = clock_anchor["wall_time"] - (clock_anchor["clock_ns"] - process_start_ns) / 1e9
+        with open(file_path, "w") as anchor_file:
+            json.dump(anchor, anchor_file, indent=2)
+
+    @staticmethod
+    def clean_gc_events(events_file: str, output_path: str, process_start_ns: int) -> List[Dict[str, Any]]:
+        """
+        Convert the garbage collection events of the agent to the timeline of the stats.
+
+        Args:
+            events_file (str): Merged events of the GC agent (start and duration in nanoseconds of the measure clock).
+            output_path (str): Path of the CSV to write, with the "start" as uptime and the "duration" (pause) in seconds.
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+
+        Returns:
+            List[Dict[str, Any]]: The converted events, by start.
+        """
+        with open(events_file, newline="") as csvfile:
+            reader = csv.DictReader(csvfile)
+            columns = reader.fieldnames or []
+            events = list(reader)
+        for event in events:
+            event["start"] = (int(event["start"]) - process_start_ns) / 1e9
+            event["duration"] = int(event["duration"]) / 1e9
+        events.sort(key=lambda event: event["start"])
+        file_writer = FileWriterCsv(file_path=output_path)
+        file_writer.set_columns(columns=columns)
+        file_writer.append_rows(rows_data=[[event[col] for col in columns] for event in events])
+        # A program that exited before the first sample and printed no tag leaves only the header
+        file_writer.write_to_csv(allow_empty=True)
+        return events
+
+    def _add_gc_time(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Add the cumulative garbage collection pause time (seconds) of the program at each row, so
+        the GC time of a window is the difference between its rows, like the energy.
+
+        Args:
+            events (List[Dict[str, Any]]): Garbage collection events, by start (uptime and duration in seconds).
+        """
+        self._file_columns.append(GC_COLUMN)
+        finished = 0.0
+        next_event = 0
+        # Events started before the current row, that may still be running at it
+        running: List[Dict[str, Any]] = []
+        for row in sorted(self._rows_stats, key=lambda row: row["uptime"]):
+            while next_event < len(events) and events[next_event]["start"] <= row["uptime"]:
+                running.append(events[next_event])
+                next_event += 1
+            still_running = []
+            for event in running:
+                if event["start"] + event["duration"] <= row["uptime"]:
+                    finished += event["duration"]
+                else:
+                    still_running.append(event)
+            running = still_running
+            row[GC_COLUMN] = finished + sum(row["uptime"] - event["start"] for event in running)
+
+    def normalize_consumed_energy(self, previous_energy_uj: Optional[int] = None, initial_energy: float = 0.0) -> None:
         """
         Recompute the consumed energy values as cumulative energy since the first sample.
 
@@ -96,6 +221,10 @@ class StatsCleaner:
         To robustly handle long runs (including multiple wraparounds), we compute
         deltas between consecutive samples and accumulate them.
 
+        Args:
+            previous_energy_uj (int, optional): Raw counter of the sample before the first row (previous segment).
+            initial_energy (float): Cumulative energy (J) at that sample. Defaults to 0.
+
         Returns:
             None
         """
@@ -123,8 +252,8 @@ class StatsCleaner:
         try:
             rows_sorted = sorted(self._rows_stats, key=lambda row: float(row["uptime"]))
 
-            prev_energy_uj: Optional[int] = None
-            cumulative_energy_uj = 0
+            prev_energy_uj: Optional[int] = previous_energy_uj
+            cumulative_energy_uj = initial_energy * 1e6
 
             for row in rows_sorted:
                 current_energy_uj = parse_energy_uj(row.get("energy_consumed"))
@@ -134,7 +263,7 @@ class StatsCleaner:
 
                 if prev_energy_uj is None:
                     prev_energy_uj = current_energy_uj
-                    row["energy_consumed"] = 0.0
+                    row["energy_consumed"] = cumulative_energy_uj / 1e6
                     continue
 
                 cumulative_energy_uj += energy_collector.energy_delta_uj(
@@ -143,11 +272,13 @@ class StatsCleaner:
                 )
                 prev_energy_uj = current_energy_uj
                 row["energy_consumed"] = cumulative_energy_uj / 1e6
+            self._last_energy_uj = prev_energy_uj
+            self._total_energy = cumulative_energy_uj / 1e6
         finally:
             energy_collector.close()
 
 
-    def run(self, output_csv_path: str, process_creation_time: float) -> None:
+    def run(self, output_csv_path: str, process_start_ns: int, previous_energy_uj: Optional[int] = None, initial_energy: float = 0.0, clock_anchor: Optional[Dict[str, Any]] = None, gc_events_file: Optional[str] = None) -> None:
         """
         Run the cleaning process.
 
@@ -155,7 +286,12 @@ class StatsCleaner:
 
         Args:
             output_csv_path (str): Path to the CSV file to write the cleaned data.
-            process_creation_time (float): Time when the process was created given in seconds from the epoch.
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+            previous_energy_uj (int, optional): Raw energy counter of the previous segment's last sample, for continuous profiles.
+            initial_energy (float): Cumulative energy (J) the previous segment ended with. Defaults to 0.
+            clock_anchor (Dict[str, Any], optional): Wall clock anchor of the run, written next to the CSV as <name>_clock.json.
+            gc_events_file (str, optional): Garbage collection events of the GC agent, written next to the CSV as <name>_gc.csv
+                and summed into a cumulative "gc_time" column.
         """
         # Read input files
         self._read_program_output_file()
@@ -165,16 +301,21 @@ class StatsCleaner:
         self._assign_labels()
 
         # Convert uptime column to seconds from the start of the program
-        self._update_uptime(process_creation_time=process_creation_time)
+        self._update_uptime(process_start_ns=process_start_ns)
 
         # Normalize energy consumption relative to first row
-        self.normalize_consumed_energy()
+        self.normalize_consumed_energy(previous_energy_uj=previous_energy_uj, initial_energy=initial_energy)
 
         # Add possible filename prefix to the output CSV
         output_csv_path_split = output_csv_path.split("/")
         file_name = f"{self._output_csv_path}_{output_csv_path_split[-1]}" if self._output_csv_path else output_csv_path_split[-1]
         output_csv_path = "/".join(output_csv_path_split[:-1] + [file_name])
 
+        # Place the garbage collections on the timeline of the stats
+        if gc_events_file is not None:
+            events = StatsCleaner.clean_gc_events(events_file=gc_events_file, output_path=f"{os.path.splitext(output_csv_path)[0]}{GC_EVENTS_SUFFIX}", process_start_ns=process_start_ns)
+            self._add_gc_time(events=events)
+
         # Write the sorted rows to a CSV file using FileWriterCsv
         self._rows_stats = sorted(self._rows_stats, key=lambda row: float(row["uptime"]))
         file_writer = FileWriterCsv(file_path=output_csv_path)
@@ -182,4 +323,8 @@ class StatsCleaner:
         # Convert dict rows to ordered lists matching columns
         ordered_rows = [[row.get(col, "") for col in self._file_columns] for row in self._rows_stats]
         file_writer.append_rows(rows_data=ordered_rows)
-        file_writer.write_to_csv()
+        # A program that exited before the first sample and printed no tag leaves only the header
+        file_writer.write_to_csv(allow_empty=True)
+        self._cleaned_csv_path = output_csv_path
+        if clock_anchor is not None:
+            StatsCleaner.write_clock_anchor(file_path=f"{os.path.splitext(output_csv_path)[0]}{CLOCK_ANCHOR_SUFFIX}", clock_anchor=clock_anchor, process_start_ns=process_start_ns)
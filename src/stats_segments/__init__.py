@@ -0,0 +1 @@
+from .main import RetentionPolicy, SegmentedStatsWriter, TriggerConditions, TriggeredStatsWriter, downsample_segment
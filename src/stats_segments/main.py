@@ -0,0 +1,522 @@
+from collections import deque
+from threading import Lock, RLock
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+import csv
+import os
+
+from src.const import CLOCK_ANCHOR_FILE_NAME, PREFIX_MEASURE_TAG, PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO, SAMPLE_INTERVAL_COLUMN, SEGMENTS_INDEX_COLUMNS, SEGMENTS_INDEX_FILE_NAME
+from src.stats_cleaner import StatsCleaner
+from src.util import FileWriterCsv, logger
+
+# Columns kept from the last sample of a downsampled bucket instead of averaged
+LAST_VALUE_COLUMNS = ("uptime", "energy_consumed", "thread_cpu_time", "thread_wait_time", "label")
+# High-water marks, whose maximum is kept over a downsampled bucket
+MAX_VALUE_COLUMNS = ("ram_peak", "virtual_memory_peak", "cgroup_memory_peak")
+
+
+def downsample_segment(segment_path: str, factor: int) -> int:
+    """
+    Downsample a cleaned segment in place, merging every factor consecutive samples into one.
+
+    Numeric columns are averaged (weighted by the sample intervals when present), the uptime
+    and the cumulative energy and thread times are taken from the last sample of each bucket, the memory
+    peaks are maxed, the intervals are added up, and labeled rows are kept as they are.
+
+    Args:
+        segment_path (str): Path to the cleaned segment CSV.
+        factor (int): Number of samples merged into one.
+
+    Returns:
+        int: Number of rows left in the segment.
+    """
+    with open(segment_path, newline="") as segment_file:
+        reader = csv.DictReader(segment_file)
+        columns = list(reader.fieldnames or [])
+        rows = list(reader)
+
+    def merge(bucket: List[Dict[str, str]]) -> Dict[str, Any]:
+        try:
+            intervals = [float(row[SAMPLE_INTERVAL_COLUMN]) for row in bucket]
+        except (KeyError, TypeError, ValueError):
+            intervals = []
+        weights = intervals if sum(intervals) > 0 else [1.0] * len(bucket)
+        merged: Dict[str, Any] = {}
+        for column in columns:
+            if column in LAST_VALUE_COLUMNS:
+                merged[column] = bucket[-1][column]
+                continue
+            if column == SAMPLE_INTERVAL_COLUMN:
+                merged[column] = sum(intervals)
+                continue
+            if column in MAX_VALUE_COLUMNS:
+                values = [float(row[column]) for row in bucket if row[column] not in ("", None)]
+                merged[column] = max(values) if values else ""
+                continue
+            try:
+                merged[column] = sum(float(row[column]) * weight for row, weight in zip(bucket, weights)) / sum(weights)
+            except (TypeError, ValueError):
+                merged[column] = bucket[-1][column]
+        return merged
+
+    downsampled: List[Dict[str, Any]] = []
+    bucket: List[Dict[str, str]] = []
+    for row in rows:
+        # Labels split the buckets so they keep their place between the samples
+        if row.get("label"):
+            if bucket:
+                downsampled.append(merge(bucket))
+                bucket = []
+            downsampled.append(row)
+            continue
+        bucket.append(row)
+        if len(bucket) == factor:
+            downsampled.append(merge(bucket))
+            bucket = []
+    if bucket:
+        downsampled.append(merge(bucket))
+
+    with open(segment_path, "w", newline="") as segment_file:
+        writer = csv.DictWriter(segment_file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(downsampled)
+    return len(downsampled)
+
+
+class RetentionPolicy:
+    """
+    Which segments of a continuous profile are kept at full resolution, downsampled or dropped.
+
+    Ages are measured from the end of the newest segment, in seconds.
+    """
+
+    def __init__(self, full_resolution: Optional[float] = None, downsample_factor: int = 10, max_age: Optional[float] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize RetentionPolicy.
+
+        Args:
+            full_resolution (float, optional): Age after which segments are downsampled. Defaults to never.
+            downsample_factor (int): Samples merged into one when downsampling. Defaults to 10.
+            max_age (float, optional): Age after which segments are dropped. Defaults to never.
+            max_bytes (int, optional): Disk budget of the segments, the oldest ones are dropped beyond it. Defaults to none.
+        """
+        if downsample_factor < 2:
+            raise ValueError("downsample_factor must be at least 2")
+        self._full_resolution = full_resolution
+        self._downsample_factor = downsample_factor
+        self._max_age = max_age
+        self._max_bytes = max_bytes
+
+    @property
+    def downsample_factor(self) -> int:
+        """Samples merged into one when downsampling."""
+        return self._downsample_factor
+
+    def expired(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Get the segments older than max_age.
+        """
+        if self._max_age is None or not segments:
+            return []
+        newest_end = segments[-1]["end"]
+        return [segment for segment in segments if newest_end - segment["end"] > self._max_age]
+
+    def to_downsample(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Get the full resolution segments older than full_resolution.
+        """
+        if self._full_resolution is None or not segments:
+            return []
+        newest_end = segments[-1]["end"]
+        return [segment for segment in segments if segment["resolution"] == 1 and newest_end - segment["end"] > self._full_resolution]
+
+    def over_budget(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Get the oldest segments to drop to fit in max_bytes. The newest segment is always kept.
+        """
+        if self._max_bytes is None:
+            return []
+        total_bytes = sum(segment["bytes"] for segment in segments)
+        dropped = []
+        for segment in segments[:-1]:
+            if total_bytes <= self._max_bytes:
+                break
+            dropped.append(segment)
+            total_bytes -= segment["bytes"]
+        return dropped
+
+
+class SegmentedStatsWriter:
+    """
+    Write the stats of a continuous profile as a series of cleaned segment files.
+
+    Samples are buffered until the segment reaches its duration or size. The segment is then
+    cleaned with the program tags received meanwhile (energy and uptime continue from the
+    previous segment), added to the index and the retention policy is applied. Only one
+    segment is ever held in memory.
+    """
+
+    # Prefix of the segment file names
+    SEGMENT_NAME = "segment"
+
+    def __init__(self, directory: str, columns: List[str], process_start_ns: int, segment_duration: Optional[float] = None, segment_size: Optional[int] = None, retention: Optional[RetentionPolicy] = None, clock_anchor: Optional[Dict[str, Any]] = None):
+        """
+        Initialize SegmentedStatsWriter.
+
+        Args:
+            directory (str): Folder of the segments and their index.
+            columns (List[str]): Columns of the raw stats.
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+            segment_duration (float, optional): Seconds of samples per segment.
+            segment_size (int, optional): Bytes of raw samples per segment.
+            retention (RetentionPolicy, optional): Policy applied after each segment. Defaults to keeping everything.
+            clock_anchor (Dict[str, Any], optional): Wall clock anchor of the run, written to the folder as clock.json.
+
+        Without a duration or size, segments are only closed by rotate.
+        """
+        self._directory = directory
+        self._columns = list(columns)
+        self._process_start_ns = process_start_ns
+        self._segment_duration = segment_duration
+        self._segment_size = segment_size
+        self._retention = retention or RetentionPolicy()
+        os.makedirs(directory, exist_ok=True)
+        if clock_anchor is not None:
+            StatsCleaner.write_clock_anchor(file_path=os.path.join(directory, CLOCK_ANCHOR_FILE_NAME), clock_anchor=clock_anchor, process_start_ns=process_start_ns)
+
+        self._segments: List[Dict[str, Any]] = []
+        self._next_segment = 1
+        self._rows: List[List[Any]] = []
+        self._rows_bytes = 0
+        self._tags: List[str] = []
+        self._tags_lock = Lock()
+        # Carried over from one segment to the next
+        self._previous_energy_uj: Optional[int] = None
+        self._total_energy = 0.0
+        self._run_info: Optional[Dict[str, Any]] = None
+        self._index_columns = list(SEGMENTS_INDEX_COLUMNS)
+
+    @property
+    def directory(self) -> str:
+        """Folder of the segments and their index."""
+        return self._directory
+
+    @property
+    def index_path(self) -> str:
+        """Path of the segments index."""
+        return os.path.join(self._directory, SEGMENTS_INDEX_FILE_NAME)
+
+    @property
+    def run_info(self) -> Optional[Dict[str, Any]]:
+        """Run description printed by the program, once a segment with it was cleaned."""
+        return self._run_info
+
+    def append_row(self, row_data: List[Any]) -> None:
+        """
+        Append a sample, closing the segment once it is full.
+
+        Args:
+            row_data (List[Any]): Raw stats of the sample, starting with its timestamp.
+        """
+        self._rows.append(list(row_data))
+        self._rows_bytes += len(",".join(str(value) for value in row_data)) + 1
+        if self._segment_duration is not None and (self._rows[-1][0] - self._rows[0][0]) / 1e9 >= self._segment_duration:
+            self.rotate()
+        elif self._segment_size is not None and self._rows_bytes >= self._segment_size:
+            self.rotate()
+
+    def add_output_line(self, line: str) -> None:
+        """
+        Add a line of the program output, keeping the measure tags for the current segment. Thread safe.
+        """
+        # The output filename would rename the segments
+        if line.startswith(PREFIX_MEASURE_TAG) and not line.startswith(PREFIX_MEASURE_TAG_FILE_NAME):
+            with self._tags_lock:
+                self._tags.append(line if line.endswith("\n") else f"{line}\n")
+
+    def rotate(self, **index_fields: Any) -> None:
+        """
+        Clean the current segment, add it to the index and apply the retention policy.
+
+        Args:
+            **index_fields (Any): Extra columns of the segment in the index.
+        """
+        if not self._rows:
+            return
+        with self._tags_lock:
+            tags, self._tags = self._tags, []
+        rows, self._rows, self._rows_bytes = self._rows, [], 0
+
+        name = f"{self.SEGMENT_NAME}_{self._next_segment:06d}"
+        self._next_segment += 1
+        raw_path = os.path.join(self._directory, f"{name}_raw.csv")
+        tags_path = os.path.join(self._directory, f"{name}_tags.txt")
+        segment_path = os.path.join(self._directory, f"{name}.csv")
+
+        raw_writer = FileWriterCsv(file_path=raw_path)
+        raw_writer.set_columns(columns=self._columns)
+        raw_writer.append_rows(rows_data=rows)
+        raw_writer.write_to_csv()
+        with open(tags_path, "w") as tags_file:
+            tags_file.writelines(tags)
+        stats_cleaner = StatsCleaner(stats_file=raw_path, program_output_file=tags_path)
+        stats_cleaner.run(output_csv_path=segment_path, process_start_ns=self._process_start_ns, previous_energy_uj=self._previous_energy_uj, initial_energy=self._total_energy)
+        # The cleaned segment holds everything the raw one did
+        os.remove(raw_path)
+        os.remove(tags_path)
+
+        if stats_cleaner.last_energy_uj is not None:
+            self._previous_energy_uj = stats_cleaner.last_energy_uj
+        self._total_energy = stats_cleaner.total_energy
+        self._run_info = stats_cleaner.run_info or self._run_info
+        self._segments.append({
+            "segment": os.path.basename(segment_path),
+            "start": (rows[0][0] - self._process_start_ns) / 1e9,
+            "end": (rows[-1][0] - self._process_start_ns) / 1e9,
+            # Each tag adds a labeled row, the run info does not
+            "rows": len(rows) + sum(1 for tag in tags if not tag.startswith(PREFIX_MEASURE_TAG_RUN_INFO)),
+            "bytes": os.path.getsize(segment_path),
+            "resolution": 1,
+            **index_fields,
+        })
+        self._apply_retention()
+        self._write_index()
+        logger.debug(f"Segment {segment_path} written ({len(rows)} samples).")
+
+    def _drop(self, segment: Dict[str, Any]) -> None:
+        os.remove(os.path.join(self._directory, segment["segment"]))
+        self._segments.remove(segment)
+        logger.debug(f"Segment {segment['segment']} dropped by the retention policy.")
+
+    def _apply_retention(self) -> None:
+        for segment in self._retention.expired(self._segments):
+            self._drop(segment)
+        for segment in self._retention.to_downsample(self._segments):
+            segment_path = os.path.join(self._directory, segment["segment"])
+            segment["rows"] = downsample_segment(segment_path=segment_path, factor=self._retention.downsample_factor)
+            segment["bytes"] = os.path.getsize(segment_path)
+            segment["resolution"] = self._retention.downsample_factor
+        for segment in self._retention.over_budget(self._segments):
+            self._drop(segment)
+
+    def _write_index(self) -> None:
+        """
+        Atomically replace the index with the current segments.
+        """
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", newline="") as index_file:
+            writer = csv.DictWriter(index_file, fieldnames=self._index_columns)
+            writer.writeheader()
+            writer.writerows(self._segments)
+        os.replace(tmp_path, self.index_path)
+
+    def close(self) -> None:
+        """
+        Write the last, partial segment.
+        """
+        self.rotate()
+        if not self._segments:
+            self._write_index()
+
+
+class TriggerConditions:
+    """
+    Conditions starting a capture of a triggered profile.
+    """
+
+    def __init__(self, rss_above: Optional[float] = None, cpu_above: Optional[float] = None, cpu_samples: int = 1, tags: Sequence[str] = ()):
+        """
+        Initialize TriggerConditions. A capture starts when any of them is met.
+
+        Args:
+            rss_above (float, optional): RSS of the process (GB) to exceed.
+            cpu_above (float, optional): CPU usage of the process (%) to exceed...
+            cpu_samples (int): ...for this many consecutive samples. Defaults to 1.
+            tags (Sequence[str], optional): Measure tags printed by the program (e.g. start_flush).
+        """
+        self._rss_above = rss_above
+        self._cpu_above = cpu_above
+        self._cpu_samples = max(1, cpu_samples)
+        self._tags = set(tags)
+        self._cpu_streak = 0
+
+    def check_sample(self, sample: Dict[str, Any]) -> Optional[str]:
+        """
+        Check a sample against the RSS and CPU conditions.
+
+        Args:
+            sample (Dict[str, Any]): Raw stats of the sample by column.
+
+        Returns:
+            Optional[str]: Reason of the trigger, None if no condition is met.
+        """
+        if self._rss_above is not None and float(sample["ram_usage"]) > self._rss_above:
+            return f"ram_usage {float(sample['ram_usage']):.3f} GB > {self._rss_above} GB"
+        if self._cpu_above is not None:
+            self._cpu_streak = self._cpu_streak + 1 if float(sample["cpu_usage"]) > self._cpu_above else 0
+            if self._cpu_streak >= self._cpu_samples:
+                return f"cpu_usage > {self._cpu_above}% for {self._cpu_streak} samples"
+        return None
+
+    def check_tag(self, line: str) -> Optional[str]:
+        """
+        Check a line of the program output against the tag condition.
+
+        Returns:
+            Optional[str]: Reason of the trigger, None if the line is not one of the tags.
+        """
+        if not self._tags or not line.startswith(PREFIX_MEASURE_TAG):
+            return None
+        tag = line[len(PREFIX_MEASURE_TAG):].split(": ", 1)[0]
+        return f"tag {tag}" if tag in self._tags else None
+
+
+class TriggeredStatsWriter(SegmentedStatsWriter):
+    """
+    Write only the stats around the moments a trigger fires, as capture files.
+
+    The last pre_trigger seconds of samples (and tags) are kept in a ring buffer. When a
+    condition is met, or fire is called (e.g. on a signal), the buffer is flushed into a new
+    capture, which records until post_trigger seconds after the last firing. Each capture
+    is cleaned and indexed like a segment, with the reason of its trigger. Nothing is written
+    at steady state.
+
+    A condition that stays true keeps extending its capture: a capture is written once it
+    spans max_capture seconds, and the recording goes on in the next one, so the samples held
+    in memory stay bounded.
+    """
+
+    SEGMENT_NAME = "capture"
+
+    def __init__(self, directory: str, columns: List[str], process_start_ns: int, conditions: TriggerConditions, pre_trigger: float = 10.0, post_trigger: float = 10.0, max_capture: float = 60.0, retention: Optional[RetentionPolicy] = None, clock_anchor: Optional[Dict[str, Any]] = None):
+        """
+        Initialize TriggeredStatsWriter.
+
+        Args:
+            directory (str): Folder of the captures and their index.
+            columns (List[str]): Columns of the raw stats.
+            process_start_ns (int): Time when the process was created in nanoseconds of the measure clock.
+            conditions (TriggerConditions): Conditions starting a capture.
+            pre_trigger (float): Seconds of samples kept before the trigger. Defaults to 10.
+            post_trigger (float): Seconds recorded after the last trigger. Defaults to 10.
+            max_capture (float): Seconds of samples a capture holds at most before it is written. Defaults to 60.
+            retention (RetentionPolicy, optional): Policy applied after each capture. Defaults to keeping everything.
+            clock_anchor (Dict[str, Any], optional): Wall clock anchor of the run, written to the folder as clock.json.
+        """
+        super().__init__(directory=directory, columns=columns, process_start_ns=process_start_ns, retention=retention, clock_anchor=clock_anchor)
+        self._index_columns.append("trigger")
+        self._conditions = conditions
+        self._pre_trigger = pre_trigger
+        self._post_trigger = post_trigger
+        self._max_capture = max_capture
+        # Guards the recording state, the ring buffer and the pending trigger, shared with the output reader
+        # and the signal handler (reentrant: the handler may interrupt the sampling thread holding it)
+        self._state_lock = RLock()
+        self._ring_rows: Deque[List[Any]] = deque()
+        self._ring_tags: Deque[Tuple[int, str]] = deque()
+        # Given once by the program, repeated in every capture
+        self._run_info_line: Optional[str] = None
+        # Set from other threads (output reader, signal handler), handled on the next sample
+        self._pending_trigger: Optional[str] = None
+        self._trigger_reason: Optional[str] = None
+        # Timestamps (ns) of the first sample of the capture, and the one it records until
+        self._capture_start: Optional[int] = None
+        self._record_until: Optional[int] = None
+
+    @property
+    def recording(self) -> bool:
+        """Whether a capture is being recorded."""
+        return self._record_until is not None
+
+    def fire(self, reason: str) -> None:
+        """
+        Start (or extend) a capture from the next sample. Thread safe.
+        """
+        with self._state_lock:
+            self._pending_trigger = reason
+
+    def add_output_line(self, line: str) -> None:
+        """
+        Add a line of the program output: recorded during a capture, kept in the ring buffer otherwise. Thread safe.
+        """
+        reason = self._conditions.check_tag(line)
+        if reason is not None:
+            self.fire(reason)
+        with self._state_lock:
+            if line.startswith(PREFIX_MEASURE_TAG_RUN_INFO):
+                self._run_info_line = line
+            # Checked with the append, so a capture cannot start or end in between
+            if self.recording:
+                super().add_output_line(line)
+                return
+            if not line.startswith(PREFIX_MEASURE_TAG) or line.startswith((PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO)):
+                return
+            try:
+                timestamp = int(line.strip().rsplit(": ", 1)[1])
+            except (IndexError, ValueError):
+                return
+            self._ring_tags.append((timestamp, line))
+
+    def _trim_ring(self) -> None:
+        while self._ring_rows and (self._ring_rows[-1][0] - self._ring_rows[0][0]) / 1e9 > self._pre_trigger:
+            self._ring_rows.popleft()
+        oldest = self._ring_rows[0][0] if self._ring_rows else float("inf")
+        while self._ring_tags and self._ring_tags[0][0] < oldest:
+            self._ring_tags.popleft()
+
+    def _start_capture(self, reason: str, timestamp: int) -> None:
+        """
+        Flush the ring buffer into a new capture.
+        """
+        logger.info(f"Trigger fired ({reason}), capturing {self._pre_trigger}s before and {self._post_trigger}s after.")
+        self._trigger_reason = reason
+        self._capture_start = self._ring_rows[0][0] if self._ring_rows else timestamp
+        for row in self._ring_rows:
+            super().append_row(row)
+        self._ring_rows.clear()
+        if self._run_info_line is not None:
+            super().add_output_line(self._run_info_line)
+        for _, line in self._ring_tags:
+            super().add_output_line(line)
+        self._ring_tags.clear()
+
+    def append_row(self, row_data: List[Any]) -> None:
+        """
+        Append a sample, starting, extending or closing a capture.
+
+        Args:
+            row_data (List[Any]): Raw stats of the sample, starting with its timestamp.
+        """
+        timestamp = row_data[0]
+        reason = self._conditions.check_sample(dict(zip(self._columns, row_data)))
+        with self._state_lock:
+            if reason is None and self._pending_trigger is not None:
+                reason, self._pending_trigger = self._pending_trigger, None
+
+            if reason is not None:
+                if not self.recording:
+                    self._start_capture(reason=reason, timestamp=timestamp)
+                self._record_until = timestamp + round(self._post_trigger * 1e9)
+
+            if not self.recording:
+                self._ring_rows.append(list(row_data))
+                self._trim_ring()
+                return
+            super().append_row(row_data)
+            if timestamp >= self._record_until:
+                self._record_until = None
+                self.rotate(trigger=self._trigger_reason)
+            elif (timestamp - self._capture_start) / 1e9 >= self._max_capture:
+                # Still triggered: write what was captured and go on in the next capture
+                self.rotate(trigger=self._trigger_reason)
+                self._capture_start = timestamp
+
+    def close(self) -> None:
+        """
+        Write the capture being recorded, if any.
+        """
+        with self._state_lock:
+            if self.recording:
+                self._record_until = None
+                self.rotate(trigger=self._trigger_reason)
+        if not self._segments:
+            self._write_index()
@@ -1,4 +1,7 @@
 # Values to measure
 KEYWORD_CPU_USAGE_PER_CORE = "cpu_usage_per_code"
 TEMPLATE_USAGE_PER_CORE = "core_{core_idx}_usage"
-VALUES_TO_MEASURE = ["uptime", "cpu_usage", KEYWORD_CPU_USAGE_PER_CORE, "virtual_memory_usage", "ram_usage", "swap_usage", "energy_consumed", "cpu_temperature"]
+# Optional values, left empty when they are not collected or cannot be read
+THREAD_STATS_VALUES = ["threads", "threads_running", "threads_blocked", "thread_cpu_time", "thread_wait_time"]
+MEMORY_PEAK_VALUES = ["ram_peak", "virtual_memory_peak", "cgroup_memory_peak"]
+VALUES_TO_MEASURE = ["uptime", "cpu_usage", KEYWORD_CPU_USAGE_PER_CORE, "virtual_memory_usage", "ram_usage", "swap_usage", "energy_consumed", "cpu_temperature"] + THREAD_STATS_VALUES + MEMORY_PEAK_VALUES
@@ -1,11 +1,14 @@
 from typing import List, Optional, Tuple
 from time import perf_counter
+import os
 
 import psutil
 
-from .const import KEYWORD_CPU_USAGE_PER_CORE, TEMPLATE_USAGE_PER_CORE, VALUES_TO_MEASURE
+from .const import KEYWORD_CPU_USAGE_PER_CORE, MEMORY_PEAK_VALUES, TEMPLATE_USAGE_PER_CORE, THREAD_STATS_VALUES, VALUES_TO_MEASURE
 from .energy_stats_collector import EnergyStatsCollector
-from src.util import DatetimeHelper
+from .memory_peak_collector import MemoryPeakCollector
+from .thread_stats_collector import ThreadStatsCollector
+from src.util import DatetimeHelper, MEASURE_CLOCK_NAME
 from src.util import logger
 
 
@@ -14,17 +17,21 @@ class SystemStatsCollector:
     A class for measuring system resources for a given process.
     """
 
-    def __init__(self, pid: int):
+    def __init__(self, pid: int, thread_stats: bool = False):
         """
         Initialize SystemStatsCollector with the PID of the process to monitor.
 
         Args:
             pid (int): Process ID (PID) of the process to monitor.
+            thread_stats (bool): Scan the threads of the process at every sample. Defaults to False (thread columns left empty).
         """
         self._pid = pid
         self._cpu_count = SystemStatsCollector.get_cpu_count()
         self._process = psutil.Process(pid)
         self._energy_collector = EnergyStatsCollector()
+        # The scan reads every /proc/<pid>/task entry, only done on request
+        self._thread_collector = ThreadStatsCollector(pid) if thread_stats else None
+        self._memory_peak_collector = MemoryPeakCollector(pid)
 
     @staticmethod
     def get_values_to_measure() -> List[str]:
@@ -40,7 +47,8 @@ class SystemStatsCollector:
         values_cpu_usage = [TEMPLATE_USAGE_PER_CORE.format(core_idx=idx) for idx in range(SystemStatsCollector.get_cpu_count())]
         idx_cpu_cores_usage = VALUES_TO_MEASURE.index(KEYWORD_CPU_USAGE_PER_CORE)
         # Build stats values
-        values_to_measure = VALUES_TO_MEASURE
+        # Copy so repeated calls (several sessions in one process) keep the template intact
+        values_to_measure = list(VALUES_TO_MEASURE)
         values_to_measure[idx_cpu_cores_usage:idx_cpu_cores_usage+1] = values_cpu_usage
         return values_to_measure
     
@@ -107,31 +115,48 @@ class SystemStatsCollector:
         """
         return psutil.cpu_count()
 
-    def get_process_create_time(self) -> Optional[float]:
+    @staticmethod
+    def get_process_start_ns(pid: int) -> Optional[int]:
         """
-        Get the time (from the epoch) when the process 
-        specified by the PID was created.
+        Get the time when the process specified by the PID was created, on the measure clock.
+
+        On Linux it is read from /proc/<pid>/stat (clock ticks since the boot, as CLOCK_BOOTTIME).
+        Elsewhere, the creation time from the epoch is moved to the measure clock with a clock anchor.
+
+        Args:
+            pid (int): Process ID (PID) of the process.
 
         Returns:
-            create_time: Time when the process was created.
-                                None if the process with the given PID does not exist.
+            Optional[int]: Creation time in nanoseconds of the measure clock.
+                           None if the process with the given PID does not exist.
         """
+        if MEASURE_CLOCK_NAME == "CLOCK_BOOTTIME":
+            try:
+                with open(f"/proc/{pid}/stat") as stat_file:
+                    # The command name may contain spaces, the fields start after its closing parenthesis
+                    fields = stat_file.read().rsplit(")", 1)[1].split()
+                return int(fields[19]) * 1_000_000_000 // os.sysconf("SC_CLK_TCK")
+            except FileNotFoundError:
+                logger.error(f"Process with PID {pid} does not exist.")
+                return None
+            except (OSError, IndexError, ValueError):
+                pass
         try:
-            create_time = self._process.create_time()
-            return create_time
+            create_time = psutil.Process(pid).create_time()
         except psutil.NoSuchProcess:
-            logger.error(f"Process with PID {self._pid} does not exist.")
+            logger.error(f"Process with PID {pid} does not exist.")
             return None
+        anchor = DatetimeHelper.clock_anchor()
+        return anchor["clock_ns"] - round((anchor["wall_time"] - create_time) * 1e9)
 
-    def get_measure_timestamp(self) -> float:
+    def get_measure_timestamp(self) -> int:
         """
-        Get timestamp (from the epoch) of the current measure.
+        Get timestamp of the current measure on the measure clock.
 
         Returns:
-            timestamp: Current timestamp.
+            timestamp: Current timestamp in nanoseconds.
         """
-        timestamp = DatetimeHelper.current_datetime(from_the_epoch=True)
-        return timestamp
+        return DatetimeHelper.clock_ns()
 
     def get_energy_consumption(self) -> Optional[int]:
         """
@@ -148,7 +173,51 @@ class SystemStatsCollector:
             logger.error(f"Failed to read energy: {excep}")
             return None
 
-    def get_cpu_temperature(self) -> Optional[float]:
+    def get_thread_stats(self) -> Optional[List[Optional[float]]]:
+        """
+        Get the scheduling of the threads of the process: how many run, wait for a CPU or are blocked.
+
+        Returns:
+            Optional[List[Optional[float]]]: Number of threads, threads running or runnable, threads blocked,
+            and the cumulative on-CPU and run-queue seconds of the threads (None if the kernel has no schedstat).
+            None if the thread stats are not collected or could not be read.
+        """
+        if self._thread_collector is None:
+            return None
+        thread_stats = self._thread_collector.read_thread_stats()
+        if thread_stats is None:
+            logger.debug(f"The threads of PID {self._pid} could not be read, the sample keeps them empty.")
+        return thread_stats
+
+    def get_memory_peaks(self) -> Optional[List[Optional[float]]]:
+        """
+        Get the memory high-water marks of the process, which include the spikes between two samples.
+
+        Returns:
+            Optional[List[Optional[float]]]: Peak RSS, peak virtual memory and peak memory of the cgroup of the process
+            (None when it has no cgroup of its own), in gigabytes, since the start or the last reset_memory_peaks.
+            None if they could not be read.
+        """
+        memory_peaks = self._memory_peak_collector.read_peaks()
+        if memory_peaks is None:
+            logger.debug(f"The memory peaks of PID {self._pid} could not be read, the sample keeps them empty.")
+        return memory_peaks
+
+    def reset_memory_peaks(self) -> None:
+        """
+        Reset the peak RSS and cgroup peak memory of the process to its current usage (e.g. at a tag).
+        """
+        self._memory_peak_collector.reset_peaks()
+
+    def close(self) -> None:
+        """
+        Close the files kept open between samples.
+        """
+        self._energy_collector.close()
+        self._memory_peak_collector.close()
+
+    @staticmethod
+    def get_cpu_temperature() -> Optional[float]:
         """
         Get the current CPU package temperature in Celsius if available.
 
@@ -188,10 +257,13 @@ class SystemStatsCollector:
         cpu_temperature = 0
         memory_usage = self.get_memory_usage()
         energy_consumption = self.get_energy_consumption()
+        # Optional: a failed read leaves its columns empty instead of losing the sample
+        thread_stats = self.get_thread_stats() or [None] * len(THREAD_STATS_VALUES)
+        memory_peaks = self.get_memory_peaks() or [None] * len(MEMORY_PEAK_VALUES)
 
-        # Return the measurements if all of them were successfully collected
+        # Return the measurements if all the required ones were successfully collected
         if execution_time is not None and cpu_usage is not None and cpu_usage_per_core is not None and memory_usage is not None and energy_consumption is not None:
-            new_stats = [execution_time, cpu_usage] + cpu_usage_per_core + list(memory_usage) + [energy_consumption, cpu_temperature]
+            new_stats = [execution_time, cpu_usage] + cpu_usage_per_core + list(memory_usage) + [energy_consumption, cpu_temperature] + thread_stats + memory_peaks
             return new_stats
         else:
             return None
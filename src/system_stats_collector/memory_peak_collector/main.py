@@ -0,0 +1,142 @@
+from typing import List, Optional
+import os
+
+from src.util import logger
+
+# Value written to /proc/<pid>/clear_refs to reset the peak RSS (VmHWM), Linux 4.0+
+CLEAR_REFS_RESET_PEAK_RSS = b"5"
+
+
+class MemoryPeakCollector:
+    """
+    A class for reading the memory high-water marks the kernel keeps for a process, which catch the
+    allocation spikes shorter than the sampling interval.
+
+    VmHWM (peak RSS) and VmPeak (peak virtual memory) are read from /proc/<pid>/status, and memory.peak
+    from the cgroup v2 of the process when it has its own (a cgroup shared with the profiler would
+    report it too). VmHWM is reset through /proc/<pid>/clear_refs, memory.peak by writing to the file
+    descriptor it is read from (Linux 6.12+); VmPeak cannot be reset.
+    """
+
+    def __init__(self, pid: int):
+        """
+        Initialize MemoryPeakCollector with the PID of the process to monitor.
+
+        Args:
+            pid (int): Process ID (PID) of the process to monitor.
+        """
+        self._pid = pid
+        self._status_path = f"/proc/{pid}/status"
+        self._clear_refs_path = f"/proc/{pid}/clear_refs"
+        self._cgroup_peak_fd = MemoryPeakCollector._open_cgroup_peak(pid)
+        # Cleared when the kernel refuses the reset, to warn only once
+        self._can_reset_hwm = True
+        self._can_reset_cgroup = self._cgroup_peak_fd is not None
+
+    @staticmethod
+    def _cgroup2_mount() -> Optional[str]:
+        """
+        Mount point of the cgroup v2 hierarchy, None if it is not mounted.
+        """
+        try:
+            with open("/proc/self/mountinfo") as mountinfo_file:
+                for line in mountinfo_file:
+                    # The filesystem type follows the " - " separator, the mount point is the 5th field
+                    fields, _, fs_fields = line.partition(" - ")
+                    if fs_fields.split(" ", 1)[0] == "cgroup2":
+                        return fields.split()[4]
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def _cgroup_path(pid: str) -> Optional[str]:
+        """
+        Path of the cgroup v2 of a process ("self" for the profiler), None if unknown.
+        """
+        try:
+            with open(f"/proc/{pid}/cgroup") as cgroup_file:
+                for line in cgroup_file:
+                    if line.startswith("0::"):
+                        return line[len("0::"):].strip()
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def _open_cgroup_peak(pid: int) -> Optional[int]:
+        """
+        Open the memory.peak of the cgroup of the process, None if it has no cgroup of its own.
+        """
+        mount = MemoryPeakCollector._cgroup2_mount()
+        cgroup = MemoryPeakCollector._cgroup_path(str(pid))
+        if mount is None or cgroup is None or cgroup == MemoryPeakCollector._cgroup_path("self"):
+            return None
+        peak_path = os.path.join(mount, cgroup.lstrip("/"), "memory.peak")
+        try:
+            return os.open(peak_path, os.O_RDWR)
+        except PermissionError:
+            # Still readable, without resets
+            try:
+                return os.open(peak_path, os.O_RDONLY)
+            except OSError:
+                return None
+        except OSError:
+            return None
+
+    def read_peaks(self) -> Optional[List[Optional[float]]]:
+        """
+        Read the memory high-water marks of the process.
+
+        Returns:
+            Optional[List[Optional[float]]]: Peak RSS (VmHWM), peak virtual memory (VmPeak) and peak memory of
+            the cgroup (None without a cgroup of its own), in gigabytes, since the start or the last reset.
+            The process peaks are None once it exited (zombie). None if the process does not exist.
+        """
+        peaks = {}
+        try:
+            with open(self._status_path) as status_file:
+                for line in status_file:
+                    if line.startswith(("VmHWM:", "VmPeak:")):
+                        key, value = line.split(":", 1)
+                        # In kB
+                        peaks[key] = int(value.split()[0]) * 1024 / (1024 ** 3)
+        except (OSError, ValueError):
+            return None
+        cgroup_peak = None
+        if self._cgroup_peak_fd is not None:
+            try:
+                cgroup_peak = int(os.pread(self._cgroup_peak_fd, 64, 0)) / (1024 ** 3)
+            except (OSError, ValueError):
+                pass
+        # A zombie has no memory left, its peaks are missing until it is reaped
+        return [peaks.get("VmHWM"), peaks.get("VmPeak"), cgroup_peak]
+
+    def reset_peaks(self) -> None:
+        """
+        Reset the peak RSS and the peak memory of the cgroup to the current usage, so the next reads
+        only cover what follows. A reset the kernel refuses is reported once and not tried again.
+        """
+        if self._can_reset_hwm:
+            try:
+                with open(self._clear_refs_path, "wb") as clear_refs_file:
+                    clear_refs_file.write(CLEAR_REFS_RESET_PEAK_RSS)
+            except FileNotFoundError:
+                pass
+            except OSError as excep:
+                self._can_reset_hwm = False
+                logger.warning(f"The peak RSS of PID {self._pid} cannot be reset ({excep}), it covers the whole run.")
+        if self._can_reset_cgroup:
+            try:
+                os.write(self._cgroup_peak_fd, b"reset\n")
+            except OSError as excep:
+                self._can_reset_cgroup = False
+                logger.warning(f"The cgroup memory peak of PID {self._pid} cannot be reset ({excep}, Linux 6.12+), it covers the whole run.")
+
+    def close(self) -> None:
+        """
+        Close the memory.peak of the cgroup.
+        """
+        if self._cgroup_peak_fd is not None:
+            os.close(self._cgroup_peak_fd)
+            self._cgroup_peak_fd = None
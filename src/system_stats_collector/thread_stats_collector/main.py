@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional, Tuple
+import os
+
+from src.const import AGENT_THREAD_NAME
+
+# Thread states of /proc/<pid>/task/<tid>/stat: running or waiting for a CPU, and sleeping or waiting for I/O
+RUNNING_STATES = ("R",)
+BLOCKED_STATES = ("S", "D")
+
+
+class ThreadStatsCollector:
+    """
+    A class for measuring the scheduling of the threads of a process via the /proc/<pid>/task files.
+
+    Each thread reports its on-CPU time and its run-queue delay (time spent runnable, waiting for
+    a CPU) in schedstat, and its state in stat. The times are accumulated across samples per
+    thread, so the totals keep growing when threads exit. The agent threads of the profiler
+    in the program are not counted.
+    """
+
+    def __init__(self, pid: int):
+        """
+        Initialize ThreadStatsCollector with the PID of the process to monitor.
+
+        Args:
+            pid (int): Process ID (PID) of the process to monitor.
+        """
+        self._task_folder = f"/proc/{pid}/task"
+        # Last on-CPU and run-queue ns of each thread, and totals over every thread seen
+        self._last_times: Dict[str, Tuple[int, int]] = {}
+        self._cpu_ns = 0
+        self._wait_ns = 0
+        # Only compiled in with CONFIG_SCHED_INFO
+        self._has_schedstat = os.path.exists(f"/proc/{pid}/schedstat")
+
+    @staticmethod
+    def _read_stat(tid_folder: str) -> Optional[Tuple[str, str]]:
+        """
+        Read the name and state letter of a thread, None if it exited.
+        """
+        try:
+            with open(os.path.join(tid_folder, "stat")) as stat_file:
+                # The thread name may contain spaces, the fields start after its closing parenthesis
+                name, fields = stat_file.read().split(" (", 1)[1].rsplit(")", 1)
+            return name, fields.split()[0]
+        except (OSError, IndexError, ValueError):
+            return None
+
+    @staticmethod
+    def _read_schedstat(tid_folder: str) -> Optional[Tuple[int, int]]:
+        """
+        Read the on-CPU and run-queue ns of a thread, None if it exited or the kernel has no schedstat.
+        """
+        try:
+            with open(os.path.join(tid_folder, "schedstat")) as schedstat_file:
+                cpu_ns, wait_ns, _ = schedstat_file.read().split()
+            return int(cpu_ns), int(wait_ns)
+        except (OSError, ValueError):
+            return None
+
+    def read_thread_stats(self) -> Optional[List[Optional[float]]]:
+        """
+        Read the threads of the process.
+
+        Returns:
+            Optional[List[Optional[float]]]: Number of threads, threads running or runnable, threads blocked
+            (sleeping or in uninterruptible I/O), and the cumulative on-CPU and run-queue seconds of the threads
+            (None without schedstat). None if the process does not exist.
+        """
+        try:
+            tids = os.listdir(self._task_folder)
+        except OSError:
+            return None
+        threads = running = blocked = 0
+        current_times: Dict[str, Tuple[int, int]] = {}
+        for tid in tids:
+            tid_folder = os.path.join(self._task_folder, tid)
+            stat = self._read_stat(tid_folder)
+            if stat is None or stat[0].startswith(AGENT_THREAD_NAME):
+                continue
+            state = stat[1]
+            threads += 1
+            if state in RUNNING_STATES:
+                running += 1
+            elif state in BLOCKED_STATES:
+                blocked += 1
+            if not self._has_schedstat:
+                continue
+            times = self._read_schedstat(tid_folder)
+            if times is None:
+                continue
+            # A thread first seen counts from its start
+            last_cpu_ns, last_wait_ns = self._last_times.get(tid, (0, 0))
+            self._cpu_ns += times[0] - last_cpu_ns
+            self._wait_ns += times[1] - last_wait_ns
+            current_times[tid] = times
+        self._last_times = current_times
+        if not self._has_schedstat:
+            return [threads, running, blocked, None, None]
+        return [threads, running, blocked, self._cpu_ns / 1e9, self._wait_ns / 1e9]
@@ -0,0 +1,5 @@
+from .main import AGENTS, agent_environment, merge_agent_tables, read_agent_summaries, start_agents, stop_agents
+from .allocation_tracer import AllocationTracer
+from .function_timer import FunctionTimer
+from .gc_recorder import GcRecorder
+from .stack_sampler import StackSampler, collapse_stacks, read_windows
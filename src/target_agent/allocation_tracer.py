@@ -0,0 +1,141 @@
+from typing import Dict, Tuple
+import csv
+import json
+import os
+import threading
+import tracemalloc
+
+import src.client_interface.main as client_interface
+from src.client_interface import add_tag_listener
+
+# Columns of the allocation tables, per window
+ALLOCATION_COLUMNS = ["window", "file", "line", "size_diff", "count_diff", "window_peak", "window_traced"]
+# Folder of the agents (and their bootstrap), whose allocations are not the program's
+AGENT_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+class AllocationTracer:
+    """
+    Agent attributing the memory allocations of the program to the tag windows with tracemalloc.
+
+    tracemalloc traces the program from its start. A snapshot is taken and grouped by file and line
+    when a window starts and when it finishes; their difference gives the sites whose memory grew
+    (or shrank) during the window. The sites of the agents and the client interface are dropped. The top sites by size difference are appended to
+    allocations_<pid>.csv with the peak traced memory of the window and the memory traced at its end.
+    """
+
+    NAME = "allocations"
+
+    def __init__(self, directory: str, top: int = 20, frames: int = 1):
+        """
+        Initialize AllocationTracer.
+
+        Args:
+            directory (str): Folder the allocation tables and summary are written to.
+            top (int): Allocation sites kept per window, by absolute size difference. Defaults to 20.
+            frames (int): Frames stored per allocation traceback. Defaults to 1 (the allocating line).
+        """
+        self._pid = os.getpid()
+        self._directory = directory
+        self._top = top
+        self._frames = frames
+        self._lock = threading.Lock()
+        # Size and count per allocation site at the start, and peak traced memory, of each open window
+        self._sites: Dict[str, Dict[Tuple[str, int], Tuple[int, int]]] = {}
+        self._peaks: Dict[str, int] = {}
+        self._windows = 0
+        # The tables must not report the agents, the client interface or tracemalloc itself
+        self._own_files = {os.path.abspath(tracemalloc.__file__), os.path.abspath(client_interface.__file__)}
+        # Allocation sites already classified as the profiler's or the program's
+        self._checked_files: Dict[str, bool] = {}
+        self._table_file = open(os.path.join(directory, f"{self.NAME}_{self._pid}.csv"), "w", newline="")
+        self._table_writer = csv.writer(self._table_file)
+        self._table_writer.writerow(ALLOCATION_COLUMNS)
+
+    def start(self) -> None:
+        """
+        Start tracing the allocations and following the tags.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+        add_tag_listener(self._on_tag)
+
+    def _update_peaks(self) -> None:
+        # The peak since the last tag belongs to every window open meanwhile
+        _, peak = tracemalloc.get_traced_memory()
+        for window in self._peaks:
+            self._peaks[window] = max(self._peaks[window], peak)
+        tracemalloc.reset_peak()
+
+    def _group_sites(self) -> Dict[Tuple[str, int], Tuple[int, int]]:
+        # Each live trace is visited once per tag (filter_traces or compare_to would make more passes),
+        # the own sites are dropped once grouped
+        sites = {}
+        for statistic in tracemalloc.take_snapshot().statistics("lineno"):
+            frame = statistic.traceback[0]
+            if not self._is_own_file(frame.filename):
+                sites[(frame.filename, frame.lineno)] = (statistic.size, statistic.count)
+        return sites
+
+    def _is_own_file(self, filename: str) -> bool:
+        own = self._checked_files.get(filename)
+        if own is None:
+            path = os.path.abspath(filename)
+            own = self._checked_files[filename] = path in self._own_files or path.startswith(AGENT_FOLDER + os.sep)
+        return own
+
+    def _on_tag(self, tag_name: str, timestamp: int) -> None:
+        if tag_name.startswith("start_"):
+            window = tag_name[len("start_"):]
+            with self._lock:
+                self._update_peaks()
+                self._peaks[window] = tracemalloc.get_traced_memory()[0]
+                self._sites[window] = self._group_sites()
+                self._windows += 1
+        elif tag_name.startswith("finish_"):
+            window = tag_name[len("finish_"):]
+            with self._lock:
+                if window not in self._sites:
+                    return
+                # Read before the snapshot, which allocates too
+                traced, _ = tracemalloc.get_traced_memory()
+                self._update_peaks()
+                self._write_window(window=window, sites=self._group_sites(), traced=traced)
+
+    def _write_window(self, window: str, sites: Dict[Tuple[str, int], Tuple[int, int]], traced: int) -> None:
+        start_sites = self._sites.pop(window)
+        peak = self._peaks.pop(window)
+        diffs = []
+        for site in start_sites.keys() | sites.keys():
+            size, count = sites.get(site, (0, 0))
+            start_size, start_count = start_sites.get(site, (0, 0))
+            if size != start_size or count != start_count:
+                diffs.append((site, size - start_size, count - start_count))
+        diffs.sort(key=lambda diff: abs(diff[1]), reverse=True)
+        for (filename, lineno), size_diff, count_diff in diffs[:self._top]:
+            self._table_writer.writerow([window, filename, lineno, size_diff, count_diff, peak, traced])
+        self._table_file.flush()
+
+    def stop(self) -> None:
+        """
+        Write the windows left open, stop tracing and write the summary of the agent.
+        """
+        with self._lock:
+            if self._sites:
+                traced, _ = tracemalloc.get_traced_memory()
+                self._update_peaks()
+                sites = self._group_sites()
+                for window in list(self._sites):
+                    self._write_window(window=window, sites=sites, traced=traced)
+            traced, peak = tracemalloc.get_traced_memory()
+            overhead = tracemalloc.get_tracemalloc_memory()
+            tracemalloc.stop()
+            self._table_file.close()
+        summary = {
+            "pid": self._pid,
+            "windows": self._windows,
+            "traced_at_exit": traced,
+            "tracemalloc_memory": overhead,
+        }
+        with open(os.path.join(self._directory, f"{self.NAME}_{self._pid}_summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
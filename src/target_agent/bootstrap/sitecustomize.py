@@ -0,0 +1,60 @@
+# Started through PYTHONPATH by the profiler, before the program runs
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+# The annotations are not evaluated, typing is only imported by type checkers
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Optional
+
+_bootstrap_folder = os.path.dirname(os.path.abspath(__file__))
+# Folder of the profiler's src package: searched last, so the entries of the program keep priority
+_root_folder = os.path.dirname(os.path.dirname(os.path.dirname(_bootstrap_folder)))
+# Modules of the src package the agents load
+_AGENT_MODULES = ("const.py", "client_interface", "target_agent")
+
+
+def _conflicting_src_package() -> "Optional[str]":
+    """
+    Folder of a src package of the program that the agents would change, None if there is none.
+
+    The src package of the profiler is a namespace package: a namespace src of the program merges with it,
+    its own folders first, unless it holds one of the modules the agents load (they are imported now, before
+    the program could). A regular src package of the program cannot hold the agents.
+    """
+    # The folder of the script (the working directory with -m or -c) is only added to sys.path after sitecustomize
+    script = sys.argv[0] if sys.argv else ""
+    first_path = os.getcwd() if script in ("", "-c", "-m") else os.path.dirname(os.path.abspath(script))
+    search_path = [path for path in [first_path] + sys.path if os.path.abspath(path or ".") != _root_folder]
+    spec = importlib.machinery.PathFinder.find_spec("src", search_path)
+    if spec is None or spec.submodule_search_locations is None:
+        return None
+    profiler_src = os.path.realpath(os.path.join(_root_folder, "src"))
+    for location in spec.submodule_search_locations:
+        if os.path.realpath(location) == profiler_src:
+            continue
+        if spec.origin not in (None, "namespace") or any(os.path.exists(os.path.join(location, name)) for name in _AGENT_MODULES):
+            return location
+    return None
+
+
+_conflict = _conflicting_src_package()
+if _conflict is not None:
+    print(f"System profiler agents not started: the src package of the program ({_conflict}) would be shadowed by the profiler's", file=sys.stderr)
+else:
+    if _root_folder not in [os.path.abspath(path or ".") for path in sys.path]:
+        sys.path.append(_root_folder)
+    try:
+        from src.target_agent import start_agents
+        start_agents()
+    except Exception as excep:
+        # The program must run even if the agents cannot
+        print(f"System profiler agents not started: {excep}", file=sys.stderr)
+
+# Run the sitecustomize this one shadows, if any
+_spec = importlib.machinery.PathFinder.find_spec("sitecustomize", [path for path in sys.path if os.path.abspath(path or ".") != _bootstrap_folder])
+if _spec is not None and _spec.loader is not None:
+    _shadowed = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_shadowed)
@@ -0,0 +1,213 @@
+from time import perf_counter_ns
+from types import CodeType
+from typing import Any, Dict, List, Optional, Tuple
+import csv
+import json
+import os
+import sys
+import threading
+
+import src.client_interface.main as client_interface
+from src.client_interface import add_tag_listener
+from src.const import AGENT_THREAD_NAME
+
+# Columns of the function tables, per window
+FUNCTION_COLUMNS = ["window", "function", "file", "line", "calls", "inclusive_time"]
+
+
+class FunctionTimer:
+    """
+    Agent counting the calls and the inclusive time of the Python functions run inside the tag windows,
+    with PEP 669 sys.monitoring (Python 3.12+).
+
+    The monitoring events are only enabled while a start_/finish_ window is open, so the program
+    runs unmonitored elsewhere. A finished call is added to every window open at its end, whatever
+    its thread (so the time of a window may exceed its duration); a recursive function only counts
+    its outermost call time. The calls of the agent threads (e.g. the stack sampler) are skipped.
+    When a window finishes, its top functions by inclusive time are appended to functions_<pid>.csv.
+    """
+
+    NAME = "functions"
+
+    def __init__(self, directory: str, top: int = 50):
+        """
+        Initialize FunctionTimer.
+
+        Args:
+            directory (str): Folder the function tables and summary are written to.
+            top (int): Functions kept per window, by inclusive time. Defaults to 50.
+        """
+        self._pid = os.getpid()
+        self._directory = directory
+        self._top = top
+        self._available = hasattr(sys, "monitoring")
+        self._lock = threading.Lock()
+        # Open windows (a plain tag may be open several times), replaced as a whole so callbacks can iterate them
+        self._open_windows: Tuple[str, ...] = ()
+        # Calls and inclusive ns of each function, per open window
+        self._tables: Dict[str, Dict[CodeType, List[int]]] = {}
+        self._local = threading.local()
+        # Bumped when the events are disabled, to drop the calls left open in every thread
+        self._generation = 0
+        self._monitored_ns = 0
+        self._enabled_at: Optional[int] = None
+        self._windows = 0
+        self._events = 0
+        # Tag printing and listeners run inside the windows, they are not part of the program
+        self._own_files = {os.path.abspath(__file__), os.path.abspath(client_interface.__file__)}
+        self._table_file = None
+        self._table_writer = None
+
+    def start(self) -> None:
+        """
+        Register the monitoring callbacks and start following the tags.
+        """
+        if not self._available:
+            return
+        monitoring = sys.monitoring
+        monitoring.use_tool_id(monitoring.PROFILER_ID, "system-profiler")
+        events = monitoring.events
+        monitoring.register_callback(monitoring.PROFILER_ID, events.PY_START, self._on_start)
+        monitoring.register_callback(monitoring.PROFILER_ID, events.PY_RESUME, self._on_enter)
+        for event in (events.PY_RETURN, events.PY_YIELD, events.PY_UNWIND):
+            monitoring.register_callback(monitoring.PROFILER_ID, event, self._on_exit)
+        self._events = events.PY_START | events.PY_RESUME | events.PY_RETURN | events.PY_YIELD | events.PY_UNWIND
+        self._table_file = open(os.path.join(self._directory, f"{self.NAME}_{self._pid}.csv"), "w", newline="")
+        self._table_writer = csv.writer(self._table_file)
+        self._table_writer.writerow(FUNCTION_COLUMNS)
+        add_tag_listener(self._on_tag)
+
+    def _is_agent_thread(self) -> bool:
+        local = self._local
+        agent = getattr(local, "agent", None)
+        if agent is None:
+            # Checked once per thread; the code they run is shared with the program, so it is not disabled
+            agent = local.agent = threading.current_thread().name.startswith(AGENT_THREAD_NAME)
+        return agent
+
+    def _stack(self) -> List[Any]:
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            local.generation = self._generation
+            local.stack = []
+            local.active = {}
+        return local.stack
+
+    def _counters(self, window: str, code: CodeType) -> Optional[List[int]]:
+        table = self._tables.get(window)
+        if table is None:
+            return None
+        counters = table.get(code)
+        if counters is None:
+            counters = table[code] = [0, 0]
+        return counters
+
+    def _on_start(self, code: CodeType, offset: int) -> Any:
+        if code.co_filename in self._own_files:
+            return sys.monitoring.DISABLE
+        if self._is_agent_thread():
+            return
+        for window in self._open_windows:
+            counters = self._counters(window=window, code=code)
+            if counters is not None:
+                counters[0] += 1
+        return self._on_enter(code=code, offset=offset)
+
+    def _on_enter(self, code: CodeType, offset: int) -> Any:
+        if code.co_filename in self._own_files:
+            return sys.monitoring.DISABLE
+        if self._is_agent_thread():
+            return
+        stack = self._stack()
+        active = self._local.active
+        active[code] = active.get(code, 0) + 1
+        stack.append((code, perf_counter_ns()))
+
+    def _on_exit(self, code: CodeType, offset: int, value: Any) -> Any:
+        now = perf_counter_ns()
+        if code.co_filename in self._own_files:
+            # PY_UNWIND cannot be disabled per location
+            return None if isinstance(value, BaseException) else sys.monitoring.DISABLE
+        if self._is_agent_thread():
+            return
+        stack = self._stack()
+        # Calls started before the events were enabled have no entry
+        if not stack:
+            return
+        entry_code, started = stack.pop()
+        if entry_code is not code:
+            # Out of step (e.g. a frame entered before enabling), start over
+            stack.clear()
+            self._local.active = {}
+            return
+        active = self._local.active
+        active[code] -= 1
+        if active[code]:
+            return
+        elapsed = now - started
+        for window in self._open_windows:
+            counters = self._counters(window=window, code=code)
+            if counters is not None:
+                counters[1] += elapsed
+
+    def _on_tag(self, tag_name: str, timestamp: int) -> None:
+        if tag_name.startswith("start_"):
+            self._open(tag_name[len("start_"):])
+        elif tag_name.startswith("finish_"):
+            self._close(tag_name[len("finish_"):])
+
+    def _open(self, window: str) -> None:
+        with self._lock:
+            self._tables.setdefault(window, {})
+            self._open_windows = self._open_windows + (window,)
+            self._windows += 1
+            if len(self._open_windows) == 1:
+                self._enabled_at = perf_counter_ns()
+                sys.monitoring.set_events(sys.monitoring.PROFILER_ID, self._events)
+
+    def _close(self, window: str) -> None:
+        with self._lock:
+            if window not in self._open_windows:
+                return
+            windows = list(self._open_windows)
+            windows.remove(window)
+            self._open_windows = tuple(windows)
+            if not self._open_windows:
+                sys.monitoring.set_events(sys.monitoring.PROFILER_ID, 0)
+                self._monitored_ns += perf_counter_ns() - self._enabled_at
+                self._generation += 1
+            if window in self._open_windows:
+                return
+            table = self._tables.pop(window)
+        self._write_table(window=window, table=table)
+
+    def _write_table(self, window: str, table: Dict[CodeType, List[int]]) -> None:
+        top = sorted(table.items(), key=lambda item: item[1][1], reverse=True)[:self._top]
+        for code, (calls, inclusive_ns) in top:
+            qualname = getattr(code, "co_qualname", code.co_name)
+            self._table_writer.writerow([window, qualname, code.co_filename, code.co_firstlineno, calls, inclusive_ns / 1e9])
+        self._table_file.flush()
+
+    def stop(self) -> None:
+        """
+        Disable the monitoring, write the windows left open and the summary of the agent.
+        """
+        if self._available:
+            with self._lock:
+                if self._open_windows:
+                    sys.monitoring.set_events(sys.monitoring.PROFILER_ID, 0)
+                    self._monitored_ns += perf_counter_ns() - self._enabled_at
+                tables, self._tables, self._open_windows = self._tables, {}, ()
+            for window, table in tables.items():
+                self._write_table(window=window, table=table)
+            sys.monitoring.free_tool_id(sys.monitoring.PROFILER_ID)
+            self._table_file.close()
+        summary = {
+            "pid": self._pid,
+            "available": self._available,
+            "windows": self._windows,
+            "monitored_seconds": self._monitored_ns / 1e9,
+        }
+        with open(os.path.join(self._directory, f"{self.NAME}_{self._pid}_summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
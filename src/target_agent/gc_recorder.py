@@ -0,0 +1,84 @@
+from time import clock_gettime_ns
+from typing import Any, Dict, List, Optional, Tuple
+import csv
+import gc
+import json
+import os
+import threading
+
+from src.const import MEASURE_CLOCK
+
+# Columns of the garbage collection events (times in ns of the measure clock)
+GC_EVENT_COLUMNS = ["start", "duration", "generation", "collected", "uncollectable"]
+# Events kept in memory before being written
+GC_EVENTS_BUFFER = 10000
+
+
+class GcRecorder:
+    """
+    Agent recording every garbage collection of the program with gc.callbacks: its start on the
+    measure clock of the tags, its duration (the pause), its generation and the objects it
+    collected and found uncollectable. The events are appended to gc_<pid>.csv.
+    """
+
+    NAME = "gc"
+
+    def __init__(self, directory: str):
+        """
+        Initialize GcRecorder.
+
+        Args:
+            directory (str): Folder the events and summary are written to.
+        """
+        self._pid = os.getpid()
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._started: Optional[int] = None
+        self._events: List[Tuple[int, int, int, int, int]] = []
+        self._collections = 0
+        self._pause_ns = 0
+        self._events_file = open(os.path.join(directory, f"{self.NAME}_{self._pid}.csv"), "w", newline="")
+        self._events_writer = csv.writer(self._events_file)
+        self._events_writer.writerow(GC_EVENT_COLUMNS)
+
+    def start(self) -> None:
+        """
+        Start recording the collections.
+        """
+        gc.callbacks.append(self._on_collection)
+
+    def _on_collection(self, phase: str, info: Dict[str, Any]) -> None:
+        now = clock_gettime_ns(MEASURE_CLOCK)
+        if phase == "start":
+            self._started = now
+            return
+        if self._started is None:
+            return
+        duration = now - self._started
+        self._events.append((self._started, duration, info["generation"], info["collected"], info["uncollectable"]))
+        self._started = None
+        self._collections += 1
+        self._pause_ns += duration
+        if len(self._events) >= GC_EVENTS_BUFFER:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._lock:
+            events, self._events = self._events, []
+            self._events_writer.writerows(events)
+
+    def stop(self) -> None:
+        """
+        Stop recording, write the pending events and the summary of the agent.
+        """
+        if self._on_collection in gc.callbacks:
+            gc.callbacks.remove(self._on_collection)
+        self._flush()
+        self._events_file.close()
+        summary = {
+            "pid": self._pid,
+            "collections": self._collections,
+            "pause_seconds": self._pause_ns / 1e9,
+        }
+        with open(os.path.join(self._directory, f"{self.NAME}_{self._pid}_summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List
+import atexit
+import csv
+import glob
+import json
+import os
+
+from src.const import AGENTS_ENV_VAR
+from .allocation_tracer import AllocationTracer
+from .function_timer import FunctionTimer
+from .gc_recorder import GcRecorder
+from .stack_sampler import StackSampler
+
+# Folder holding the sitecustomize that starts the agents in the profiled program (it adds the profiler to the end of sys.path)
+BOOTSTRAP_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bootstrap")
+
+# Agents the program can run, by name
+AGENTS = {StackSampler.NAME: StackSampler, FunctionTimer.NAME: FunctionTimer, AllocationTracer.NAME: AllocationTracer,
+          GcRecorder.NAME: GcRecorder}
+
+# Agents running in this process
+_running: List[Any] = []
+
+
+def agent_environment(directory: str, agents: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Build the environment variables that start the agents in a Python program.
+
+    Args:
+        directory (str): Folder the agents write their files to.
+        agents (Dict[str, Dict[str, Any]]): Options of each agent to start, by name (e.g. {"stacks": {"interval": 0.01}}).
+
+    Returns:
+        Dict[str, str]: Variables to add to the environment of the program.
+    """
+    os.makedirs(directory, exist_ok=True)
+    python_path = [BOOTSTRAP_FOLDER] + [path for path in os.environ.get("PYTHONPATH", "").split(os.pathsep) if path]
+    config = {"directory": os.path.abspath(directory), "agents": agents}
+    return {"PYTHONPATH": os.pathsep.join(python_path), AGENTS_ENV_VAR: json.dumps(config)}
+
+
+def start_agents() -> None:
+    """
+    Start the agents requested in the environment. Called by the bootstrap sitecustomize when the program starts.
+    """
+    config = os.environ.get(AGENTS_ENV_VAR)
+    if not config or _running:
+        return
+    config = json.loads(config)
+    for name, options in config["agents"].items():
+        agent = AGENTS[name](directory=config["directory"], **options)
+        agent.start()
+        _running.append(agent)
+    atexit.register(stop_agents)
+
+
+def stop_agents() -> None:
+    """
+    Stop the running agents and write their files.
+    """
+    while _running:
+        _running.pop().stop()
+
+
+def read_agent_summaries(directory: str, agent: str) -> List[Dict[str, Any]]:
+    """
+    Read the summaries written by an agent at the exit of each process it ran in.
+
+    Args:
+        directory (str): Folder of the agent files.
+        agent (str): Name of the agent.
+
+    Returns:
+        List[Dict[str, Any]]: One summary per process.
+    """
+    summaries = []
+    for summary_path in sorted(glob.glob(os.path.join(directory, f"{agent}_*_summary.json"))):
+        with open(summary_path) as summary_file:
+            summaries.append(json.load(summary_file))
+    return summaries
+
+
+def merge_agent_tables(directory: str, agent: str, output_path: str) -> int:
+    """
+    Merge the CSV tables written by an agent in each process (<agent>_<pid>.csv) into one CSV.
+
+    Args:
+        directory (str): Folder of the agent files.
+        agent (str): Name of the agent.
+        output_path (str): Path of the merged CSV (a "pid" column is added first).
+
+    Returns:
+        int: Number of rows written.
+    """
+    rows = 0
+    header_written = False
+    with open(output_path, "w", newline="") as output_file:
+        writer = csv.writer(output_file)
+        for table_path in sorted(glob.glob(os.path.join(directory, f"{agent}_*.csv"))):
+            pid = os.path.basename(table_path)[len(agent) + 1:-len(".csv")]
+            if not pid.isdigit():
+                continue
+            with open(table_path, newline="") as table_file:
+                reader = csv.reader(table_file)
+                header = next(reader, None)
+                if header is None:
+                    continue
+                if not header_written:
+                    writer.writerow(["pid"] + header)
+                    header_written = True
+                for row in reader:
+                    writer.writerow([pid] + row)
+                    rows += 1
+    return rows
@@ -0,0 +1,232 @@
+from collections import Counter
+from time import clock_gettime_ns, perf_counter
+from types import CodeType
+from typing import Dict, List, Optional, Tuple
+import glob
+import json
+import os
+import sys
+import threading
+
+from src.const import AGENT_THREAD_NAME, MEASURE_CLOCK, MEASURE_PATH_SEPARATOR, PREFIX_MEASURE_TAG, PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO
+
+# Seconds over which the sampling overhead is measured before adjusting the interval
+OVERHEAD_WINDOW = 1.0
+# The interval is never slowed down beyond this
+MAX_STACK_INTERVAL = 1.0
+
+
+class StackSampler(threading.Thread):
+    """
+    Agent sampling the stacks of every thread of the program with sys._current_frames().
+
+    Each distinct stack is written once, with an id, to stacks_<pid>.txt, and each sample as
+    "<timestamp ns> <stack id>" to stacks_<pid>_samples.txt, on the measure clock of the tags.
+    The time spent sampling is measured: when it exceeds max_overhead of the elapsed time over
+    a second, the interval is doubled, and it is restored once the overhead is low again.
+    """
+
+    NAME = "stacks"
+
+    def __init__(self, directory: str, interval: float = 0.01, max_overhead: float = 0.02):
+        """
+        Initialize StackSampler.
+
+        Args:
+            directory (str): Folder the stacks, samples and summary files are written to.
+            interval (float): Seconds between samples. Defaults to 10ms.
+            max_overhead (float): Share of the elapsed time the sampling may take. Defaults to 2%.
+        """
+        super().__init__(name=f"{AGENT_THREAD_NAME}-stacks", daemon=True)
+        self._pid = os.getpid()
+        self._directory = directory
+        self._requested_interval = interval
+        self._interval = interval
+        self._max_overhead = max_overhead
+        self._stop_event = threading.Event()
+        self._stacks_file = open(os.path.join(directory, f"{self.NAME}_{self._pid}.txt"), "w")
+        self._samples_file = open(os.path.join(directory, f"{self.NAME}_{self._pid}_samples.txt"), "w")
+        self._stack_ids: Dict[Tuple[str, Tuple[CodeType, ...]], int] = {}
+        self._frame_names: Dict[CodeType, str] = {}
+        self._thread_names: Dict[int, str] = {}
+        # Reported in the summary
+        self._samples = 0
+        self._sampling_time = 0.0
+        self._throttled = 0
+        self._start_time = perf_counter()
+
+    def _frame_name(self, code: CodeType) -> str:
+        name = self._frame_names.get(code)
+        if name is None:
+            qualname = getattr(code, "co_qualname", code.co_name)
+            name = self._frame_names[code] = f"{qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+        return name
+
+    def _thread_name(self, ident: int) -> str:
+        name = self._thread_names.get(ident)
+        if name is None:
+            self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            name = self._thread_names.setdefault(ident, f"thread-{ident}")
+        return name
+
+    def _stack_id(self, ident: int, codes: Tuple[CodeType, ...]) -> int:
+        key = (self._thread_name(ident), codes)
+        stack_id = self._stack_ids.get(key)
+        if stack_id is None:
+            stack_id = self._stack_ids[key] = len(self._stack_ids)
+            # Collapsed format: thread, then the frames from the outermost
+            frames = [key[0]] + [self._frame_name(code) for code in reversed(codes)]
+            self._stacks_file.write(f"{stack_id}\t{';'.join(frames)}\n")
+        return stack_id
+
+    def _sample(self, own_ident: int) -> None:
+        timestamp = clock_gettime_ns(MEASURE_CLOCK)
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            self._samples_file.write(f"{timestamp} {self._stack_id(ident, tuple(codes))}\n")
+        self._samples += 1
+
+    def run(self) -> None:
+        # Python only names the kernel thread from 3.14 on, the thread samplers skip it by this name
+        try:
+            with open(f"/proc/self/task/{threading.get_native_id()}/comm", "w") as comm_file:
+                comm_file.write(AGENT_THREAD_NAME)
+        except OSError:
+            pass
+        own_ident = threading.get_ident()
+        window_start, window_sampling = perf_counter(), 0.0
+        while not self._stop_event.wait(self._interval):
+            sample_start = perf_counter()
+            self._sample(own_ident=own_ident)
+            sample_end = perf_counter()
+            self._sampling_time += sample_end - sample_start
+            window_sampling += sample_end - sample_start
+            if sample_end - window_start < OVERHEAD_WINDOW:
+                continue
+            # Keep the overhead bounded, and come back to the requested rate once it allows it
+            overhead = window_sampling / (sample_end - window_start)
+            if overhead > self._max_overhead and self._interval < MAX_STACK_INTERVAL:
+                self._interval = min(self._interval * 2, MAX_STACK_INTERVAL)
+                self._throttled += 1
+            elif overhead < self._max_overhead / 4 and self._interval > self._requested_interval:
+                self._interval = max(self._interval / 2, self._requested_interval)
+            window_start, window_sampling = sample_end, 0.0
+
+    def stop(self) -> None:
+        """
+        Stop sampling and write the summary of the agent.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        self._stacks_file.close()
+        self._samples_file.close()
+        elapsed = perf_counter() - self._start_time
+        summary = {
+            "pid": self._pid,
+            "samples": self._samples,
+            "stacks": len(self._stack_ids),
+            "requested_interval": self._requested_interval,
+            "interval": self._interval,
+            "throttled": self._throttled,
+            "sampling_seconds": self._sampling_time,
+            "elapsed_seconds": elapsed,
+            "overhead": self._sampling_time / elapsed if elapsed > 0 else 0.0,
+        }
+        with open(os.path.join(self._directory, f"{self.NAME}_{self._pid}_summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+
+def read_windows(program_output_file: str, start_label: str = "start_", finish_label: str = "finish_") -> List[Tuple[str, int, Optional[int]]]:
+    """
+    Read the windows delimited by the start/finish tags of a program output.
+
+    Args:
+        program_output_file (str): Path to the program output.
+        start_label (str): The starting label prefix. Defaults to "start_".
+        finish_label (str): The finishing label prefix. Defaults to "finish_".
+
+    Returns:
+        List[Tuple[str, int, Optional[int]]]: Task, start and finish (None if never closed) of each window,
+        in nanoseconds of the measure clock, by start.
+    """
+    windows: List[Tuple[str, int, Optional[int]]] = []
+    # Index of the open windows of each task, a repeated plain tag closes its last start
+    open_windows: Dict[str, List[int]] = {}
+    with open(program_output_file, errors="replace") as output_file:
+        for line in output_file:
+            if not line.startswith(PREFIX_MEASURE_TAG) or line.startswith((PREFIX_MEASURE_TAG_FILE_NAME, PREFIX_MEASURE_TAG_RUN_INFO)):
+                continue
+            label, _, timestamp = line.strip().rpartition(": ")
+            label = label[len(PREFIX_MEASURE_TAG):]
+            try:
+                timestamp = int(timestamp)
+            except ValueError:
+                continue
+            if label.startswith(start_label):
+                task = label[len(start_label):]
+                open_windows.setdefault(task, []).append(len(windows))
+                windows.append((task, timestamp, None))
+            elif label.startswith(finish_label) and open_windows.get(label[len(finish_label):]):
+                index = open_windows[label[len(finish_label):]].pop()
+                windows[index] = (windows[index][0], windows[index][1], timestamp)
+    return sorted(windows, key=lambda window: window[1])
+
+
+def collapse_stacks(directory: str, program_output_file: str, output_path: str, main_pid: Optional[int] = None) -> int:
+    """
+    Aggregate the stack samples of the agent into collapsed stack counts per window, for flame graphs.
+
+    Each sample is counted under the innermost window it falls in: the frames of the stacks
+    start with the path of the window (a measure() path gives one frame per region), then the
+    thread. Samples outside every window have no window frames.
+
+    Args:
+        directory (str): Folder of the agent files.
+        program_output_file (str): Path to the program output with the tags.
+        output_path (str): Path of the collapsed stacks file ("<frames> <count>" per line).
+        main_pid (int, optional): PID of the profiled process. The stacks of other processes (children) start with their PID.
+
+    Returns:
+        int: Number of stack samples aggregated.
+    """
+    windows = read_windows(program_output_file=program_output_file)
+    samples: List[Tuple[int, str]] = []
+    for stacks_path in glob.glob(os.path.join(directory, f"{StackSampler.NAME}_*.txt")):
+        pid = os.path.basename(stacks_path)[len(StackSampler.NAME) + 1:-len(".txt")]
+        if not pid.isdigit():
+            continue
+        with open(stacks_path) as stacks_file:
+            stacks = dict(line.rstrip("\n").split("\t", 1) for line in stacks_file if "\t" in line)
+        prefix = "" if main_pid is None or int(pid) == main_pid else f"process {pid};"
+        with open(os.path.join(directory, f"{StackSampler.NAME}_{pid}_samples.txt")) as samples_file:
+            for line in samples_file:
+                timestamp, _, stack_id = line.strip().partition(" ")
+                # The last line may be cut if the process was killed
+                if stack_id in stacks:
+                    samples.append((int(timestamp), prefix + stacks[stack_id]))
+    samples.sort(key=lambda sample: sample[0])
+
+    counts: Counter = Counter()
+    next_window = 0
+    # Windows started before the current sample and not finished yet, by start
+    open_windows: List[Tuple[str, int, Optional[int]]] = []
+    for timestamp, stack in samples:
+        while next_window < len(windows) and windows[next_window][1] <= timestamp:
+            open_windows.append(windows[next_window])
+            next_window += 1
+        open_windows = [window for window in open_windows if window[2] is None or window[2] >= timestamp]
+        if open_windows:
+            window_frames = ";".join(open_windows[-1][0].split(MEASURE_PATH_SEPARATOR))
+            stack = f"{window_frames};{stack}"
+        counts[stack] += 1
+
+    with open(output_path, "w") as output_file:
+        for stack, count in sorted(counts.items()):
+            output_file.write(f"{stack} {count}\n")
+    return len(samples)
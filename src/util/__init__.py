@@ -1,5 +1,5 @@
-from .datetime_helper import DatetimeHelper
+from .datetime_helper import MEASURE_CLOCK_NAME, DatetimeHelper
 from .file_writer_csv import FileWriterCsv
 from .file_writer_txt import FileWriterTxt
 from .logger import logger
-from .processes_handler import run_c_process, run_python_process
+from .processes_handler import parse_cpu_list, run_c_process, run_python_process
@@ -1,5 +1,8 @@
 from datetime import datetime
-from typing import Union
+from typing import Any, Dict, Union
+import time
+
+from src.const import MEASURE_CLOCK, MEASURE_CLOCK_NAME
 
 
 class DatetimeHelper:
@@ -31,3 +34,27 @@ class DatetimeHelper:
             str: Current datetime string.
         """
         return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    @staticmethod
+    def clock_ns() -> int:
+        """
+        Get the current time of the measure clock, used to timestamp the samples and the tags.
+
+        Returns:
+            int: Nanoseconds of MEASURE_CLOCK (since the boot on Linux).
+        """
+        return time.clock_gettime_ns(MEASURE_CLOCK)
+
+    @staticmethod
+    def clock_anchor() -> Dict[str, Any]:
+        """
+        Read the measure clock and the wall clock together, to display measure clock times as datetimes.
+
+        Returns:
+            Dict[str, Any]: "clock" name, "clock_ns" time and the matching "wall_time" in seconds from the epoch.
+        """
+        # The wall clock is read between two clock reads, and matched with their midpoint
+        before = time.clock_gettime_ns(MEASURE_CLOCK)
+        wall_time = time.time()
+        after = time.clock_gettime_ns(MEASURE_CLOCK)
+        return {"clock": MEASURE_CLOCK_NAME, "clock_ns": (before + after) // 2, "wall_time": wall_time}
@@ -24,6 +24,12 @@ class FileWriterCsv:
         """
         return len(self._columns) > 0
 
+    def have_rows(self) -> bool:
+        """
+        Check if rows were already appended.
+        """
+        return len(self._rows) > 0
+
     def set_columns(self, columns: List[str]) -> None:
         """
         Set the column names for the DataFrame.
@@ -74,11 +80,14 @@ class FileWriterCsv:
                 raise ValueError(f"Column '{column_name}' does not exist in the data.")
         self._rows.sort(key=lambda row: tuple(row[self._columns.index(col)] for col in columns))
 
-    def write_to_csv(self) -> None:
+    def write_to_csv(self, allow_empty: bool = False) -> None:
         """
         Write the data to a CSV file.
+
+        Args:
+            allow_empty (bool, optional): Write only the header when there is no data, instead of raising. Defaults to False.
         """
-        if not self._rows:
+        if not self._rows and not allow_empty:
             raise ValueError("No data to write.")
         
         directory = os.path.dirname(self._file_path)
@@ -1,11 +1,52 @@
 import os
 import subprocess
-from typing import List
+from typing import Callable, Dict, List, Optional, Sequence
 
 from . import logger
 
 
-def run_python_process(file_or_module: str, is_module: bool, args: List[str] = []) -> subprocess.Popen:
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """
+    Parse a CPU list in the kernel format (e.g. "0-3,6").
+
+    Args:
+        cpu_list (str): Comma separated CPU ids and ranges.
+
+    Returns:
+        List[int]: Sorted CPU ids.
+    """
+    cpus = set()
+    for part in cpu_list.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def _pin_to_cpus(cpus: Optional[Sequence[int]]) -> Optional[Callable[[], None]]:
+    """
+    Build a hook pinning the child process to the given CPUs before it starts.
+    """
+    if not cpus:
+        return None
+    return lambda: os.sched_setaffinity(0, cpus)
+
+
+def _environment(env: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """
+    Build the environment of the child process: the current one plus the given variables.
+    """
+    if not env:
+        return None
+    return {**os.environ, **env}
+
+
+def run_python_process(file_or_module: str, is_module: bool, args: List[str] = [], python_executable: str = "python3", cpus: Optional[Sequence[int]] = None, unbuffered: bool = False, env: Optional[Dict[str, str]] = None, import_time: bool = False, stderr: Optional[int] = None) -> subprocess.Popen:
     """
     Run a Python process.
 
@@ -13,6 +54,12 @@ def run_python_process(file_or_module: str, is_module: bool, args: List[str] = [
         file_or_module (str): Name of the file or module to run.
         is_module (bool): Flag indicating whether the provided input is a module.
         args (List[str], optional): List of terminal arguments to pass to the program. Default is [].
+        python_executable (str, optional): Interpreter used to run the program. Default is "python3".
+        cpus (Sequence[int], optional): CPUs the program is pinned to. Default is no pinning.
+        unbuffered (bool, optional): Run with unbuffered output, so each line is read as soon as it is printed. Default is False.
+        env (Dict[str, str], optional): Variables added to the environment of the program. Default is none.
+        import_time (bool, optional): Print the time of each import to the standard error (-X importtime). Default is False.
+        stderr (int, optional): File descriptor the standard error is redirected to. Default is the one of the profiler.
 
     Returns:
         subprocess.Popen: Popen object representing the running process.
@@ -24,21 +71,26 @@ def run_python_process(file_or_module: str, is_module: bool, args: List[str] = [
         exit()
 
     # Run the process and get PID
+    interpreter = [python_executable, "-u"] if unbuffered else [python_executable]
+    if import_time:
+        interpreter += ["-X", "importtime"]
     if is_module:
-        command = ["python3", "-m", file_or_module, *args]
+        command = [*interpreter, "-m", file_or_module, *args]
     else:
-        command = ["python3", file_or_module, *args]
+        command = [*interpreter, file_or_module, *args]
 
-    return subprocess.Popen(command, stdout=subprocess.PIPE, shell=False)
+    return subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, shell=False, preexec_fn=_pin_to_cpus(cpus), env=_environment(env))
 
 
-def run_c_process(executable_path: str, args: List[str] = []) -> subprocess.Popen:
+def run_c_process(executable_path: str, args: List[str] = [], cpus: Optional[Sequence[int]] = None, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
     """
     Run a compiled C binary.
 
     Args:
         executable_path (str): Path to the executable file.
         args (List[str], optional): List of arguments to pass to the program. Default is [].
+        cpus (Sequence[int], optional): CPUs the program is pinned to. Default is no pinning.
+        env (Dict[str, str], optional): Variables added to the environment of the program. Default is none.
 
     Returns:
         subprocess.Popen: Popen object representing the running process.
@@ -48,4 +100,4 @@ def run_c_process(executable_path: str, args: List[str] = []) -> subprocess.Pope
         exit()
 
     command = [executable_path, *args]
-    return subprocess.Popen(command, stdout=subprocess.PIPE, shell=False)
+    return subprocess.Popen(command, stdout=subprocess.PIPE, shell=False, preexec_fn=_pin_to_cpus(cpus), env=_environment(env))
@@ -0,0 +1,103 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.client_interface.process_results import FileStats
+from ....util import logger
+from ..process_results.bootstrap import bootstrap_mean_intervals
+
+# Metrics whose confidence intervals decide when a variant has enough runs
+CONFIDENCE_METRICS = ("uptime", "energy_delta")
+
+
+def run_metrics(preprocessed_path: str, task_label: str) -> Optional[Dict[str, float]]:
+    """
+    Read the task metrics of a profiled run, as the results processing computes them.
+
+    Args:
+        preprocessed_path (str): Path to the preprocessed stats CSV.
+        task_label (str): Task label of the start_<label>/finish_<label> tags.
+
+    Returns:
+        Optional[Dict[str, float]]: "uptime" and "energy_delta" of the task window. None if the window is missing.
+    """
+    try:
+        file_stats = FileStats(file_path=preprocessed_path)
+        uptime = file_stats.get_times(start_label="start_", finish_label="finish_")[task_label]
+        *_ignored, energy_min, energy_max = file_stats.get_min_max_memory_stats(start_label=f"start_{task_label}", finish_label=f"finish_{task_label}")
+    except Exception as excep:
+        logger.warning(f"Unable to read the {task_label} metrics of {preprocessed_path}: {excep}")
+        return None
+    return {"uptime": float(uptime), "energy_delta": float(energy_max - energy_min)}
+
+
+class ConfidenceTracker:
+    """
+    Bootstrap confidence intervals of the mean of each metric, per variant, updated run by run.
+
+    A variant has enough runs once the relative half-width of every metric interval
+    (half-width / |mean|) is below the target, with at least min_runs runs, or once
+    it reaches max_runs runs.
+    """
+
+    def __init__(self, target: float = 0.02, min_runs: int = 3, max_runs: int = 20, metrics: Sequence[str] = CONFIDENCE_METRICS, confidence: float = 0.95, n_resamples: int = 2000):
+        """
+        Initialize ConfidenceTracker.
+
+        Args:
+            target (float): Relative half-width to reach. Defaults to 0.02 (±2%).
+            min_runs (int): Runs always done per variant. Defaults to 3.
+            max_runs (int): Runs never exceeded per variant. Defaults to 20.
+            metrics (Sequence[str]): Metrics that must reach the target. Defaults to uptime and energy_delta.
+            confidence (float): Confidence level of the intervals. Defaults to 0.95.
+            n_resamples (int): Bootstrap resamples per update. Defaults to 2000.
+        """
+        self._target = target
+        self._min_runs = max(2, min_runs)
+        self._max_runs = max(self._min_runs, max_runs)
+        self._metrics = list(metrics)
+        self._confidence = confidence
+        self._n_resamples = n_resamples
+        self._samples: Dict[str, List[List[float]]] = {}
+        self._runs: Dict[str, int] = {}
+
+    @property
+    def max_runs(self) -> int:
+        """Runs never exceeded per variant."""
+        return self._max_runs
+
+    def runs(self, key: str) -> int:
+        """
+        Get the number of finished runs of a variant, failed ones included.
+        """
+        return self._runs.get(key, 0)
+
+    def add(self, key: str, metrics: Optional[Dict[str, float]]) -> None:
+        """
+        Record a finished run of a variant. Runs without metrics count towards max_runs only.
+        """
+        self._runs[key] = self._runs.get(key, 0) + 1
+        if metrics is not None:
+            self._samples.setdefault(key, []).append([metrics.get(metric, np.nan) for metric in self._metrics])
+
+    def relative_half_widths(self, key: str) -> Dict[str, float]:
+        """
+        Get the relative half-width of the interval of each metric of a variant (inf with fewer than two runs).
+        """
+        samples = self._samples.get(key, [])
+        if len(samples) < 2:
+            return {metric: np.inf for metric in self._metrics}
+        point, low, high = bootstrap_mean_intervals(samples=np.array(samples, dtype=float)[None, :, :], n_resamples=self._n_resamples, confidence=self._confidence, method="percentile")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            widths = (high[0] - low[0]) / 2 / np.abs(point[0])
+        return {metric: float(width) if np.isfinite(width) else np.inf for metric, width in zip(self._metrics, widths)}
+
+    def is_done(self, key: str) -> bool:
+        """
+        Whether a variant has enough runs.
+        """
+        if self.runs(key) >= self._max_runs:
+            return True
+        if len(self._samples.get(key, [])) < self._min_runs:
+            return False
+        return all(width <= self._target for width in self.relative_half_widths(key).values())
@@ -0,0 +1,136 @@
+from statistics import mean
+from time import monotonic, sleep
+from typing import List, Optional, Tuple
+
+from src.system_stats_collector import SystemStatsCollector
+from src.system_stats_collector.energy_stats_collector import EnergyStatsCollector
+from ....util import logger
+
+
+class AdaptiveCooldown:
+    """
+    Cooldown between profiles that waits only until the machine is back to idle.
+
+    A baseline of the idle power (RAPL) and CPU package temperature is measured before the
+    campaign. After each profile, both are polled until they stay within a tolerance of the
+    baseline for a few consecutive polls, or until the maximum wait (the old fixed sleep).
+    Without any sensor available the maximum wait is always used.
+    """
+
+    def __init__(self, max_wait: float = 60.0, poll_interval: float = 1.0, power_tolerance: float = 0.1, temperature_tolerance: float = 2.0, stable_polls: int = 3):
+        """
+        Initialize AdaptiveCooldown.
+
+        Args:
+            max_wait (float): Maximum seconds to wait after a profile. Defaults to 60.
+            poll_interval (float): Seconds between two sensor polls. Defaults to 1.
+            power_tolerance (float): Allowed relative excess of power over the baseline. Defaults to 0.1 (10%).
+            temperature_tolerance (float): Allowed excess of temperature over the baseline in °C. Defaults to 2.
+            stable_polls (int): Consecutive polls within tolerance needed to stop waiting. Defaults to 3.
+        """
+        self._max_wait = max_wait
+        self._poll_interval = poll_interval
+        self._power_tolerance = power_tolerance
+        self._temperature_tolerance = temperature_tolerance
+        self._stable_polls = stable_polls
+        self._baseline_power: Optional[float] = None
+        self._baseline_temperature: Optional[float] = None
+        self._total_wait = 0.0
+        self._num_cooldowns = 0
+
+        try:
+            self._energy_collector: Optional[EnergyStatsCollector] = EnergyStatsCollector()
+        except RuntimeError as excep:
+            logger.warning(f"Idle power unavailable for the cooldown: {excep}")
+            self._energy_collector = None
+
+    @property
+    def total_wait(self) -> float:
+        """Seconds spent cooling down."""
+        return self._total_wait
+
+    @property
+    def time_saved(self) -> float:
+        """Seconds saved compared to waiting the maximum after every profile."""
+        return self._num_cooldowns * self._max_wait - self._total_wait
+
+    def close(self) -> None:
+        """
+        Release the energy counter.
+        """
+        if self._energy_collector is not None:
+            self._energy_collector.close()
+
+    def _poll(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Measure the average power over one poll interval and the current temperature.
+
+        Returns:
+            Tuple[Optional[float], Optional[float]]: Power in W and temperature in °C, None when unavailable.
+        """
+        if self._energy_collector is None:
+            sleep(self._poll_interval)
+            return None, SystemStatsCollector.get_cpu_temperature()
+
+        start_time, start_energy = monotonic(), self._energy_collector.read_energy()
+        sleep(self._poll_interval)
+        end_time, end_energy = monotonic(), self._energy_collector.read_energy()
+        power = self._energy_collector.energy_delta_uj(start_energy_uj=start_energy, end_energy_uj=end_energy) / 1e6 / (end_time - start_time)
+        return power, SystemStatsCollector.get_cpu_temperature()
+
+    def measure_baseline(self, duration: float = 10.0) -> None:
+        """
+        Measure the idle power and temperature the cooldowns wait for. Run it on an idle machine.
+
+        Args:
+            duration (float): Seconds to measure. Defaults to 10.
+        """
+        powers: List[float] = []
+        temperatures: List[float] = []
+        for _ in range(max(1, round(duration / self._poll_interval))):
+            power, temperature = self._poll()
+            if power is not None:
+                powers.append(power)
+            if temperature is not None:
+                temperatures.append(temperature)
+        self._baseline_power = mean(powers) if powers else None
+        self._baseline_temperature = mean(temperatures) if temperatures else None
+
+        if self._baseline_power is None and self._baseline_temperature is None:
+            logger.warning(f"No power or temperature sensors available, cooling down for a fixed {self._max_wait}s")
+        else:
+            power_str = f"{self._baseline_power:.2f} W" if self._baseline_power is not None else "n/a"
+            temperature_str = f"{self._baseline_temperature:.1f} °C" if self._baseline_temperature is not None else "n/a"
+            logger.info(f"Idle baseline: power {power_str}, temperature {temperature_str}")
+
+    def _is_idle(self, power: Optional[float], temperature: Optional[float]) -> bool:
+        # Sensors without a baseline or reading do not constrain the wait
+        if self._baseline_power is not None and power is not None and power > self._baseline_power * (1 + self._power_tolerance):
+            return False
+        if self._baseline_temperature is not None and temperature is not None and temperature > self._baseline_temperature + self._temperature_tolerance:
+            return False
+        return True
+
+    def wait(self) -> float:
+        """
+        Wait until the machine is back to its idle baseline.
+
+        Returns:
+            float: Seconds waited.
+        """
+        start_time = monotonic()
+        if self._baseline_power is None and self._baseline_temperature is None:
+            sleep(self._max_wait)
+        else:
+            stable = 0
+            while monotonic() - start_time < self._max_wait:
+                power, temperature = self._poll()
+                stable = stable + 1 if self._is_idle(power=power, temperature=temperature) else 0
+                if stable >= self._stable_polls:
+                    break
+
+        waited = monotonic() - start_time
+        self._total_wait += waited
+        self._num_cooldowns += 1
+        logger.info(f"Cooled down in {waited:.1f}s (max {self._max_wait}s)")
+        return waited
@@ -0,0 +1,164 @@
+from typing import Any, Dict, List, Optional
+import json
+import os
+
+from src.util import DatetimeHelper
+
+# States of a run in the journal
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUSES = (STATUS_PENDING, STATUS_RUNNING, STATUS_COMPLETED, STATUS_FAILED)
+
+
+class CampaignJournal:
+    """
+    Persistent state of the runs of a campaign.
+
+    Every state change is written to disk atomically (temporary file + rename), so the
+    journal always reflects the last finished step even if the campaign is killed. A run
+    left "running" was interrupted and is retried on resume, like a "failed" one.
+    """
+
+    def __init__(self, journal_path: str):
+        """
+        Initialize CampaignJournal, loading the journal file if it exists.
+
+        Args:
+            journal_path (str): Path to the JSON journal.
+        """
+        self._journal_path = journal_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Settings the campaign must keep when resumed (e.g. the seed of its schedule)
+        self._settings: Dict[str, Any] = {}
+        if os.path.exists(journal_path):
+            with open(journal_path) as journal_file:
+                journal = json.load(journal_file)
+            self._entries = journal.get("runs", {})
+            self._settings = journal.get("settings", {})
+
+    @property
+    def journal_path(self) -> str:
+        """Path to the JSON journal."""
+        return self._journal_path
+
+    @property
+    def exists(self) -> bool:
+        """Whether the journal already holds runs."""
+        return bool(self._entries)
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Settings recorded by the campaign."""
+        return dict(self._settings)
+
+    def record_settings(self, **settings: Any) -> None:
+        """
+        Record settings of the campaign, to reuse them when it is resumed.
+        """
+        self._settings.update(settings)
+        self._write()
+
+    @staticmethod
+    def run_key(run: Dict[str, Any]) -> str:
+        """
+        Identify a run by its scenario, parameters, flavor and run id.
+        """
+        return f"{run['scenario']}|{json.dumps(run['parameters'], sort_keys=True)}|{run.get('flavor')}|{run.get('run_id')}"
+
+    def status(self, run: Dict[str, Any]) -> str:
+        """
+        Get the state of a run, "pending" if it is not in the journal.
+        """
+        return self._entries.get(self.run_key(run), {}).get("status", STATUS_PENDING)
+
+    def entry(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the journal entry of a run, empty if it is not in the journal.
+        """
+        return dict(self._entries.get(self.run_key(run), {}))
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Get the journal entries of all the runs.
+        """
+        return list(self._entries.values())
+
+    def _write(self) -> None:
+        """
+        Atomically replace the journal file with the current state.
+        """
+        directory = os.path.dirname(self._journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self._journal_path}.tmp"
+        with open(tmp_path, "w") as tmp_file:
+            json.dump({"settings": self._settings, "runs": self._entries}, tmp_file, indent=2)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, self._journal_path)
+
+    def register(self, runs: List[Dict[str, Any]]) -> None:
+        """
+        Add the runs of the campaign that are not in the journal yet as pending.
+        """
+        for run in runs:
+            self._entries.setdefault(
+                self.run_key(run),
+                {
+                    "group": run["group"],
+                    "scenario": run["scenario"],
+                    "parameters": run["parameters"],
+                    "flavor": run.get("flavor"),
+                    "python": run.get("python"),
+                    "run_id": run.get("run_id"),
+                    "status": STATUS_PENDING,
+                    "attempts": 0,
+                },
+            )
+        self._write()
+
+    def _update(self, run: Dict[str, Any], **fields: Any) -> None:
+        self._entries[self.run_key(run)].update(fields)
+        self._write()
+
+    def mark_running(self, run: Dict[str, Any], stats_path: str, output_path: str) -> None:
+        """
+        Record that a run started, with its position in the schedule and the paths of its raw files.
+        """
+        attempts = self._entries[self.run_key(run)].get("attempts", 0) + 1
+        self._update(
+            run,
+            status=STATUS_RUNNING,
+            attempts=attempts,
+            position=run.get("position"),
+            started_at=DatetimeHelper.current_datetime().isoformat(),
+            finished_at=None,
+            stats_path=stats_path,
+            output_path=output_path,
+            preprocessed_path=None,
+            placement=None,
+            error=None,
+        )
+
+    def mark_completed(self, run: Dict[str, Any], preprocessed_path: str, placement: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record that a run finished successfully, with the path of its preprocessed stats and the CPUs it ran on.
+        """
+        self._update(run, status=STATUS_COMPLETED, finished_at=DatetimeHelper.current_datetime().isoformat(), preprocessed_path=preprocessed_path, placement=placement)
+
+    def mark_failed(self, run: Dict[str, Any], error: str, placement: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record that a run failed and why.
+        """
+        self._update(run, status=STATUS_FAILED, finished_at=DatetimeHelper.current_datetime().isoformat(), error=error, placement=placement)
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Count the runs in each state.
+        """
+        counts = {status: 0 for status in STATUSES}
+        for entry in self._entries.values():
+            counts[entry["status"]] += 1
+        return counts
@@ -0,0 +1,322 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+from time import monotonic
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.const import CATALOG_FILE_PATH, RESULTS_FILE_FOLDER
+from src.profile_session import ProfileSession
+from src.util import parse_cpu_list
+from ....util import logger
+from .convergence import CONFIDENCE_METRICS, ConfidenceTracker, run_metrics
+from .cooldown import AdaptiveCooldown
+from .journal import STATUS_COMPLETED, STATUS_FAILED, STATUS_RUNNING, CampaignJournal
+from .manifest import DEFAULT_MANIFEST_PATH, expand_runs, load_manifest, script_args
+from .schedule import SCHEDULES, schedule_runs
+
+JOURNALS_FOLDER = f"{RESULTS_FILE_FOLDER}/journals"
+
+
+def _format_duration(seconds: float) -> str:
+    hours, remainder = divmod(int(round(seconds)), 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s"
+
+
+def probe_flavor(python_executable: str) -> str:
+    """
+    Ask an interpreter for its flavor (gil or nogil), as the scenarios compute it.
+
+    Args:
+        python_executable (str): Interpreter to probe.
+
+    Returns:
+        str: Flavor of the interpreter. Its name when the interpreter cannot tell.
+    """
+    command = [python_executable, "-c", "from test_cases.util.runtime import runtime_flavor_suffix; print(runtime_flavor_suffix())"]
+    probe = subprocess.run(command, capture_output=True, text=True)
+    if probe.returncode != 0:
+        logger.warning(f"Unable to probe the flavor of {python_executable}: {probe.stderr.strip().splitlines()[-1:]}")
+        return os.path.basename(python_executable)
+    return probe.stdout.strip()
+
+
+def default_journal_path(run_id: Optional[str], groups: Optional[List[str]], scenarios: Optional[List[str]], flavors: Sequence[str], resume: bool = False) -> str:
+    """
+    Path of the journal of a campaign, named after its run id, groups, scenarios and flavors.
+
+    With a run id, the campaign has a single journal. Without one, every new campaign gets its own
+    journal (suffixed like the execution ids), and resuming continues the last one.
+
+    Args:
+        run_id (str, optional): Run index passed to the scenarios.
+        groups (List[str], optional): Groups of the campaign, None for all.
+        scenarios (List[str], optional): Scenarios of the campaign, None for all.
+        flavors (Sequence[str]): Flavors of the interpreters of the campaign.
+        resume (bool): Whether the campaign continues an existing journal. Defaults to False.
+
+    Returns:
+        str: Path of the journal.
+    """
+    selection = "_".join(["+".join(sorted(groups)) if groups else "all", "+".join(sorted(scenarios)) if scenarios else "all", "+".join(sorted(flavors))])
+    base = f"{JOURNALS_FOLDER}/campaign_run{run_id}_{selection}" if run_id is not None else f"{JOURNALS_FOLDER}/campaign_{selection}"
+    if run_id is not None:
+        return f"{base}.json"
+    candidate, latest, suffix = f"{base}.json", None, 0
+    while os.path.exists(candidate):
+        latest = candidate
+        suffix += 1
+        candidate = f"{base}_{suffix}.json"
+    return (latest or candidate) if resume else candidate
+
+
+def split_cpus(target_cpus: Optional[List[int]], profiler_cpus: Optional[List[int]], pin: bool) -> Tuple[Optional[List[int]], Optional[List[int]]]:
+    """
+    Resolve the CPU sets of the programs and the profiler.
+
+    With pin, sets not given explicitly are derived from the CPUs this process may use:
+    the profiler gets the first one and the programs the others.
+
+    Returns:
+        Tuple[Optional[List[int]], Optional[List[int]]]: Target and profiler CPUs, None for no pinning.
+    """
+    if not pin:
+        return target_cpus, profiler_cpus
+    available = sorted(os.sched_getaffinity(0))
+    if len(available) < 2 and not (target_cpus and profiler_cpus):
+        logger.warning(f"Only {len(available)} CPU available, pinning disabled")
+        return None, None
+    profiler_cpus = profiler_cpus or [cpu for cpu in available if cpu not in (target_cpus or [])][:1]
+    target_cpus = target_cpus or [cpu for cpu in available if cpu not in profiler_cpus]
+    return target_cpus, profiler_cpus
+
+
+def log_status(journal: CampaignJournal) -> None:
+    """
+    Log how many runs of the campaign are in each state and which ones failed.
+    """
+    counts = journal.summary()
+    logger.info(f"Campaign status ({journal.journal_path}): " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+    for entry in journal.entries():
+        if entry["status"] in (STATUS_FAILED, STATUS_RUNNING):
+            reason = entry.get("error") or "interrupted"
+            logger.warning(f"{entry['status']}: {entry['scenario']} {entry['parameters']} [{entry['flavor']}, run {entry['run_id']}] after {entry['attempts']} attempt(s): {reason}")
+
+
+class Campaign:
+    """
+    Profile every run of a manifest, cooling down between profiles.
+    """
+
+    def __init__(self, runs: List[Dict[str, Any]], cooldown: AdaptiveCooldown, journal: CampaignJournal, catalog_path: str = CATALOG_FILE_PATH, target_cpus: Optional[Sequence[int]] = None, profiler_cpus: Optional[Sequence[int]] = None):
+        """
+        Initialize Campaign.
+
+        Args:
+            runs (List[Dict[str, Any]]): Runs to profile in execution order, with their interpreter ("python"), flavor and run id.
+            cooldown (AdaptiveCooldown): Cooldown applied between profiles.
+            journal (CampaignJournal): Journal recording the state of every run.
+            catalog_path (str): Results catalog the runs are registered in.
+            target_cpus (Sequence[int], optional): CPUs the scenarios are pinned to.
+            profiler_cpus (Sequence[int], optional): CPUs the profiler is pinned to.
+        """
+        self._runs = runs
+        self._cooldown = cooldown
+        self._journal = journal
+        self._catalog_path = catalog_path
+        self._target_cpus = target_cpus
+        self._profiler_cpus = profiler_cpus
+
+    def _profile(self, run: Dict[str, Any]) -> Optional[str]:
+        """
+        Profile a single run, recording its progress in the journal.
+
+        Returns:
+            Optional[str]: Path of the preprocessed stats CSV, None if the run failed.
+        """
+        args = script_args(run["parameters"])
+        if run.get("run_id") is not None:
+            args += ["--run_idx", str(run["run_id"])]
+        session = ProfileSession(
+            file_to_run=run["module"],
+            is_module=True,
+            script_args=args,
+            python_executable=run["python"],
+            catalog_path=self._catalog_path,
+            target_cpus=self._target_cpus,
+            profiler_cpus=self._profiler_cpus,
+        )
+        self._journal.mark_running(run, stats_path=session.stats_path, output_path=session.output_path)
+        try:
+            preprocessed_path = session.run()
+        except Exception as excep:
+            logger.error(f"{run['scenario']} failed: {excep}")
+            self._journal.mark_failed(run, error=f"{type(excep).__name__}: {excep}", placement=session.placement)
+            return None
+        if session.returncode:
+            logger.warning(f"{run['scenario']} exited with code {session.returncode}")
+            self._journal.mark_failed(run, error=f"exit code {session.returncode}", placement=session.placement)
+            return None
+        self._journal.mark_completed(run, preprocessed_path=preprocessed_path, placement=session.placement)
+        return preprocessed_path
+
+    def run(self) -> None:
+        """
+        Profile the runs not completed yet and report the time saved by the adaptive cooldown.
+        """
+        self._journal.register(self._runs)
+        pending = [run for run in self._runs if self._journal.status(run) != STATUS_COMPLETED]
+        if len(pending) < len(self._runs):
+            logger.info(f"Skipping {len(self._runs) - len(pending)} completed runs")
+
+        campaign_start = monotonic()
+        for idx, run in enumerate(pending):
+            logger.info(f"[{idx + 1}/{len(pending)}] {run['group']}/{run['scenario']} {run['parameters']} ({run['flavor']})")
+            self._profile(run=run)
+            # Nothing left to cool down for after the last profile
+            if idx < len(pending) - 1:
+                self._cooldown.wait()
+
+        self._log_summary(profiles=len(pending), elapsed=monotonic() - campaign_start)
+
+    def _log_summary(self, profiles: int, elapsed: float) -> None:
+        logger.info(
+            f"Campaign of {profiles} profiles finished in {_format_duration(elapsed)}, "
+            f"{_format_duration(self._cooldown.total_wait)} cooling down. "
+            f"Time saved over fixed cooldowns: {_format_duration(self._cooldown.time_saved)}"
+        )
+        log_status(self._journal)
+
+    @staticmethod
+    def _repetition(run: Dict[str, Any], repetition: int, position: int) -> Dict[str, Any]:
+        # Repetitions are told apart by their run id, suffixed to the campaign run id if any
+        run_id = f"{run['run_id']}.{repetition}" if run.get("run_id") is not None else str(repetition)
+        return {**run, "run_id": run_id, "position": position}
+
+    def run_until_confident(self, tracker: ConfidenceTracker) -> None:
+        """
+        Repeat each (scenario, variant) until the confidence intervals of its metrics are narrow enough.
+
+        The variants are taken in turn, in schedule order. Each round profiles once every flavor
+        of the variant that still needs runs, then updates its intervals, so the flavors are
+        compared under the same conditions. Completed repetitions of a resumed campaign are
+        not profiled again, their metrics are read back from their preprocessed stats.
+
+        Args:
+            tracker (ConfidenceTracker): Stopping rule of the repetitions.
+        """
+        variants: Dict[str, List[Dict[str, Any]]] = {}
+        for run in self._runs:
+            variants.setdefault(f"{run['scenario']}|{json.dumps(run['parameters'], sort_keys=True)}", []).append(run)
+
+        campaign_start = monotonic()
+        profiles = position = 0
+        for idx, flavor_runs in enumerate(variants.values()):
+            first = flavor_runs[0]
+            logger.info(f"[{idx + 1}/{len(variants)}] {first['group']}/{first['scenario']} {first['parameters']}")
+            for repetition in range(1, tracker.max_runs + 1):
+                active = [run for run in flavor_runs if not tracker.is_done(CampaignJournal.run_key(run))]
+                if not active:
+                    break
+                for run in active:
+                    repetition_run = self._repetition(run=run, repetition=repetition, position=position)
+                    position += 1
+                    self._journal.register([repetition_run])
+                    if self._journal.status(repetition_run) == STATUS_COMPLETED:
+                        preprocessed_path = self._journal.entry(repetition_run)["preprocessed_path"]
+                    else:
+                        # Cool down before every profile but the first one
+                        if profiles:
+                            self._cooldown.wait()
+                        preprocessed_path = self._profile(run=repetition_run)
+                        profiles += 1
+                    metrics = run_metrics(preprocessed_path=preprocessed_path, task_label=run["task_label"]) if preprocessed_path else None
+                    tracker.add(CampaignJournal.run_key(run), metrics)
+
+            for run in flavor_runs:
+                widths = tracker.relative_half_widths(CampaignJournal.run_key(run))
+                logger.info(f"  {run['flavor']}: {tracker.runs(CampaignJournal.run_key(run))} runs, CI half-width " + ", ".join(f"{metric} ±{width:.1%}" for metric, width in widths.items()))
+
+        self._log_summary(profiles=profiles, elapsed=monotonic() - campaign_start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the energy consumption scenarios described by a manifest.")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH, help="Path to the JSON campaign manifest.")
+    parser.add_argument("--groups", nargs="+", help="Only profile the scenarios of these groups (e.g. threads_numerical).")
+    parser.add_argument("--scenarios", nargs="+", help="Only profile these scenarios (e.g. matmul).")
+    parser.add_argument("--run_id", help="Run index passed to the scenarios (--run_idx).")
+    parser.add_argument("--python", nargs="+", default=["python3"], help="Interpreters running the scenarios (e.g. python3.13 python3.13t). Each one must have a different flavor.")
+    parser.add_argument("--schedule", choices=SCHEDULES, default="sequential", help="Run order: manifest order, fully random, or random blocks of one variant with every flavor.")
+    parser.add_argument("--seed", type=int, help="Seed of the random schedules. Defaults to a random seed, which is logged.")
+    parser.add_argument("--target_cpus", type=parse_cpu_list, help="CPUs the scenarios are pinned to (e.g. 2-7).")
+    parser.add_argument("--profiler_cpus", type=parse_cpu_list, help="CPUs the profiler is pinned to (e.g. 0-1).")
+    parser.add_argument("--pin", action="store_true", help="Pin the profiler to one CPU and the scenarios to the others, unless given explicitly.")
+    parser.add_argument("--catalog", default=CATALOG_FILE_PATH, help="Path to the SQLite results catalog.")
+    parser.add_argument("--max_cooldown", type=float, help="Maximum cooldown between profiles in seconds (overrides the manifest).")
+    parser.add_argument("--fixed_cooldown", action="store_true", help="Always wait the maximum cooldown, as the shell runners did.")
+    parser.add_argument("--journal", help="Path to the campaign journal. Defaults to results/journals/campaign_[run<run_id>_]<groups>_<scenarios>_<flavors>.json.")
+    parser.add_argument("--resume", action="store_true", help="Continue the campaign of an existing journal: skip completed runs, retry failed and interrupted ones.")
+    parser.add_argument("--status", action="store_true", help="Only print the status of the campaign journal.")
+    parser.add_argument("--until_confident", action="store_true", help="Repeat each variant until the confidence intervals of --ci_metrics are narrower than --ci_target.")
+    parser.add_argument("--ci_target", type=float, default=0.02, help="Relative half-width of the confidence intervals to reach (e.g. 0.02 for ±2%%).")
+    parser.add_argument("--ci_metrics", nargs="+", choices=CONFIDENCE_METRICS, default=list(CONFIDENCE_METRICS), help="Metrics whose confidence intervals must reach the target.")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the intervals.")
+    parser.add_argument("--min_runs", type=int, default=3, help="Repetitions always profiled per variant and flavor.")
+    parser.add_argument("--max_runs", type=int, default=20, help="Repetitions never exceeded per variant and flavor.")
+    args = parser.parse_args()
+
+    flavors = {python: probe_flavor(python_executable=python) for python in args.python}
+    if len(set(flavors.values())) < len(flavors):
+        logger.error(f"Interpreters must have different flavors to be told apart in the results: {flavors}")
+        exit(1)
+    journal_path = args.journal or default_journal_path(run_id=args.run_id, groups=args.groups, scenarios=args.scenarios, flavors=list(flavors.values()), resume=args.resume or args.status)
+    journal = CampaignJournal(journal_path=journal_path)
+    if args.status:
+        log_status(journal)
+        exit(0)
+    if journal.exists and not args.resume:
+        logger.error(f"A campaign journal already exists at {journal.journal_path}. Pass --resume to continue it or use another --journal/--run_id.")
+        exit(1)
+
+    manifest = load_manifest(manifest_path=args.manifest)
+    runs = expand_runs(manifest=manifest, groups=args.groups, scenarios=args.scenarios)
+    if not runs:
+        logger.error(f"No runs selected from {args.manifest}")
+        exit(1)
+    logger.info("Profiling with " + ", ".join(f"{python} ({flavor})" for python, flavor in flavors.items()))
+    runs = [{**run, "python": python, "flavor": flavor, "run_id": args.run_id} for run in runs for python, flavor in flavors.items()]
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    # A resumed campaign keeps its schedule, so the runs left keep their place
+    recorded = journal.settings
+    if args.resume and recorded.get("seed") is not None:
+        if args.seed is not None and args.seed != recorded["seed"]:
+            logger.warning(f"Resuming with the seed of the campaign ({recorded['seed']}), not {args.seed}")
+        if recorded.get("schedule", args.schedule) != args.schedule:
+            logger.warning(f"The campaign was scheduled '{recorded['schedule']}', resuming it '{args.schedule}'")
+        seed = recorded["seed"]
+    journal.record_settings(schedule=args.schedule, seed=seed)
+    if args.schedule != "sequential":
+        logger.info(f"Schedule '{args.schedule}' with seed {seed}")
+    runs = schedule_runs(runs=runs, schedule=args.schedule, seed=seed)
+    target_cpus, profiler_cpus = split_cpus(target_cpus=args.target_cpus, profiler_cpus=args.profiler_cpus, pin=args.pin)
+
+    cooldown_settings = dict(manifest.get("cooldown", {}))
+    baseline_duration = cooldown_settings.pop("baseline_duration", 10.0)
+    if args.max_cooldown is not None:
+        cooldown_settings["max_wait"] = args.max_cooldown
+    cooldown = AdaptiveCooldown(**cooldown_settings)
+    try:
+        # A fixed cooldown has no baseline to wait for
+        if not args.fixed_cooldown:
+            cooldown.measure_baseline(duration=baseline_duration)
+        campaign = Campaign(runs=runs, cooldown=cooldown, journal=journal, catalog_path=args.catalog, target_cpus=target_cpus, profiler_cpus=profiler_cpus)
+        if args.until_confident:
+            campaign.run_until_confident(tracker=ConfidenceTracker(target=args.ci_target, min_runs=args.min_runs, max_runs=args.max_runs, metrics=args.ci_metrics, confidence=args.confidence))
+        else:
+            campaign.run()
+    finally:
+        cooldown.close()
@@ -0,0 +1,74 @@
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence
+import json
+import os
+
+# Manifest shipped with the orchestrator, mirroring the scenarios' run_profiler.sh sweeps
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "manifest.json")
+
+
+def load_manifest(manifest_path: str = DEFAULT_MANIFEST_PATH) -> Dict[str, Any]:
+    """
+    Load a campaign manifest.
+
+    The manifest holds the "cooldown" settings and a list of "scenarios", each with its
+    "group", "scenario" name, "module" to run, fixed "parameters" and the "sweep" of
+    parameter values to profile. Its "task_label" (start_<label>/finish_<label> tags)
+    defaults to the scenario name.
+
+    Args:
+        manifest_path (str): Path to the JSON manifest.
+
+    Returns:
+        Dict[str, Any]: Parsed manifest.
+    """
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    for idx, scenario in enumerate(manifest.get("scenarios", [])):
+        missing = [key for key in ("group", "scenario", "module") if key not in scenario]
+        if missing:
+            raise ValueError(f"Scenario #{idx} of {manifest_path} is missing: {missing}")
+    return manifest
+
+
+def expand_runs(manifest: Dict[str, Any], groups: Optional[Sequence[str]] = None, scenarios: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Expand the manifest sweeps into the list of runs to profile, in manifest order.
+
+    Args:
+        manifest (Dict[str, Any]): Parsed manifest.
+        groups (Sequence[str], optional): Only keep scenarios of these groups.
+        scenarios (Sequence[str], optional): Only keep these scenarios.
+
+    Returns:
+        List[Dict[str, Any]]: Runs with their "group", "scenario", "task_label", "module" and full "parameters".
+    """
+    runs = []
+    for entry in manifest.get("scenarios", []):
+        if groups and entry["group"] not in groups:
+            continue
+        if scenarios and entry["scenario"] not in scenarios:
+            continue
+        sweep = entry.get("sweep", {})
+        names = list(sweep)
+        # Cartesian product of the swept values, last parameter varying fastest
+        for values in product(*(sweep[name] for name in names)):
+            parameters = {**entry.get("parameters", {}), **dict(zip(names, values))}
+            runs.append({"group": entry["group"], "scenario": entry["scenario"], "task_label": entry.get("task_label", entry["scenario"]), "module": entry["module"], "parameters": parameters})
+    return runs
+
+
+def script_args(parameters: Dict[str, Any]) -> List[str]:
+    """
+    Build the command line arguments of a scenario from its parameters.
+
+    Args:
+        parameters (Dict[str, Any]): Parameters of the run.
+
+    Returns:
+        List[str]: Arguments as "--name value" pairs.
+    """
+    args = []
+    for name, value in parameters.items():
+        args += [f"--{name}", str(value)]
+    return args
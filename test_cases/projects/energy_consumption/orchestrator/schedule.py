@@ -0,0 +1,47 @@
+from random import Random
+from typing import Any, Dict, List, Optional
+import json
+
+# Run orders: manifest order, fully shuffled, or shuffled blocks of one (scenario, variant) with every flavor
+SCHEDULES = ("sequential", "random", "blocked")
+
+
+def schedule_runs(runs: List[Dict[str, Any]], schedule: str = "sequential", seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Order the runs of a campaign.
+
+    Running every variant of a scenario back to back, and each flavor in its own campaign,
+    turns slow drifts (thermals, background load) into fake differences between variants
+    and flavors. Shuffling spreads the drift over all of them instead. The "blocked" order
+    keeps the flavors of a (scenario, variant) next to each other, in random order, so they
+    are compared under the same conditions, and shuffles the blocks.
+
+    Args:
+        runs (List[Dict[str, Any]]): Runs in manifest order, with their "flavor".
+        schedule (str): "sequential", "random" or "blocked". Defaults to "sequential".
+        seed (int, optional): Seed of the shuffle. The same seed gives the same order, so a resumed campaign keeps it.
+
+    Returns:
+        List[Dict[str, Any]]: The runs in execution order, each with its "position".
+    """
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unsupported schedule: {schedule}")
+    rng = Random(seed)
+
+    if schedule == "sequential":
+        ordered = list(runs)
+    elif schedule == "random":
+        ordered = list(runs)
+        rng.shuffle(ordered)
+    else:
+        blocks: Dict[str, List[Dict[str, Any]]] = {}
+        for run in runs:
+            blocks.setdefault(f"{run['scenario']}|{json.dumps(run['parameters'], sort_keys=True)}", []).append(run)
+        block_list = list(blocks.values())
+        rng.shuffle(block_list)
+        ordered = []
+        for block in block_list:
+            rng.shuffle(block)
+            ordered.extend(block)
+
+    return [{**run, "position": position} for position, run in enumerate(ordered)]
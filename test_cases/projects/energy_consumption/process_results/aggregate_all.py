@@ -27,6 +27,33 @@ def scenario_from_filename(filename: str) -> str:
 def collect_rows(pattern: str) -> List[Dict]:
     rows: List[Dict] = []
 
+    def read_summary(path: str, scenario: str) -> None:
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames:
+                return
+            variant_col = reader.fieldnames[0]
+            for row in reader:
+                try:
+                    rows.append(
+                        {
+                            "scenario": scenario,
+                            "flavor": row.get("flavor", detect_flavor(path)),
+                            "variant_type": variant_col,
+                            "variant_value": row.get(variant_col, ""),
+                            "uptime": row.get("uptime", ""),
+                            "cpu_usage": row.get("cpu_usage", ""),
+                            "energy_delta": row.get("energy_delta", ""),
+                            "power_avg": row.get("power_avg", ""),
+                            "vms": row.get("vms", ""),
+                            "ram": row.get("ram", ""),
+                            "cores_disparity": row.get("cores_disparity", ""),
+                        }
+                    )
+                except Exception as excep:
+                    logger.warning(f"Skipping row in {path}: {excep}")
+                    continue
+
     def process_paths(paths: List[str]) -> None:
         for path in paths:
             # Skip helper artifacts
@@ -36,31 +63,7 @@ def collect_rows(pattern: str) -> List[Dict]:
             base = os.path.basename(path)
             if path.endswith("_cv.csv") or "_summary_gil" in base or "_summary_nogil" in base:
                 continue
-            with open(path, newline="") as f:
-                reader = csv.DictReader(f)
-                if not reader.fieldnames:
-                    continue
-                variant_col = reader.fieldnames[0]
-                for row in reader:
-                    try:
-                        rows.append(
-                            {
-                                "scenario": scenario_from_filename(path),
-                                "flavor": row.get("flavor", detect_flavor(path)),
-                                "variant_type": variant_col,
-                                "variant_value": row.get(variant_col, ""),
-                                "uptime": row.get("uptime", ""),
-                                "cpu_usage": row.get("cpu_usage", ""),
-                                "energy_delta": row.get("energy_delta", ""),
-                                "power_avg": row.get("power_avg", ""),
-                                "vms": row.get("vms", ""),
-                                "ram": row.get("ram", ""),
-                                "cores_disparity": row.get("cores_disparity", ""),
-                            }
-                        )
-                    except Exception as excep:
-                        logger.warning(f"Skipping row in {path}: {excep}")
-                        continue
+            read_summary(path=path, scenario=scenario_from_filename(path))
 
     paths = glob.glob(pattern, recursive=True)
     process_paths(paths)
@@ -0,0 +1,137 @@
+from statistics import NormalDist
+from typing import Optional, Tuple
+
+import numpy as np
+
+BOOTSTRAP_METHODS = ("bca", "percentile")
+
+# Vectorized standard normal helpers (scipy is not a dependency)
+_normal_cdf = np.vectorize(NormalDist().cdf, otypes=[float])
+_normal_ppf = np.vectorize(NormalDist().inv_cdf, otypes=[float])
+
+
+def _resample_means(values: np.ndarray, valid: np.ndarray, group_sizes: np.ndarray, n_resamples: int, rng: np.random.Generator, batch_size: int) -> np.ndarray:
+    """
+    Draw bootstrap means for every group and metric at once.
+
+    Each resample of a group is encoded as the number of times each of its rows was
+    drawn, so the resampled sums of all metrics are a single batched matrix product.
+
+    Returns:
+        np.ndarray: Bootstrap means with shape (groups, n_resamples, metrics).
+    """
+    num_groups, max_rows, _ = values.shape
+    # A group of n rows draws n times; draws past its size are discarded
+    draw_weights = (np.arange(max_rows)[None, None, :] < group_sizes[:, None, None]).astype(float)
+    valid_weights = valid.astype(float)
+
+    batches = []
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        draws = rng.integers(0, np.maximum(group_sizes, 1)[:, None, None], size=(num_groups, size, max_rows))
+        # Flat bin of every draw: (group, resample, row)
+        bins = (np.arange(num_groups * size).reshape(num_groups, size, 1) * max_rows + draws).ravel()
+        weights = np.broadcast_to(draw_weights, draws.shape).ravel()
+        counts = np.bincount(bins, weights=weights, minlength=num_groups * size * max_rows).reshape(num_groups, size, max_rows)
+        sums = counts @ values
+        used = counts @ valid_weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            batches.append(sums / used)
+    return np.concatenate(batches, axis=1)
+
+
+def _jackknife_acceleration(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Acceleration constant of the BCa interval, from leave-one-out means.
+
+    Returns:
+        np.ndarray: Acceleration with shape (groups, metrics).
+    """
+    totals = values.sum(axis=1, keepdims=True)
+    counts = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        leave_one_out = np.where(valid & (counts > 1), (totals - values) / (counts - 1), np.nan)
+    num_estimates = np.isfinite(leave_one_out).sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        deviations = np.nansum(leave_one_out, axis=1, keepdims=True) / num_estimates - leave_one_out
+    numerator = np.nansum(deviations ** 3, axis=1)
+    denominator = 6 * np.nansum(deviations ** 2, axis=1) ** 1.5
+    with np.errstate(invalid="ignore", divide="ignore"):
+        acceleration = np.where(denominator > 0, numerator / denominator, 0.0)
+    return acceleration
+
+
+def _take_quantiles(sorted_boot: np.ndarray, num_finite: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    Pick per-element quantiles from bootstrap distributions sorted along axis 1.
+    """
+    positions = np.clip(np.round(alphas * (num_finite - 1)), 0, np.maximum(num_finite - 1, 0)).astype(int)
+    picked = np.take_along_axis(sorted_boot, positions[:, None, :], axis=1)[:, 0, :]
+    return np.where(num_finite > 0, picked, np.nan)
+
+
+def bootstrap_mean_intervals(samples: np.ndarray, n_resamples: int = 10000, confidence: float = 0.95, method: str = "bca", seed: Optional[int] = 0, batch_size: int = 2000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bootstrap confidence intervals of the mean for several groups and metrics at once.
+
+    Groups can hold a different number of samples: shorter groups are padded with
+    NaN rows, anywhere in the group. NaN cells (missing values of one metric) are ignored by the mean.
+
+    Args:
+        samples (np.ndarray): Array with shape (groups, rows, metrics).
+        n_resamples (int): Number of bootstrap resamples. Defaults to 10000.
+        confidence (float): Confidence level of the interval. Defaults to 0.95.
+        method (str): "bca" (bias-corrected and accelerated) or "percentile". Defaults to "bca".
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+        batch_size (int): Resamples drawn per batch, bounds the memory used. Defaults to 2000.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Point estimate, lower and upper bounds,
+        each with shape (groups, metrics).
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unsupported bootstrap method: {method}")
+
+    samples = np.asarray(samples, dtype=float)
+    # Rows are real samples when at least one metric was measured
+    real_rows = ~np.isnan(samples).all(axis=2)
+    # Move the real rows of every group to the front (in order), so the resampled row indices stay below the group size
+    order = np.argsort(~real_rows, axis=1, kind="stable")
+    samples = np.take_along_axis(samples, order[:, :, None], axis=1)
+    valid = ~np.isnan(samples)
+    values = np.where(valid, samples, 0.0)
+    group_sizes = real_rows.sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        point = values.sum(axis=1) / valid.sum(axis=1)
+
+    rng = np.random.default_rng(seed)
+    boot = _resample_means(values=values, valid=valid, group_sizes=group_sizes, n_resamples=n_resamples, rng=rng, batch_size=batch_size)
+    num_finite = np.isfinite(boot).sum(axis=1)
+    # NaN resamples are sorted to the end
+    sorted_boot = np.sort(boot, axis=1)
+
+    tail = (1 - confidence) / 2
+    alpha_low = np.full(point.shape, tail)
+    alpha_high = np.full(point.shape, 1 - tail)
+
+    if method == "bca":
+        # Bias correction: share of resamples below the point estimate (ties count half)
+        below = (boot < point[:, None, :]).sum(axis=1)
+        ties = (boot == point[:, None, :]).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            proportion = (below + 0.5 * ties) / num_finite
+        proportion = np.clip(np.nan_to_num(proportion, nan=0.5), 1 / (n_resamples + 1), n_resamples / (n_resamples + 1))
+        z0 = _normal_ppf(proportion)
+        acceleration = _jackknife_acceleration(values=values, valid=valid)
+
+        def adjusted(alpha: np.ndarray) -> np.ndarray:
+            z_alpha = _normal_ppf(alpha)
+            return _normal_cdf(z0 + (z0 + z_alpha) / (1 - acceleration * (z0 + z_alpha)))
+
+        alpha_low = adjusted(alpha_low)
+        alpha_high = adjusted(alpha_high)
+
+    low = _take_quantiles(sorted_boot=sorted_boot, num_finite=num_finite, alphas=alpha_low)
+    high = _take_quantiles(sorted_boot=sorted_boot, num_finite=num_finite, alphas=alpha_high)
+    return point, low, high
@@ -0,0 +1,137 @@
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Metrics compared between factor levels, in output order
+COMPARISON_METRICS = ["uptime", "cpu_usage", "energy_delta", "power_avg", "vms", "ram", "swap", "cores_disparity"]
+
+
+class FactorComparison:
+    """
+    Pairwise comparison of the levels of a factor (interpreter build, allocator
+    setting...) for every metric of a combined summary.
+
+    The summary is pivoted once into a (row, metric, level) tensor where each row
+    is a (run_id, variant) pair. Ratios, differences and log ratios of every
+    baseline/candidate pair are then computed for all metrics at once.
+    """
+
+    def __init__(self, df: pd.DataFrame, variant_column: str, levels: Sequence[str], factor_column: str = "flavor", run_column: str = "run_id", metrics: Optional[Sequence[str]] = None):
+        """
+        Initialize FactorComparison with a combined summary.
+
+        Args:
+            df (pd.DataFrame): Summary with one row per (run, variant, level).
+            variant_column (str): Column with the varying parameter.
+            levels (Sequence[str]): Factor levels to compare, in order. Earlier levels act as baselines.
+            factor_column (str): Column holding the factor level. Defaults to "flavor".
+            run_column (str): Column identifying the run. Defaults to "run_id".
+            metrics (Sequence[str], optional): Metrics to compare. Defaults to COMPARISON_METRICS found in df.
+        """
+        self._variant_column = variant_column
+        self._run_column = run_column
+        self._levels = [str(level) for level in levels]
+        self._metrics = [metric for metric in (metrics or COMPARISON_METRICS) if metric in df.columns]
+
+        # Single pivot: rows are (run, variant), columns are (metric, level)
+        df_levels = df.assign(**{factor_column: df[factor_column].astype(str)})
+        df_levels = df_levels[df_levels[factor_column].isin(self._levels)].drop_duplicates(subset=[run_column, variant_column, factor_column])
+        pivot = df_levels.pivot(index=[run_column, variant_column], columns=factor_column, values=self._metrics)
+        pivot = pivot.reindex(columns=pd.MultiIndex.from_product([self._metrics, self._levels]))
+        self._keys = pivot.index.to_frame(index=False)
+        self._tensor = pivot.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float).reshape(len(pivot), len(self._metrics), len(self._levels))
+
+    @property
+    def levels(self) -> List[str]:
+        """Factor levels compared."""
+        return list(self._levels)
+
+    @property
+    def metrics(self) -> List[str]:
+        """Metrics compared."""
+        return list(self._metrics)
+
+    def pairs(self, baseline: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        Get the (baseline, candidate) pairs to compare.
+
+        Args:
+            baseline (str, optional): When given, only pairs against this level. Otherwise every
+            level is compared against each level listed before it.
+
+        Returns:
+            List[Tuple[str, str]]: Pairs of (baseline, candidate) levels.
+        """
+        if baseline is None:
+            return list(combinations(self._levels, 2))
+        if baseline not in self._levels:
+            raise ValueError(f"Baseline '{baseline}' is not one of the compared levels: {self._levels}")
+        return [(baseline, level) for level in self._levels if level != baseline]
+
+    def compute(self, pairs: List[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+        """
+        Compute the comparison tensors of the given pairs.
+
+        Args:
+            pairs (List[Tuple[str, str]]): Pairs of (baseline, candidate) levels.
+
+        Returns:
+            Dict[str, np.ndarray]: "baseline" and "candidate" values, "ratio" (candidate / baseline),
+            "diff" (absolute difference) and "log_ratio", each with shape (rows, metrics, pairs).
+            Also "present" with shape (rows, pairs): whether both levels were measured for the row.
+        """
+        baseline_idx = np.array([self._levels.index(baseline) for baseline, _ in pairs], dtype=int)
+        candidate_idx = np.array([self._levels.index(candidate) for _, candidate in pairs], dtype=int)
+        baseline_values = self._tensor[:, :, baseline_idx]
+        candidate_values = self._tensor[:, :, candidate_idx]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(baseline_values != 0, candidate_values / baseline_values, np.nan)
+            # Two zeros are considered equal
+            ratio = np.where((baseline_values == 0) & (candidate_values == 0), 1.0, ratio)
+            log_ratio = np.where(ratio > 0, np.log(ratio), np.nan)
+        measured = ~np.isnan(self._tensor).all(axis=1)
+
+        return {
+            "baseline": baseline_values,
+            "candidate": candidate_values,
+            "ratio": ratio,
+            "diff": np.abs(candidate_values - baseline_values),
+            "log_ratio": log_ratio,
+            "present": measured[:, baseline_idx] & measured[:, candidate_idx],
+        }
+
+    def pair_frame(self, baseline: str, candidate: str) -> pd.DataFrame:
+        """
+        Build a per-(run, variant) table comparing two levels.
+
+        Columns per metric are "<metric>_<level>" for the raw values of both levels,
+        "<metric>_ratio_<candidate>_over_<baseline>", "<metric>_diff_<candidate>_minus_<baseline>"
+        and "<metric>_log_ratio_<candidate>_over_<baseline>".
+
+        Args:
+            baseline (str): Baseline level.
+            candidate (str): Candidate level.
+
+        Returns:
+            pd.DataFrame: Comparison rows where both levels were measured. Empty if there are none.
+        """
+        tensors = self.compute(pairs=[(baseline, candidate)])
+        present = tensors["present"][:, 0]
+        if not present.any():
+            return pd.DataFrame()
+
+        columns = {
+            self._variant_column: self._keys[self._variant_column].to_numpy()[present],
+            self._run_column: self._keys[self._run_column].to_numpy()[present],
+        }
+        for metric_idx, metric in enumerate(self._metrics):
+            columns[f"{metric}_{baseline}"] = tensors["baseline"][present, metric_idx, 0]
+            columns[f"{metric}_{candidate}"] = tensors["candidate"][present, metric_idx, 0]
+            columns[f"{metric}_ratio_{candidate}_over_{baseline}"] = tensors["ratio"][present, metric_idx, 0]
+            columns[f"{metric}_diff_{candidate}_minus_{baseline}"] = tensors["diff"][present, metric_idx, 0]
+            columns[f"{metric}_log_ratio_{candidate}_over_{baseline}"] = tensors["log_ratio"][present, metric_idx, 0]
+
+        return pd.DataFrame(columns).sort_values(by=[self._run_column, self._variant_column]).reset_index(drop=True)
@@ -1,8 +1,13 @@
-from typing import List, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import json
 import os
 
 from matplotlib.figure import Figure
 import matplotlib
+# Figures are only written to disk, never shown
+matplotlib.use("Agg")
 matplotlib.rcParams["svg.fonttype"] = "none"
 matplotlib.rcParams["font.family"] = "DejaVu Sans"
 import matplotlib.pyplot as plt
@@ -11,13 +16,16 @@ import pandas as pd
 
 from ....util import create_directory
 
+# File (inside each graphs folder) that keeps the hash of the inputs of every rendered figure
+PLOT_CACHE_FILE_NAME = ".plot_cache.json"
+
 
 class DataPlotter:
     """
     Class to plot graphs based on test data stored in a CSV file.
     """
 
-    def __init__(self, path_file_stats: str, folder_results: str, group_by: Optional[Sequence[str] | str] = None):
+    def __init__(self, path_file_stats: str, folder_results: str, group_by: Optional[Sequence[str] | str] = None, df: Optional[pd.DataFrame] = None):
         """
         Initialize DataPlotter.
 
@@ -25,13 +33,14 @@ class DataPlotter:
             path_file_stats (str): Path to the path with the stats to graph.
             folder_results (str): Folder to store the graphs.
             group_by (str | sequence, optional): Column(s) to group data by for plotting.
+            df (pd.DataFrame, optional): Already loaded stats. When given, the CSV file is not read.
         """
         self._path_file_stats = path_file_stats
         self._file_stats_name = os.path.basename(self._path_file_stats).replace(".csv", "")
         self._folder_results = f"{folder_results}/{self._file_stats_name}"
 
         # DataFrame of the stats
-        self._df = pd.read_csv(path_file_stats)
+        self._df = df if df is not None else pd.read_csv(path_file_stats)
         self._group_by = None
         if group_by:
             if isinstance(group_by, str):
@@ -53,6 +62,23 @@ class DataPlotter:
         """Getter method for accessing self._x"""
         return self._df.columns
 
+    @property
+    def folder_results(self) -> str:
+        """Folder where the graphs of this stats file are stored."""
+        return self._folder_results
+
+    def figure_file_name(self, title: str) -> str:
+        """
+        Name of the PNG file written by plot_lines for a given title.
+
+        Args:
+            title (str): Title of the plot.
+
+        Returns:
+            str: File name of the graph.
+        """
+        return f"{self._file_stats_name}_{title.lower().replace(' ', '_')}.png"
+
     def _save_plot(self, plot: Figure, file_name: str) -> None:
         """
         Save the current plot to an PNG file.
@@ -128,8 +154,11 @@ class DataPlotter:
         # Warm vs cold palettes: warm for gil, cold for nogil; vary per run_id
         warm_palette = ["#ffd700", "#ff0000", "#ff69b4"]  # yellow, red, pink
         cold_palette = ["#1f77b4", "#2ca02c", "#c0c0c0"]  # blue, green, silver
+        # Any other flavor (e.g. 3.13t, 3.14t) gets colors from a shared palette
+        other_palette = ["#9467bd", "#8c564b", "#17becf", "#bcbd22", "#7f7f7f", "#e377c2", "#ff7f0e"]
         warm_idx = 0
         cold_idx = 0
+        other_idx = 0
         marker_cycle = ["o", "s", "D", "^", "v", "P"]
         marker_map: dict[str, str] = {}
         color_map: dict[tuple[str, str], str] = {}
@@ -139,6 +168,7 @@ class DataPlotter:
                 group = group.sort_values(by=x_column)
                 # Determine a marker per run_id (if present)
                 marker = None
+                run_key = None
                 if "run_id" in group.columns:
                     run_key = str(group["run_id"].iloc[0])
                     marker = marker_map.setdefault(run_key, marker_cycle[len(marker_map) % len(marker_cycle)])
@@ -154,6 +184,10 @@ class DataPlotter:
                     if color_key not in color_map:
                         color_map[color_key] = cold_palette[cold_idx % len(cold_palette)]
                         cold_idx += 1
+                elif flavor is not None:
+                    if color_key not in color_map:
+                        color_map[color_key] = other_palette[other_idx % len(other_palette)]
+                        other_idx += 1
                 color = color_map.get(color_key, "#555555")
                 for y in y_columns:
                     plt.plot(
@@ -188,7 +222,7 @@ class DataPlotter:
         plt.title(title, fontsize=18)
         plt.legend(loc="best")
         plt.grid(True)
-        self._save_plot(plt.gcf(), f"{self._file_stats_name}_{title.lower().replace(' ', '_')}.png")
+        self._save_plot(plt.gcf(), self.figure_file_name(title=title))
 
     def plot_bar_graphs(self, x_column: str, y_columns: List[str], title: str):
         """
@@ -227,3 +261,93 @@ class DataPlotter:
 
             title_clean = title.lower().replace(" ", "_")
             self._save_plot(plt.gcf(), f"{self._file_stats_name}_{title_clean}_{name}.png")
+
+
+def _init_plot_worker() -> None:
+    """
+    Make sure every worker process renders with the non-interactive backend.
+    """
+    matplotlib.use("Agg")
+
+
+def _plot_jobs_chunk(df: pd.DataFrame, path_file_stats: str, folder_results: str, group_by: Optional[Sequence[str] | str], jobs: List[Dict[str, Any]]) -> None:
+    """
+    Render a chunk of plot jobs in the current process.
+    """
+    plotter = DataPlotter(path_file_stats=path_file_stats, folder_results=folder_results, group_by=group_by, df=df)
+    for job in jobs:
+        plotter.plot_lines(**job)
+
+
+def _hash_data_frame(df: pd.DataFrame) -> str:
+    """
+    Hash the content (values, index and column names) of a DataFrame.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def _read_plot_cache(cache_path: str) -> Dict[str, str]:
+    try:
+        with open(cache_path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_plot_jobs(df: pd.DataFrame, path_file_stats: str, folder_results: str, jobs: List[Dict[str, Any]], group_by: Optional[Sequence[str] | str] = None, max_workers: Optional[int] = None) -> int:
+    """
+    Render line plots described as data in a process pool.
+
+    Every job is a dictionary with the keyword arguments of DataPlotter.plot_lines.
+    A figure is skipped when it already exists and neither the input data nor
+    its job spec changed since it was rendered.
+
+    Args:
+        df (pd.DataFrame): Already loaded stats to plot.
+        path_file_stats (str): Path of the stats file (used to name the graphs).
+        folder_results (str): Folder to store the graphs.
+        jobs (List[Dict[str, Any]]): plot_lines arguments, one dictionary per figure.
+        group_by (str | sequence, optional): Column(s) to group data by for plotting.
+        max_workers (int, optional): Maximum number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        int: Number of figures rendered.
+    """
+    plotter = DataPlotter(path_file_stats=path_file_stats, folder_results=folder_results, group_by=group_by, df=df)
+    cache_path = os.path.join(plotter.folder_results, PLOT_CACHE_FILE_NAME)
+    cache = _read_plot_cache(cache_path)
+    data_hash = _hash_data_frame(df)
+
+    # Keep only the jobs whose figure is missing or outdated
+    pending_jobs: List[Dict[str, Any]] = []
+    pending_digests: Dict[str, str] = {}
+    for job in jobs:
+        file_name = plotter.figure_file_name(title=job["title"])
+        spec = json.dumps({"job": job, "group_by": group_by}, sort_keys=True, default=str)
+        digest = hashlib.sha256(f"{data_hash}:{spec}".encode()).hexdigest()
+        if cache.get(file_name) == digest and os.path.exists(os.path.join(plotter.folder_results, file_name)):
+            continue
+        pending_jobs.append(job)
+        pending_digests[file_name] = digest
+
+    if not pending_jobs:
+        return 0
+
+    # One chunk per worker so the DataFrame is sent once per process
+    num_workers = max(1, min(max_workers or os.cpu_count() or 1, len(pending_jobs)))
+    chunks = [pending_jobs[idx::num_workers] for idx in range(num_workers)]
+    if num_workers == 1:
+        _plot_jobs_chunk(df, path_file_stats, folder_results, group_by, pending_jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_plot_worker) as executor:
+            futures = [executor.submit(_plot_jobs_chunk, df, path_file_stats, folder_results, group_by, chunk) for chunk in chunks]
+            for future in futures:
+                future.result()
+
+    cache.update(pending_digests)
+    with open(cache_path, "w") as file:
+        json.dump(cache, file, indent=2, sort_keys=True)
+    return len(pending_jobs)
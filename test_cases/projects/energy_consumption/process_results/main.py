@@ -1,33 +1,37 @@
 import argparse
 import glob
-import math
+import json
 import os
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
 from src.client_interface.process_results import FileStats
+from src.const import CATALOG_FILE_PATH
+from src.results_catalog import ResultsCatalog
 from ....util import FileWriterCsv, logger
-from .data_plotter import DataPlotter
+from .bootstrap import BOOTSTRAP_METHODS, bootstrap_mean_intervals
+from .comparison import COMPARISON_METRICS, FactorComparison
+from .data_plotter import render_plot_jobs
+from .scaling import compute_scaling, summarize_scaling
 
 RUN_SUMMARIES_DIRNAME = "summaries"
 RUN_GRAPHS_DIRNAME = "graphs"
 COMBINED_DIRNAME = "combined"
 RATIOS_DIRNAME = "ratios"
+SCALING_DIRNAME = "scaling"
 NORMALIZED_DIRNAME = "normalized"
 
-# Two-sided 95% critical values for Student's t by degrees of freedom
-T_CRITICAL_95 = {
-    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571,
-    6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
-    11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
-    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086,
-    21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060,
-    26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042,
-}
-
-# Filename helpers
+# Factor levels (interpreter builds) compared by default; the first one is the baseline
+DEFAULT_FLAVORS = ["gil", "nogil"]
+
+# Bootstrap settings for the ratio confidence intervals
+BOOTSTRAP_RESAMPLES = 10000
+BOOTSTRAP_SEED = 0
+
+# Filename helpers (legacy --pattern inputs, runs missing from the catalog)
 def _extract_variant(path: str, pattern: str) -> Optional[int]:
     match = re.search(pattern, os.path.basename(path))
     return int(match.group(1)) if match and match.group(1) else None
@@ -38,8 +42,10 @@ def _extract_run_id(path: str) -> Optional[str]:
     return match.group(1) if match else None
 
 
-def _extract_flavor(path: str) -> str:
-    match = re.search(r"_(nogil|gil)_", os.path.basename(path))
+def _extract_flavor(path: str, flavors: Sequence[str] = DEFAULT_FLAVORS) -> str:
+    # longest names first so "3.13t" wins over "3.13"
+    alternatives = "|".join(re.escape(flavor) for flavor in sorted(flavors, key=len, reverse=True))
+    match = re.search(rf"_({alternatives})_", os.path.basename(path))
     if not match:
         raise ValueError(f"Unable to infer flavor from filename: {path}")
     return match.group(1)
@@ -55,11 +61,10 @@ def _run_root_from_output_path(output_path: str) -> str:
     return os.path.abspath(os.path.join(summaries_dir, os.pardir))
 
 
-def _aggregate_file_row(file_stats: FileStats, task_label: str, start_label: str, finish_label: str, variant_regex: str, run_id: Optional[str]) -> List[object]:
+def _aggregate_file_row(entry: Dict[str, Any], task_label: str, start_label: str, finish_label: str) -> List[object]:
     # Pull per-file metrics needed for aggregation
+    file_stats = entry["file_stats"]
     file_path = file_stats._file_path
-    flavor = _extract_flavor(file_path)
-    variant_value = _extract_variant(file_path, variant_regex)
 
     try:
         # keyed by task label
@@ -79,9 +84,9 @@ def _aggregate_file_row(file_stats: FileStats, task_label: str, start_label: str
         raise RuntimeError(f"Failed to process stats from {file_path}") from exc
 
     return [
-        variant_value,
-        flavor,
-        run_id,
+        entry["variant"],
+        entry["flavor"],
+        entry["run_id"],
         uptime,
         cpu_usage, _cv(cpu_usage_std, cpu_usage),
         energy_delta,
@@ -93,25 +98,31 @@ def _aggregate_file_row(file_stats: FileStats, task_label: str, start_label: str
     ]
 
 
-def _generate_run_plots(output_path: str, run_root: str, variant_column: str) -> None:
+def _generate_run_plots(df: pd.DataFrame, output_path: str, run_root: str, variant_column: str) -> None:
     # Quick per-run plots grouped by flavor
     graphs_dir = os.path.join(run_root, RUN_GRAPHS_DIRNAME)
-    plotter = DataPlotter(path_file_stats=output_path, folder_results=graphs_dir, group_by="flavor")
 
     # Basic relationships per run
-    plotter.plot_lines(x_column="uptime", y_columns=["energy_delta"], title="Energy vs Uptime", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column="uptime", y_columns=["power_avg"], title="Power vs Uptime", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column="uptime", y_columns=["cpu_usage"], title="CPU Usage vs Uptime", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column="cpu_usage", y_columns=["energy_delta"], title="Energy vs CPU Usage", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column="cpu_usage", y_columns=["power_avg"], title="Power vs CPU Usage", annotate_variant=True, variant_column=variant_column)
+    jobs = [
+        {"x_column": "uptime", "y_columns": ["energy_delta"], "title": "Energy vs Uptime", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": "uptime", "y_columns": ["power_avg"], "title": "Power vs Uptime", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": "uptime", "y_columns": ["cpu_usage"], "title": "CPU Usage vs Uptime", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": "cpu_usage", "y_columns": ["energy_delta"], "title": "Energy vs CPU Usage", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": "cpu_usage", "y_columns": ["power_avg"], "title": "Power vs CPU Usage", "annotate_variant": True, "variant_column": variant_column},
+    ]
 
     # Variant-based views when available
-    if variant_column in plotter.stats_columns:
-        plotter.plot_lines(x_column=variant_column, y_columns=["energy_delta"], title="Energy vs Variant")
-        plotter.plot_lines(x_column=variant_column, y_columns=["power_avg"], title="Power vs Variant")
-        plotter.plot_lines(x_column=variant_column, y_columns=["cpu_usage"], title="CPU Usage vs Variant")
-        plotter.plot_lines(x_column=variant_column, y_columns=["vms"], title="VMS vs Variant")
-        plotter.plot_lines(x_column=variant_column, y_columns=["ram"], title="RAM vs Variant")
+    if variant_column in df.columns:
+        jobs += [
+            {"x_column": variant_column, "y_columns": ["energy_delta"], "title": "Energy vs Variant"},
+            {"x_column": variant_column, "y_columns": ["power_avg"], "title": "Power vs Variant"},
+            {"x_column": variant_column, "y_columns": ["cpu_usage"], "title": "CPU Usage vs Variant"},
+            {"x_column": variant_column, "y_columns": ["vms"], "title": "VMS vs Variant"},
+            {"x_column": variant_column, "y_columns": ["ram"], "title": "RAM vs Variant"},
+        ]
+
+    rendered = render_plot_jobs(df=df, path_file_stats=output_path, folder_results=graphs_dir, jobs=jobs, group_by="flavor")
+    logger.info(f"Rendered {rendered} of {len(jobs)} per-run graphs (others unchanged)")
 
 
 def stage_collect(pattern: str) -> List[FileStats]:
@@ -123,7 +134,62 @@ def stage_collect(pattern: str) -> List[FileStats]:
     return [FileStats(file_path=p) for p in paths]
 
 
-def stage_aggregate(files_stats: List[FileStats], output_path: str, task_label: str, variant_regex: str, variant_column: str, run_id: Optional[str] = None) -> FileWriterCsv:
+def _parse_parameters(pairs: Sequence[str]) -> Dict[str, Any]:
+    # name=value, the value decoded as JSON when it is one (numbers, booleans) like the catalog stores it
+    parameters = {}
+    for pair in pairs:
+        name, separator, value = pair.partition("=")
+        if not separator:
+            raise ValueError(f"Parameter filters are name=value, got: {pair}")
+        try:
+            parameters[name] = json.loads(value)
+        except json.JSONDecodeError:
+            parameters[name] = value
+    return parameters
+
+
+def stage_collect_catalog(catalog: ResultsCatalog, scenario: str, variant_column: str, flavors: Sequence[str] = DEFAULT_FLAVORS, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    # Indexed lookup of the scenario runs, one query per flavor
+    runs = []
+    for flavor in flavors:
+        runs.extend(catalog.find_runs(scenario=scenario, flavor=flavor, **(parameters or {})))
+    if not runs:
+        logger.warning(f"No runs of scenario '{scenario}' found in the catalog for flavors: {list(flavors)}")
+        return []
+    # Only the variant may differ between the compared runs: every other recorded parameter must match
+    configurations: Dict[str, List[Dict[str, Any]]] = {}
+    for run in runs:
+        fixed = {name: value for name, value in run["parameters"].items() if name != variant_column}
+        configurations.setdefault(json.dumps(fixed, sort_keys=True), []).append(run)
+    if len(configurations) > 1:
+        listed = "; ".join(f"{configuration} ({len(matching)} runs)" for configuration, matching in configurations.items())
+        logger.error(f"Runs of scenario '{scenario}' differ in other parameters than '{variant_column}': {listed}. Select one with --parameters name=value.")
+        return []
+    return [
+        {
+            "file_stats": FileStats(file_path=run["preprocessed_path"]),
+            "flavor": run["flavor"],
+            "run_id": run["run_id"],
+            "variant": run["parameters"].get(variant_column),
+        }
+        for run in runs
+    ]
+
+
+def _entries_from_files(files_stats: List[FileStats], variant_regex: str, flavors: Sequence[str] = DEFAULT_FLAVORS) -> List[Dict[str, Any]]:
+    # Recover the run identity from the filenames
+    return [
+        {
+            "file_stats": file_stats,
+            "flavor": _extract_flavor(file_stats._file_path, flavors),
+            "run_id": _extract_run_id(file_stats._file_path),
+            "variant": _extract_variant(file_stats._file_path, variant_regex),
+        }
+        for file_stats in files_stats
+    ]
+
+
+def stage_aggregate(entries: List[Dict[str, Any]], output_path: str, task_label: str, variant_column: str) -> FileWriterCsv:
     # Build a per-run summary plus normalization and plots
     start_label, finish_label = f"start_{task_label}", f"finish_{task_label}"
 
@@ -132,8 +198,8 @@ def stage_aggregate(files_stats: List[FileStats], output_path: str, task_label:
     # Define output schema and build rows for each input stats file
     columns = [variant_column, "flavor", "run_id", "uptime", "cpu_usage", "cpu_usage_cv", "energy_delta", "power_avg", "vms", "ram", "swap", "cores_disparity"]
     rows = [
-        _aggregate_file_row(file_stats=file_stats, task_label=task_label, start_label=start_label, finish_label=finish_label, variant_regex=variant_regex, run_id=run_id)
-        for file_stats in files_stats
+        _aggregate_file_row(entry=entry, task_label=task_label, start_label=start_label, finish_label=finish_label)
+        for entry in entries
     ]
 
     csv_writer = FileWriterCsv(file_path=output_path)
@@ -147,7 +213,7 @@ def stage_aggregate(files_stats: List[FileStats], output_path: str, task_label:
     # Normalize file and plot per-run views
     _write_normalized(csv_writer.df_data, output_path, variant_column, norm_root=run_root)
 
-    _generate_run_plots(output_path=output_path, run_root=run_root, variant_column=variant_column)
+    _generate_run_plots(df=csv_writer.df_data, output_path=output_path, run_root=run_root, variant_column=variant_column)
 
     return csv_writer
 
@@ -191,95 +257,86 @@ def _write_normalized(df: pd.DataFrame, output_path: str, variant_column: str, n
     return norm_combined
 
 
-def _compute_per_run_ratios(df: pd.DataFrame, variant_column: str) -> pd.DataFrame:
-    # Build a row per (run_id, variant) with nogil/gil ratios, diffs, and logs
-    metric_columns = [col for col in ["uptime", "cpu_usage", "energy_delta", "power_avg", "vms", "ram", "swap", "cores_disparity"] if col in df.columns]
+def _compute_per_run_ratios(comparison: FactorComparison, baseline: str, candidate: str) -> pd.DataFrame:
+    # Build a row per (run_id, variant) with candidate/baseline ratios, diffs, and logs
+    per_run = comparison.pair_frame(baseline=baseline, candidate=candidate)
+    if per_run.empty:
+        logger.warning(f"No {candidate}/{baseline} pairs found to compute per-run ratios.")
+    return per_run
 
-    rows = []
-    for (run_id, variant_value), group in df.groupby(["run_id", variant_column]):
-        gil_row = group[group["flavor"] == "gil"]
-        nogil_row = group[group["flavor"] == "nogil"]
-        if gil_row.empty or nogil_row.empty:
-            continue
-        gil_stats = gil_row.iloc[0]
-        nogil_stats = nogil_row.iloc[0]
-        # anchor identifiers
-        row = {variant_column: variant_value, "run_id": run_id}
-        for metric in metric_columns:
-            # raw values for traceability
-            row[f"{metric}_gil"] = gil_stats[metric]
-            row[f"{metric}_nogil"] = nogil_stats[metric]
-            if gil_stats[metric] == 0 and nogil_stats[metric] == 0:
-                ratio = 1.0
-            else:
-                ratio = (nogil_stats[metric] / gil_stats[metric]) if gil_stats[metric] else None
-            row[f"{metric}_ratio_nogil_over_gil"] = ratio
-            row[f"{metric}_diff_nogil_minus_gil"] = abs(nogil_stats[metric] - gil_stats[metric])
-            row[f"{metric}_log_ratio_nogil_over_gil"] = math.log(ratio) if ratio and ratio > 0 else None
-        rows.append(row)
-
-    if not rows:
-        logger.warning("No nogil/gil pairs found to compute per-run ratios.")
-        return pd.DataFrame()
-
-    return pd.DataFrame(rows).sort_values(by=["run_id", variant_column]).reset_index(drop=True)
-
-def _t_multiplier(sample_count: int) -> float:
-    df = sample_count - 1
-    return T_CRITICAL_95[df]
-
-def _compute_ratio_confidence(per_run_ratios: pd.DataFrame, variant_column: str) -> pd.DataFrame:
-    # Compute geometric mean ratios and 95% CIs in log space, per variant
+
+def _compute_ratio_confidence(per_run_ratios: pd.DataFrame, variant_column: str, baseline: str = DEFAULT_FLAVORS[0], candidate: str = DEFAULT_FLAVORS[1], n_resamples: int = BOOTSTRAP_RESAMPLES, seed: Optional[int] = BOOTSTRAP_SEED, method: str = "bca") -> pd.DataFrame:
+    # Geometric mean ratios and bootstrap 95% CIs in log space, for all variants and metrics at once
+    output_columns = [variant_column, "metric", "ci_low", "ci_high", "geo_mean_ratio", "max_diff"]
+    ratio_suffix = f"_ratio_{candidate}_over_{baseline}"
     metric_columns = [
         column_name
         for column_name in per_run_ratios.columns
-        if column_name.endswith("_ratio_nogil_over_gil") and "_log_" not in column_name
+        if column_name.endswith(ratio_suffix) and "_log_" not in column_name
     ]
-    rows = []
-    for variant_value, group in per_run_ratios.groupby(variant_column):
-        for metric_col in metric_columns:
-            # ignore zeros/negatives
-            log_values = group[metric_col].apply(lambda val: math.log(val) if val and val > 0 else None).dropna()
-            base_metric = metric_col.replace("_ratio_nogil_over_gil", "")
-            diff_col = f"{base_metric}_diff_nogil_minus_gil"
-            max_diff = None
-            if diff_col in group.columns:
-                diff_values = group[diff_col].dropna()
-                if not diff_values.empty:
-                    max_diff = diff_values.abs().max()
-            mean_log = log_values.mean()
-            sd_log = log_values.std(ddof=1) if len(log_values) > 1 else 0.0
-            se_log = sd_log / math.sqrt(len(log_values)) if len(log_values) else 0.0
-            # Student's t adapts to the number of runs
-            t_multiplier = _t_multiplier(len(log_values))
-            ci_low_log = mean_log - t_multiplier * se_log
-            ci_high_log = mean_log + t_multiplier * se_log
-            rows.append(
-                {
-                    variant_column: variant_value,
-                    "metric": base_metric,
-                    "ci_low": math.exp(ci_low_log),
-                    "ci_high": math.exp(ci_high_log),
-                    "geo_mean_ratio": math.exp(mean_log),
-                    "max_diff": max_diff,
-                }
-            )
-    return (
-        pd.DataFrame(rows)[[variant_column, "metric", "ci_low", "ci_high", "geo_mean_ratio", "max_diff"]]
-        .sort_values(by=[variant_column, "metric"])
-        .reset_index(drop=True)
+    if per_run_ratios.empty or not metric_columns:
+        return pd.DataFrame(columns=output_columns)
+    base_metrics = [metric_col[: -len(ratio_suffix)] for metric_col in metric_columns]
+
+    # ignore zeros/negatives
+    ratios = per_run_ratios[metric_columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ratios = np.where(ratios > 0, np.log(ratios), np.nan)
+
+    # (variant, run, metric) tensor padded with NaN where a variant has fewer runs
+    variant_values = per_run_ratios[variant_column]
+    variants, variant_idx = np.unique(variant_values.to_numpy(), return_inverse=True)
+    run_idx = per_run_ratios.groupby(variant_column).cumcount().to_numpy()
+    samples = np.full((len(variants), run_idx.max() + 1, len(metric_columns)), np.nan)
+    samples[variant_idx, run_idx] = log_ratios
+
+    mean_log, ci_low_log, ci_high_log = bootstrap_mean_intervals(samples=samples, n_resamples=n_resamples, method=method, seed=seed)
+
+    diff_columns = [f"{metric}_diff_{candidate}_minus_{baseline}" for metric in base_metrics]
+    max_diff = per_run_ratios.reindex(columns=diff_columns).abs().groupby(variant_values).max().reindex(variants).to_numpy(dtype=float)
+
+    df_confidence = pd.DataFrame(
+        {
+            variant_column: np.repeat(variants, len(base_metrics)),
+            "metric": np.tile(base_metrics, len(variants)),
+            "ci_low": np.exp(ci_low_log).ravel(),
+            "ci_high": np.exp(ci_high_log).ravel(),
+            "geo_mean_ratio": np.exp(mean_log).ravel(),
+            "max_diff": max_diff.ravel(),
+        }
     )
+    return df_confidence[output_columns].sort_values(by=[variant_column, "metric"]).reset_index(drop=True)
 
 
-def _write_ratio_outputs(df_combined: pd.DataFrame, variant_column: str, base_name: str, global_root: str) -> None:
-    # Persist per-run ratios/diffs and their confidence intervals
+def _write_ratio_outputs(df_combined: pd.DataFrame, variant_column: str, base_name: str, global_root: str, flavors: Sequence[str] = DEFAULT_FLAVORS, baseline: Optional[str] = None, n_resamples: int = BOOTSTRAP_RESAMPLES, seed: Optional[int] = BOOTSTRAP_SEED, ci_method: str = "bca") -> None:
+    # Persist per-run ratios/diffs and their confidence intervals for every baseline/candidate pair
     ratios_dir = os.path.join(global_root, RATIOS_DIRNAME)
-    per_run = _compute_per_run_ratios(df=df_combined, variant_column=variant_column)
     os.makedirs(ratios_dir, exist_ok=True)
+    # pivot the combined summary once for all pairs
+    comparison = FactorComparison(df=df_combined, variant_column=variant_column, levels=flavors)
+    for pair_baseline, pair_candidate in comparison.pairs(baseline=baseline):
+        per_run = _compute_per_run_ratios(comparison=comparison, baseline=pair_baseline, candidate=pair_candidate)
+        if per_run.empty:
+            continue
+        _write_pair_ratio_outputs(
+            per_run=per_run,
+            variant_column=variant_column,
+            base_name=base_name,
+            ratios_dir=ratios_dir,
+            baseline=pair_baseline,
+            candidate=pair_candidate,
+            n_resamples=n_resamples,
+            seed=seed,
+            ci_method=ci_method,
+        )
+
+
+def _write_pair_ratio_outputs(per_run: pd.DataFrame, variant_column: str, base_name: str, ratios_dir: str, baseline: str, candidate: str, n_resamples: int, seed: Optional[int], ci_method: str) -> None:
+    # Persist per-run ratios/diffs of one pair and their confidence intervals
+    pair_name = f"{candidate}_over_{baseline}"
     # drop log helpers for CSV
-    ratio_cols = [col for col in per_run.columns if not col.endswith("_log_ratio_nogil_over_gil")]
+    ratio_cols = [col for col in per_run.columns if not col.endswith(f"_log_ratio_{pair_name}")]
     ratios_clean = per_run[ratio_cols].sort_values(by=[variant_column, "run_id"]).reset_index(drop=True)
-    metric_names = ["uptime", "cpu_usage", "energy_delta", "power_avg", "vms", "ram", "swap", "cores_disparity"]
     ordered_cols = [variant_column, "run_id"]
 
     def _cv(series: pd.Series) -> pd.Series:
@@ -288,22 +345,19 @@ def _write_ratio_outputs(df_combined: pd.DataFrame, variant_column: str, base_na
             return pd.Series([None] * len(series), index=series.index)
         return series.std(ddof=1) / mean_val
 
-    for metric in metric_names:
-        gil_col = f"{metric}_gil"
-        nogil_col = f"{metric}_nogil"
-        ratio_col = f"{metric}_ratio_nogil_over_gil"
-        diff_col = f"{metric}_diff_nogil_minus_gil"
+    for metric in COMPARISON_METRICS:
+        baseline_col = f"{metric}_{baseline}"
+        candidate_col = f"{metric}_{candidate}"
+        ratio_col = f"{metric}_ratio_{pair_name}"
+        diff_col = f"{metric}_diff_{candidate}_minus_{baseline}"
         # Include raw values in summary
-        ordered_cols.extend([col_name for col_name in (gil_col, nogil_col) if col_name in ratios_clean.columns])
+        ordered_cols.extend([col_name for col_name in (baseline_col, candidate_col) if col_name in ratios_clean.columns])
         # Add per-variant averages and coefficients of variation for raw values
-        if gil_col in ratios_clean.columns:
-            ratios_clean[f"{gil_col}_avg"] = ratios_clean.groupby(variant_column)[gil_col].transform("mean")
-            ratios_clean[f"{gil_col}_cv"] = ratios_clean.groupby(variant_column)[gil_col].transform(_cv)
-            ordered_cols.extend([f"{gil_col}_avg", f"{gil_col}_cv"])
-        if nogil_col in ratios_clean.columns:
-            ratios_clean[f"{nogil_col}_avg"] = ratios_clean.groupby(variant_column)[nogil_col].transform("mean")
-            ratios_clean[f"{nogil_col}_cv"] = ratios_clean.groupby(variant_column)[nogil_col].transform(_cv)
-            ordered_cols.extend([f"{nogil_col}_avg", f"{nogil_col}_cv"])
+        for raw_col in (baseline_col, candidate_col):
+            if raw_col in ratios_clean.columns:
+                ratios_clean[f"{raw_col}_avg"] = ratios_clean.groupby(variant_column)[raw_col].transform("mean")
+                ratios_clean[f"{raw_col}_cv"] = ratios_clean.groupby(variant_column)[raw_col].transform(_cv)
+                ordered_cols.extend([f"{raw_col}_avg", f"{raw_col}_cv"])
         if ratio_col in ratios_clean.columns:
             # scalar ratio
             ratios_clean[f"{metric}_ratio"] = ratios_clean[ratio_col]
@@ -316,38 +370,82 @@ def _write_ratio_outputs(df_combined: pd.DataFrame, variant_column: str, base_na
                 ordered_cols.append(f"{metric}_diff")
     ratios_output = ratios_clean[ordered_cols]
     ratios_output.to_csv(
-        os.path.join(ratios_dir, f"{os.path.splitext(base_name)[0]}_ratios_nogil_over_gil.csv"),
+        os.path.join(ratios_dir, f"{os.path.splitext(base_name)[0]}_ratios_{pair_name}.csv"),
         index=False,
     )
 
-    ratio_confidence = _compute_ratio_confidence(per_run_ratios=per_run, variant_column=variant_column)
-    metric_order = ["uptime", "cpu_usage", "energy_delta", "power_avg", "vms", "ram", "swap", "cores_disparity"]
-    ratio_confidence["metric"] = pd.Categorical(ratio_confidence["metric"], categories=metric_order, ordered=True)
+    ratio_confidence = _compute_ratio_confidence(
+        per_run_ratios=per_run,
+        variant_column=variant_column,
+        baseline=baseline,
+        candidate=candidate,
+        n_resamples=n_resamples,
+        seed=seed,
+        method=ci_method,
+    )
+    ratio_confidence["metric"] = pd.Categorical(ratio_confidence["metric"], categories=COMPARISON_METRICS, ordered=True)
     ratio_confidence.sort_values(by=[variant_column, "metric"]).reset_index(drop=True).to_csv(
-        os.path.join(ratios_dir, f"{os.path.splitext(base_name)[0]}_ratio_confidence.csv"),
+        os.path.join(ratios_dir, f"{os.path.splitext(base_name)[0]}_ratio_confidence_{pair_name}.csv"),
         index=False,
     )
 
 
-def _plot_combined_graphs(summary_path: str, variant_column: str, global_root: str) -> None:
+def _write_scaling_outputs(df_combined: pd.DataFrame, variant_column: str, base_name: str, global_root: str) -> None:
+    # Speedup/efficiency/energy per worker count against the single-worker runs, plus Amdahl/USL fits per flavor
+    scaling_dir = os.path.join(global_root, SCALING_DIRNAME)
+    os.makedirs(scaling_dir, exist_ok=True)
+    df_scaling = compute_scaling(df=df_combined, workers_column=variant_column)
+    if df_scaling.empty:
+        logger.warning("No single-worker runs found, skipping the scaling analysis.")
+        return
+    df_curve, df_fits = summarize_scaling(df_scaling=df_scaling, workers_column=variant_column)
+
+    base = os.path.splitext(base_name)[0]
+    scaling_path = os.path.join(scaling_dir, f"{base}_scaling.csv")
+    df_scaling.to_csv(scaling_path, index=False)
+    df_curve.to_csv(os.path.join(scaling_dir, f"{base}_scaling_curve.csv"), index=False)
+    df_fits.to_csv(os.path.join(scaling_dir, f"{base}_scaling_fits.csv"), index=False)
+    logger.info(f"Scaling analysis written to {scaling_dir}")
+    for fit in df_fits.to_dict(orient="records"):
+        logger.info(
+            f"[{fit['flavor']}] serial fraction {fit['serial_fraction']:.3f}, contention {fit['contention']:.3f}, "
+            f"coherency {fit['coherency']:.4f}, optimal workers {fit['optimal_workers']:.1f} (peak speedup {fit['peak_speedup']:.2f})"
+        )
+
+    jobs = [
+        {"x_column": variant_column, "y_columns": ["speedup", "speedup_amdahl", "speedup_usl"], "title": "Speedup vs Workers"},
+        {"x_column": variant_column, "y_columns": ["efficiency"], "title": "Parallel Efficiency vs Workers"},
+        {"x_column": variant_column, "y_columns": ["energy_ratio"], "title": "Relative Energy per Work vs Workers"},
+        {"x_column": variant_column, "y_columns": ["edp_ratio"], "title": "Relative EDP vs Workers"},
+    ]
+    rendered = render_plot_jobs(df=df_curve, path_file_stats=scaling_path, folder_results=os.path.join(scaling_dir, RUN_GRAPHS_DIRNAME), jobs=jobs, group_by="flavor")
+    logger.info(f"Rendered {rendered} of {len(jobs)} scaling graphs (others unchanged)")
+
+
+def _plot_combined_graphs(df_combined: pd.DataFrame, summary_path: str, variant_column: str, global_root: str) -> None:
     # Combined plots: one line per (run_id, flavor) for key metric relationships
-    plotter = DataPlotter(
+    # CPU and energy views across uptime/variant dimensions
+    jobs = [
+        {"x_column": "uptime", "y_columns": ["cpu_usage"], "title": "CPU Usage vs Uptime (runs)", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": variant_column, "y_columns": ["cpu_usage"], "title": "CPU Usage vs Variant (runs)"},
+        {"x_column": "cpu_usage", "y_columns": ["energy_delta"], "title": "Energy vs CPU Usage (runs)", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": "cpu_usage", "y_columns": ["power_avg"], "title": "Power vs CPU Usage (runs)", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": "uptime", "y_columns": ["energy_delta"], "title": "Energy vs Uptime (runs)", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": "uptime", "y_columns": ["power_avg"], "title": "Power vs Uptime (runs)", "annotate_variant": True, "variant_column": variant_column},
+        {"x_column": variant_column, "y_columns": ["energy_delta"], "title": "Energy vs Variant (runs)"},
+        {"x_column": variant_column, "y_columns": ["power_avg"], "title": "Power vs Variant (runs)"},
+        {"x_column": variant_column, "y_columns": ["vms"], "title": "VMS vs Variant (runs)"},
+        {"x_column": variant_column, "y_columns": ["ram"], "title": "RAM vs Variant (runs)"},
+        {"x_column": variant_column, "y_columns": ["swap"], "title": "Swap vs Variant (runs)"},
+    ]
+    rendered = render_plot_jobs(
+        df=df_combined,
         path_file_stats=summary_path,
         folder_results=os.path.join(global_root, RUN_GRAPHS_DIRNAME),
+        jobs=jobs,
         group_by=["run_id", "flavor"],
     )
-    # CPU and energy views across uptime/variant dimensions
-    plotter.plot_lines(x_column="uptime", y_columns=["cpu_usage"], title="CPU Usage vs Uptime (runs)", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column=variant_column, y_columns=["cpu_usage"], title="CPU Usage vs Variant (runs)")
-    plotter.plot_lines(x_column="cpu_usage", y_columns=["energy_delta"], title="Energy vs CPU Usage (runs)", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column="cpu_usage", y_columns=["power_avg"], title="Power vs CPU Usage (runs)", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column="uptime", y_columns=["energy_delta"], title="Energy vs Uptime (runs)", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column="uptime", y_columns=["power_avg"], title="Power vs Uptime (runs)", annotate_variant=True, variant_column=variant_column)
-    plotter.plot_lines(x_column=variant_column, y_columns=["energy_delta"], title="Energy vs Variant (runs)")
-    plotter.plot_lines(x_column=variant_column, y_columns=["power_avg"], title="Power vs Variant (runs)")
-    plotter.plot_lines(x_column=variant_column, y_columns=["vms"], title="VMS vs Variant (runs)")
-    plotter.plot_lines(x_column=variant_column, y_columns=["ram"], title="RAM vs Variant (runs)")
-    plotter.plot_lines(x_column=variant_column, y_columns=["swap"], title="Swap vs Variant (runs)")
+    logger.info(f"Rendered {rendered} of {len(jobs)} combined graphs (others unchanged)")
 
 
 def _infer_base_root(output_file: str) -> str:
@@ -363,13 +461,11 @@ def _infer_base_root(output_file: str) -> str:
     return output_dir
 
 
-def _group_files_by_run_id(stats_files: List[FileStats]) -> dict[Optional[str], List[FileStats]]:
-    grouped: dict[Optional[str], List[FileStats]] = {}
-    for file_stats in stats_files:
-        # filenames may or may not contain run id
-        run_id = _extract_run_id(file_stats._file_path)
-        # accumulate per run
-        grouped.setdefault(run_id, []).append(file_stats)
+def _group_entries_by_run_id(entries: List[Dict[str, Any]]) -> dict[Optional[str], List[Dict[str, Any]]]:
+    grouped: dict[Optional[str], List[Dict[str, Any]]] = {}
+    for entry in entries:
+        # runs may or may not have a run id; accumulate per run
+        grouped.setdefault(entry["run_id"], []).append(entry)
     return grouped
 
 
@@ -384,34 +480,62 @@ def _run_summary_output_path(base_root: str, run_id: Optional[str], base_name: s
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Aggregate profiler results for energy consumption experiments.")
-    parser.add_argument("--pattern", required=True, help="Glob pattern to find preprocessed CSV files")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--scenario", help="Scenario whose runs are looked up in the results catalog")
+    inputs.add_argument("--pattern", help="Glob pattern to find preprocessed CSV files (legacy, identity parsed from filenames)")
+    parser.add_argument("--catalog", default=CATALOG_FILE_PATH, help="Path to the SQLite results catalog (read only).")
+    parser.add_argument("--parameters", nargs="+", default=[], help="With --scenario, values of the other parameters of the runs to analyze (name=value), when the catalog holds several configurations.")
     parser.add_argument("--output_file", required=True, help="Path for aggregated CSV output")
     parser.add_argument("--task_label", required=True, help="Task label used in tags (start_<label>, finish_<label>)")
     parser.add_argument("--variant_column", required=True, help="Column name for the varying parameter")
-    parser.add_argument("--variant_regex", help="Regex capture group for variant; defaults to f'{task_label}_(\\d+)_'.")
+    parser.add_argument("--variant_regex", help="Regex capture group for variant with --pattern; defaults to f'{task_label}_(\\d+)_'.")
+    parser.add_argument("--flavors", nargs="+", default=DEFAULT_FLAVORS, help="Flavor names found in the filenames (e.g. 3.13 3.13t 3.14t). Each flavor is compared against the ones listed before it.")
+    parser.add_argument("--baseline", help="Only compare the other flavors against this one.")
+    parser.add_argument("--scaling", action="store_true", help="The variant is a worker count: write speedup, efficiency, energy and Amdahl/USL scaling outputs.")
+    parser.add_argument("--bootstrap_resamples", type=int, default=BOOTSTRAP_RESAMPLES, help="Bootstrap resamples for the ratio confidence intervals.")
+    parser.add_argument("--bootstrap_seed", type=int, default=BOOTSTRAP_SEED, help="Seed of the bootstrap random generator.")
+    parser.add_argument("--ci_method", choices=BOOTSTRAP_METHODS, default="bca", help="Bootstrap confidence interval method.")
     args = parser.parse_args()
 
-    # Build pipeline inputs
-    variant_regex = args.variant_regex or rf"{args.task_label}_(\d+)_"
+    # Build pipeline inputs (the catalog is only written by the profiler)
+    if args.scenario:
+        try:
+            parameters = _parse_parameters(args.parameters)
+        except ValueError as excep:
+            parser.error(str(excep))
+        if args.variant_column in parameters:
+            parser.error(f"--parameters cannot select the variant column '{args.variant_column}'")
+        try:
+            catalog = ResultsCatalog(catalog_path=args.catalog, read_only=True)
+        except FileNotFoundError as excep:
+            logger.error(f"{excep}: profile the scenario first, or use --pattern")
+            exit(1)
+        try:
+            entries = stage_collect_catalog(catalog=catalog, scenario=args.scenario, variant_column=args.variant_column, flavors=args.flavors, parameters=parameters)
+        finally:
+            catalog.close()
+    else:
+        variant_regex = args.variant_regex or rf"{args.task_label}_(\d+)_"
+        entries = _entries_from_files(stage_collect(pattern=args.pattern), variant_regex=variant_regex, flavors=args.flavors)
+    if not entries:
+        exit(1)
 
     # Collect per-run summaries
-    # keyed by inferred run id
-    grouped = _group_files_by_run_id(stage_collect(pattern=args.pattern))
+    # keyed by run id
+    grouped = _group_entries_by_run_id(entries)
     # root that will hold runs/combined folders
     base_root = _infer_base_root(args.output_file)
     os.makedirs(base_root, exist_ok=True)
     base_name = os.path.basename(args.output_file)
     run_results = []
-    for run_id, files in grouped.items():
+    for run_id, run_entries in grouped.items():
         # per-run summary file
         summary_path = _run_summary_output_path(base_root=base_root, run_id=run_id, base_name=base_name)
         aggregated_writer = stage_aggregate(
-            files_stats=files,
+            entries=run_entries,
             output_path=summary_path,
             task_label=args.task_label,
-            variant_regex=variant_regex,
             variant_column=args.variant_column,
-            run_id=run_id,
         )
         # keep in-memory for combined
         run_results.append({"run_id": run_id, "aggregated": aggregated_writer.df_data})
@@ -424,9 +548,22 @@ if __name__ == "__main__":
     os.makedirs(summaries_dir, exist_ok=True)
     combined_summary_path = os.path.join(summaries_dir, base_name)
     combined_writer = FileWriterCsv(file_path=combined_summary_path)
-    combined_writer.set_data_frame(df=df_combined.sort_values(by=["flavor", args.variant_column, "run_id"]).reset_index(drop=True))
+    df_combined_sorted = df_combined.sort_values(by=["flavor", args.variant_column, "run_id"]).reset_index(drop=True)
+    combined_writer.set_data_frame(df=df_combined_sorted)
     combined_writer.write_to_csv()
     logger.info(f"Combined (all runs) summary written to {combined_summary_path}")
     # Ratios/CI outputs and combined plots
-    _write_ratio_outputs(df_combined=df_combined, variant_column=args.variant_column, base_name=base_name, global_root=global_root)
-    _plot_combined_graphs(summary_path=combined_summary_path, variant_column=args.variant_column, global_root=global_root)
+    _write_ratio_outputs(
+        df_combined=df_combined,
+        variant_column=args.variant_column,
+        base_name=base_name,
+        global_root=global_root,
+        flavors=args.flavors,
+        baseline=args.baseline,
+        n_resamples=args.bootstrap_resamples,
+        seed=args.bootstrap_seed,
+        ci_method=args.ci_method,
+    )
+    if args.scaling:
+        _write_scaling_outputs(df_combined=df_combined_sorted, variant_column=args.variant_column, base_name=base_name, global_root=global_root)
+    _plot_combined_graphs(df_combined=df_combined_sorted, summary_path=combined_summary_path, variant_column=args.variant_column, global_root=global_root)
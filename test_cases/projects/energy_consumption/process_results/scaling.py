@@ -0,0 +1,195 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Worker count every sweep is compared against
+BASELINE_WORKERS = 1
+
+
+def _padded_points(df: pd.DataFrame, group_columns: Sequence[str], x_column: str, y_column: str) -> tuple:
+    """
+    Arrange the (x, y) points of every group in NaN-padded (groups, points) arrays.
+
+    Returns:
+        tuple: Group keys (DataFrame), x values and y values.
+    """
+    df_points = df.dropna(subset=[x_column, y_column])
+    keys, group_idx = np.unique(df_points[list(group_columns)].astype(str).agg("\x1f".join, axis=1).to_numpy(), return_inverse=True)
+    point_idx = df_points.groupby(group_idx).cumcount().to_numpy()
+    num_points = int(point_idx.max()) + 1 if len(point_idx) else 0
+    x_values = np.full((len(keys), num_points), np.nan)
+    y_values = np.full((len(keys), num_points), np.nan)
+    x_values[group_idx, point_idx] = df_points[x_column].to_numpy(dtype=float)
+    y_values[group_idx, point_idx] = df_points[y_column].to_numpy(dtype=float)
+    df_keys = pd.DataFrame([key.split("\x1f") for key in keys], columns=list(group_columns)) if len(keys) else pd.DataFrame(columns=list(group_columns))
+    return df_keys, x_values, y_values
+
+
+def usl_speedup(workers: np.ndarray, alpha: np.ndarray, beta: np.ndarray) -> np.ndarray:
+    """
+    Speedup predicted by the Universal Scalability Law, N / (1 + alpha (N - 1) + beta N (N - 1)).
+    Amdahl's law is the case beta = 0, with alpha the serial fraction.
+    """
+    return workers / (1 + alpha * (workers - 1) + beta * workers * (workers - 1))
+
+
+def _r_squared(workers: np.ndarray, speedup: np.ndarray, alpha: np.ndarray, beta: np.ndarray) -> np.ndarray:
+    # Goodness of fit on the speedup scale, NaN points ignored
+    residuals = speedup - usl_speedup(workers, alpha[:, None], beta[:, None])
+    ss_res = np.nansum(residuals ** 2, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ss_tot = np.nansum((speedup - np.nanmean(speedup, axis=1, keepdims=True)) ** 2, axis=1)
+        return np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+
+
+def fit_scaling_models(workers: np.ndarray, speedup: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Fit Amdahl's law and the Universal Scalability Law to several groups at once.
+
+    Both models are linear in their coefficients once written as
+    N / S(N) - 1 = alpha (N - 1) + beta N (N - 1), so every group is solved with
+    batched least squares. Coefficients are kept non-negative: when the full USL
+    solution has a negative coefficient, the best single-coefficient fit is used.
+
+    Args:
+        workers (np.ndarray): Worker counts with shape (groups, points), NaN padded.
+        speedup (np.ndarray): Measured speedups with the same shape.
+
+    Returns:
+        Dict[str, np.ndarray]: Per-group "serial_fraction" and "amdahl_r2" (Amdahl),
+        "contention", "coherency" and "usl_r2" (USL), "optimal_workers" (USL peak,
+        inf when there is no retrograde scaling) and "peak_speedup", each with shape (groups,).
+    """
+    valid = ~(np.isnan(workers) | np.isnan(speedup)) & (speedup > 0)
+    n = np.where(valid, workers, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y = np.where(valid, n / speedup - 1, 0.0)
+    x1 = np.where(valid, n - 1, 0.0)
+    x2 = np.where(valid, n * (n - 1), 0.0)
+
+    s11, s12, s22 = (x1 * x1).sum(axis=1), (x1 * x2).sum(axis=1), (x2 * x2).sum(axis=1)
+    s1y, s2y = (x1 * y).sum(axis=1), (x2 * y).sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Amdahl: single coefficient, bounded to a fraction
+        serial_fraction = np.clip(np.where(s11 > 0, s1y / s11, np.nan), 0, 1)
+
+        # USL candidates: full fit, contention only, coherency only
+        normal_matrix = np.stack([np.stack([s11, s12], axis=-1), np.stack([s12, s22], axis=-1)], axis=-2)
+        full = (np.linalg.pinv(normal_matrix) @ np.stack([s1y, s2y], axis=-1)[..., None])[..., 0]
+        alpha_only = np.stack([np.maximum(np.where(s11 > 0, s1y / s11, 0.0), 0), np.zeros_like(s11)], axis=-1)
+        beta_only = np.stack([np.zeros_like(s22), np.maximum(np.where(s22 > 0, s2y / s22, 0.0), 0)], axis=-1)
+    candidates = np.stack([full, alpha_only, beta_only], axis=1)
+    # Squared error of each candidate in the linearized space
+    fitted = candidates[..., 0, None] * x1[:, None, :] + candidates[..., 1, None] * x2[:, None, :]
+    errors = ((fitted - y[:, None, :]) ** 2 * valid[:, None, :]).sum(axis=2)
+    errors[:, 0] = np.where((full >= 0).all(axis=1), errors[:, 0], np.inf)
+    best = candidates[np.arange(len(candidates)), errors.argmin(axis=1)]
+    contention, coherency = best[:, 0], best[:, 1]
+
+    # Groups with fewer than two worker counts cannot be fitted
+    distinct_counts = np.array([len(np.unique(row[row_valid])) for row, row_valid in zip(workers, valid)])
+    fittable = distinct_counts >= 2
+    serial_fraction = np.where(fittable, serial_fraction, np.nan)
+    contention = np.where(fittable, contention, np.nan)
+    coherency = np.where(fittable, coherency, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        optimal_workers = np.where(coherency > 0, np.sqrt(np.maximum(1 - contention, 0) / coherency), np.inf)
+        peak_speedup = np.where(np.isfinite(optimal_workers), usl_speedup(optimal_workers, contention, coherency), np.where(contention > 0, 1 / contention, np.inf))
+    optimal_workers = np.where(fittable, optimal_workers, np.nan)
+    peak_speedup = np.where(fittable, peak_speedup, np.nan)
+
+    speedup_valid = np.where(valid, speedup, np.nan)
+    return {
+        "serial_fraction": serial_fraction,
+        "amdahl_r2": _r_squared(np.where(valid, workers, np.nan), speedup_valid, serial_fraction, np.zeros_like(serial_fraction)),
+        "contention": contention,
+        "coherency": coherency,
+        "usl_r2": _r_squared(np.where(valid, workers, np.nan), speedup_valid, contention, coherency),
+        "optimal_workers": optimal_workers,
+        "peak_speedup": peak_speedup,
+    }
+
+
+def compute_scaling(df: pd.DataFrame, workers_column: str, group_columns: Sequence[str] = ("flavor",), work_column: Optional[str] = None) -> pd.DataFrame:
+    """
+    Compute the scaling metrics of each run against the single-worker baseline of its group.
+
+    The baseline is the mean uptime and energy of the BASELINE_WORKERS rows of the group,
+    so every run of a sweep is compared against the same reference.
+
+    Args:
+        df (pd.DataFrame): Summary with one row per run, with uptime and energy_delta columns.
+        workers_column (str): Column with the worker count.
+        group_columns (Sequence[str]): Columns identifying a sweep. Defaults to ("flavor",).
+        work_column (str, optional): Column with the amount of work done by the run. When
+            omitted every run is assumed to do the same work (fixed-size sweep).
+
+    Returns:
+        pd.DataFrame: The group, run and worker columns plus speedup, efficiency,
+        energy_per_work, energy_ratio, edp and edp_ratio. Groups without a baseline are dropped.
+    """
+    group_columns = list(group_columns)
+    keep_columns = group_columns + [col for col in ("run_id",) if col in df.columns and col not in group_columns]
+    df_runs = df[keep_columns + [workers_column]].copy()
+    df_runs["uptime"] = pd.to_numeric(df["uptime"], errors="coerce")
+    df_runs["energy_delta"] = pd.to_numeric(df["energy_delta"], errors="coerce")
+    df_runs[workers_column] = pd.to_numeric(df_runs[workers_column], errors="coerce")
+    work = pd.to_numeric(df[work_column], errors="coerce") if work_column else 1.0
+    df_runs["energy_per_work"] = df_runs["energy_delta"] / work
+    df_runs["edp"] = df_runs["energy_delta"] * df_runs["uptime"]
+
+    df_baseline = (
+        df_runs[df_runs[workers_column] == BASELINE_WORKERS]
+        .groupby(group_columns)[["uptime", "energy_per_work", "edp"]]
+        .mean()
+        .add_suffix("_baseline")
+        .reset_index()
+    )
+    df_runs = df_runs.merge(df_baseline, on=group_columns, how="inner")
+
+    df_runs["speedup"] = df_runs["uptime_baseline"] / df_runs["uptime"]
+    df_runs["efficiency"] = df_runs["speedup"] / df_runs[workers_column]
+    df_runs["energy_ratio"] = df_runs["energy_per_work"] / df_runs["energy_per_work_baseline"]
+    df_runs["edp_ratio"] = df_runs["edp"] / df_runs["edp_baseline"]
+    df_runs = df_runs.drop(columns=["uptime_baseline", "energy_per_work_baseline", "edp_baseline"])
+    return df_runs.sort_values(by=group_columns + [workers_column] + keep_columns[len(group_columns):]).reset_index(drop=True)
+
+
+def summarize_scaling(df_scaling: pd.DataFrame, workers_column: str, group_columns: Sequence[str] = ("flavor",)) -> tuple:
+    """
+    Average the scaling metrics per worker count and fit the scaling models per group.
+
+    Args:
+        df_scaling (pd.DataFrame): Per-run scaling metrics from compute_scaling.
+        workers_column (str): Column with the worker count.
+        group_columns (Sequence[str]): Columns identifying a sweep. Defaults to ("flavor",).
+
+    Returns:
+        tuple: Per-(group, worker count) means with the Amdahl and USL predicted speedups,
+        and the per-group fits with the worker counts minimizing energy and EDP.
+    """
+    group_columns = list(group_columns)
+    metrics = ["uptime", "energy_delta", "speedup", "efficiency", "energy_per_work", "energy_ratio", "edp", "edp_ratio"]
+    df_curve = df_scaling.groupby(group_columns + [workers_column])[metrics].mean().reset_index()
+    df_curve[group_columns] = df_curve[group_columns].astype(str)
+
+    # Fit on every run, not only the means
+    df_keys, workers, speedup = _padded_points(df_scaling, group_columns=group_columns, x_column=workers_column, y_column="speedup")
+    df_fits = pd.concat([df_keys, pd.DataFrame(fit_scaling_models(workers=workers, speedup=speedup))], axis=1)
+
+    # Observed sweet spots of the energy metrics
+    for metric in ("energy_per_work", "edp"):
+        best_rows = df_curve.loc[df_curve.groupby(group_columns)[metric].idxmin().dropna()]
+        best = best_rows[group_columns + [workers_column]].rename(columns={workers_column: f"min_{metric}_workers"})
+        df_fits = df_fits.merge(best, on=group_columns, how="left")
+
+    df_curve = df_curve.merge(df_fits[group_columns + ["serial_fraction", "contention", "coherency"]], on=group_columns, how="left") if not df_curve.empty else df_curve
+    if not df_curve.empty:
+        workers_values = df_curve[workers_column].to_numpy(dtype=float)
+        df_curve["speedup_amdahl"] = usl_speedup(workers_values, df_curve["serial_fraction"].to_numpy(dtype=float), 0.0)
+        df_curve["speedup_usl"] = usl_speedup(workers_values, df_curve["contention"].to_numpy(dtype=float), df_curve["coherency"].to_numpy(dtype=float))
+        df_curve = df_curve.drop(columns=["serial_fraction", "contention", "coherency"])
+    return df_curve, df_fits
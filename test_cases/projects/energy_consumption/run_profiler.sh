@@ -2,20 +2,10 @@
 
 set -euo pipefail
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-
 RUN_ID=${1:-$(date +%s)}
 export RUN_ID
 echo "Using RUN_ID=$RUN_ID for profiling outputs"
 
-echo "Running energy consumption scenarios (NumPy)..."
-bash "$SCRIPT_DIR/scenarios/numpy/run_profiler.sh" "$RUN_ID"
-
-echo "Running energy consumption scenarios (Sequential)..."
-bash "$SCRIPT_DIR/scenarios/sequential/run_profiler.sh" "$RUN_ID"
-
-echo "Running energy consumption scenarios (Threaded Objects)..."
-bash "$SCRIPT_DIR/scenarios/threads_objects/run_profiler.sh" "$RUN_ID"
-
-echo "Running energy consumption scenarios (Threaded Numerical)..."
-bash "$SCRIPT_DIR/scenarios/threads_numerical/run_profiler.sh" "$RUN_ID"
+# A single campaign over every group shares one idle baseline for the adaptive cooldown
+echo "Running energy consumption scenarios (NumPy, Sequential, Threaded Objects, Threaded Numerical)..."
+python3 -m test_cases.projects.energy_consumption.orchestrator.main --run_id "$RUN_ID"
@@ -11,7 +11,7 @@ import argparse
 import time
 import numpy as np
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -42,6 +42,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"numpy_vectorized_{length}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="numpy_vectorized", run_id=args.run_idx, flavor=runtime_flavor, length=length)
 
     # Pre-build arrays before profiling to keep measurement focused on vector ops
     array_a, array_b = build_arrays(length)
@@ -11,7 +11,7 @@ import argparse
 import time
 import numpy as np
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -40,6 +40,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"numpy_blas_{size}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="numpy_blas", run_id=args.run_idx, flavor=runtime_flavor, size=size)
 
     # Pre-build data before profiling to keep measurements focused on BLAS
     matrix_a, matrix_b = build_matrices(size)
@@ -11,7 +11,7 @@ import argparse
 import time
 import numpy as np
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -38,6 +38,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"numpy_fft_{length}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="numpy_fft", run_id=args.run_idx, flavor=runtime_flavor, length=length)
 
     # Pre-build data before profiling to keep measurement focused on FFT
     signal = build_signal(length)
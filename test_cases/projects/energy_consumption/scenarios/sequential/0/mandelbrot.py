@@ -10,7 +10,7 @@ Benchmark Steps:
 import argparse
 import time
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 MAX_ITERATIONS = 50
@@ -49,6 +49,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"mandelbrot_{size}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="mandelbrot", run_id=args.run_idx, flavor=runtime_flavor, size=size)
 
     # Precompute coordinates before profiling to focus on iteration work
     x_coords, y_coords = build_grid(size)
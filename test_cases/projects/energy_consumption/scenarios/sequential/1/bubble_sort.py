@@ -11,7 +11,7 @@ import argparse
 import time
 from typing import List
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -43,6 +43,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"bubble_sort_{num_items}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="bubble_sort", run_id=args.run_idx, flavor=runtime_flavor, num_items=num_items)
 
     # Pre-build input before profiling to focus on sort work
     numbers = build_numbers(num_items)
@@ -11,7 +11,7 @@ import argparse
 import time
 from typing import List
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -42,6 +42,8 @@ if __name__ == "__main__":
 
     set_output_filename(filename=f"prime_sieve_{limit}_{runtime_flavor}_{run_suffix}")
 
+    set_run_info(scenario="prime_sieve", run_id=args.run_idx, flavor=runtime_flavor, limit=limit)
+
     time.sleep(3)
 
     set_tag("start_prime_sieve")
@@ -13,7 +13,7 @@ import math
 import time
 from typing import Iterable
 
-from src.client_interface import set_tag, set_output_filename
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -42,6 +42,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"factorial_{num_workers}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="factorial", run_id=args.run_idx, flavor=runtime_flavor, num_workers=num_workers, max_value=max_value)
 
     # Pre-build inputs before profiling
     factorial_inputs = list(range(max_value + 1))
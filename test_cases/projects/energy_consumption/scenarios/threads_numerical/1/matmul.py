@@ -12,7 +12,7 @@ import concurrent.futures
 import time
 from typing import Iterable, List
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -72,6 +72,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"matmul_{num_workers}_{matrix_size}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="matmul", run_id=args.run_idx, flavor=runtime_flavor, num_workers=num_workers, matrix_size=matrix_size)
 
     # Build matrices before profiling to keep measurement focused on multiplication
     left_matrix = build_matrix(matrix_size)
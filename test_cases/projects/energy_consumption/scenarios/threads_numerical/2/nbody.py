@@ -13,7 +13,7 @@ import math
 import time
 from typing import Iterable, List, Tuple
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -142,6 +142,7 @@ if __name__ == "__main__":
     runtime_flavor = runtime_flavor_suffix()
     run_suffix = f"run{args.run_idx}" if args.run_idx else ""
     set_output_filename(filename=f"nbody_{num_workers}_{num_particles}_{num_steps}_{runtime_flavor}_{run_suffix}")
+    set_run_info(scenario="nbody", run_id=args.run_idx, flavor=runtime_flavor, num_workers=num_workers, num_particles=num_particles, num_steps=num_steps)
 
     # Build initial state before profiling to keep measurement focused on simulation
     positions = seed_positions(num_particles)
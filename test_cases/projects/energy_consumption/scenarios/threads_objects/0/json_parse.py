@@ -13,7 +13,7 @@ import json
 import time
 from typing import Iterable, List, Tuple
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -123,6 +123,8 @@ if __name__ == "__main__":
 
     set_output_filename(filename=f"json_parse_{num_workers}_{num_records}_{runtime_flavor}_{run_suffix}")
 
+    set_run_info(scenario="json_parse", run_id=args.run_idx, flavor=runtime_flavor, num_workers=num_workers, num_records=num_records)
+
     # Pre-build payloads
     payloads = build_payloads(num_records)
     time.sleep(3)
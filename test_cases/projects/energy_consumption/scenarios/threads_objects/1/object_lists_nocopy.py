@@ -12,7 +12,7 @@ import concurrent.futures
 import time
 from typing import Iterable, List, Tuple
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 
@@ -76,6 +76,8 @@ if __name__ == "__main__":
 
     set_output_filename(filename=f"object_lists_nocopy_{num_workers}_{num_records}_{runtime_flavor}_{run_suffix}")
 
+    set_run_info(scenario="object_lists_nocopy", run_id=args.run_idx, flavor=runtime_flavor, num_workers=num_workers, num_records=num_records)
+
     # Pre-build shared string list to mutate in place
     records = build_strings(num_records)
     time.sleep(3)
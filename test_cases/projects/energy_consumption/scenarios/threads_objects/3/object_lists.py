@@ -13,7 +13,7 @@ import time
 from dataclasses import dataclass
 from typing import Iterable, List, Tuple
 
-from src.client_interface import set_output_filename, set_tag
+from src.client_interface import set_output_filename, set_run_info, set_tag
 from test_cases.util import runtime_flavor_suffix
 
 @dataclass
@@ -116,6 +116,8 @@ if __name__ == "__main__":
 
     set_output_filename(filename=f"object_lists_{num_workers}_{num_records}_{runtime_flavor}_{run_suffix}")
 
+    set_run_info(scenario="object_lists", run_id=args.run_idx, flavor=runtime_flavor, num_workers=num_workers, num_records=num_records)
+
     # Pre-build objects
     people = build_people(num_records)
     time.sleep(3)
@@ -5,7 +5,7 @@ set -euo pipefail
 # Process both flavors to build a single summary with a flavor column
 SUMMARY_DIR="results/processed"
 mkdir -p "$SUMMARY_DIR"
-python3 -m test_cases.projects.energy_consumption.process_results.main --pattern "results/preprocessed/json_parse_*_stats.csv" --output_file "$SUMMARY_DIR/threads_objects_json_parse_summary.csv" --task_label json_parse --variant_column num_workers
-python3 -m test_cases.projects.energy_consumption.process_results.main --pattern "results/preprocessed/object_lists_nocopy_*_stats.csv" --output_file "$SUMMARY_DIR/threads_objects_object_lists_nocopy_summary.csv" --task_label object_lists --variant_column num_workers --variant_regex "object_lists_nocopy_(\\d+)_"
-python3 -m test_cases.projects.energy_consumption.process_results.main --pattern "results/preprocessed/object_lists_copy_*_stats.csv" --output_file "$SUMMARY_DIR/threads_objects_object_lists_copy_summary.csv" --task_label object_lists --variant_column num_workers --variant_regex "object_lists_copy_(\\d+)_"
-python3 -m test_cases.projects.energy_consumption.process_results.main --pattern "results/preprocessed/object_lists_*_stats.csv" --output_file "$SUMMARY_DIR/threads_objects_object_lists_summary.csv" --task_label object_lists --variant_column num_workers
+python3 -m test_cases.projects.energy_consumption.process_results.main --scenario json_parse --output_file "$SUMMARY_DIR/threads_objects_json_parse_summary.csv" --task_label json_parse --variant_column num_workers --scaling
+python3 -m test_cases.projects.energy_consumption.process_results.main --scenario object_lists_nocopy --output_file "$SUMMARY_DIR/threads_objects_object_lists_nocopy_summary.csv" --task_label object_lists --variant_column num_workers --scaling
+python3 -m test_cases.projects.energy_consumption.process_results.main --scenario object_lists_copy --output_file "$SUMMARY_DIR/threads_objects_object_lists_copy_summary.csv" --task_label object_lists --variant_column num_workers --scaling
+python3 -m test_cases.projects.energy_consumption.process_results.main --scenario object_lists --output_file "$SUMMARY_DIR/threads_objects_object_lists_summary.csv" --task_label object_lists --variant_column num_workers --scaling
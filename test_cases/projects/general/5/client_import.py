@@ -0,0 +1,51 @@
+"""
+This benchmark checks that the client interface stays cheap to import, since every profiled
+program imports it and its cost is part of their startup.
+
+Benchmark Steps:
+1. Import the client interface in fresh interpreters with -X importtime, as a profiled program does.
+2. Fail if the median import time exceeds the budget, or if it imported a module it must not
+   (the logging setup of the profiler, typing, the processes handler...).
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Statement of the profiled programs
+CLIENT_IMPORT = "from src.client_interface import set_tag, set_output_filename, set_run_info, measure"
+# Modules a program must not get from the client interface
+FORBIDDEN_MODULES = ["logging", "typing", "json", "threading", "subprocess", "datetime", "src.util"]
+
+# Use argparse to get the budget from the terminal
+parser = argparse.ArgumentParser(description="Check the import time of the client interface.")
+parser.add_argument("--budget_ms", type=float, default=5.0, help="Maximum median import time in milliseconds")
+parser.add_argument("--repetitions", type=int, default=20, help="Number of fresh interpreters")
+args = parser.parse_args()
+
+# As in a profiled program, with compiled bytecode
+env = {**os.environ, "SYSTEM_PROFILER_ACTIVE": "1"}
+env.pop("PYTHONDONTWRITEBYTECODE", None)
+subprocess.run([sys.executable, "-c", CLIENT_IMPORT], env=env, check=True)
+
+# Import time (cumulative, µs) of the client interface package
+import_times = []
+for _ in range(args.repetitions):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CLIENT_IMPORT], env=env, check=True, capture_output=True, text=True)
+    for line in result.stderr.splitlines():
+        _, cumulative_us, module = line.split("|")
+        if module.strip() == "src.client_interface" and not module.startswith("  "):
+            import_times.append(int(cumulative_us) / 1000)
+median_ms = statistics.median(import_times)
+print(f"Client interface import: median {median_ms:.2f}ms, max {max(import_times):.2f}ms (budget {args.budget_ms:.2f}ms)")
+
+# Modules loaded by the import that a bare interpreter does not load
+check = f"import sys; before = set(sys.modules); {CLIENT_IMPORT}; print(' '.join(sorted(set(sys.modules) - before)))"
+loaded = subprocess.run([sys.executable, "-c", check], env=env, check=True, capture_output=True, text=True).stdout.split()
+print(f"Modules imported: {', '.join(loaded)}")
+
+forbidden = [module for module in loaded if any(module == name or module.startswith(f"{name}.") for name in FORBIDDEN_MODULES)]
+assert not forbidden, f"The client interface imports {forbidden}"
+assert median_ms <= args.budget_ms, f"The client interface takes {median_ms:.2f}ms to import, over the {args.budget_ms:.2f}ms budget"
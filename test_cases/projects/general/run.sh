@@ -27,6 +27,11 @@ python3 -m src.main --file_to_run test_cases.projects.general.4.processes --is_m
 sleep 2
 
 
+# Check the import cost of the client interface
+python3 -m test_cases.projects.general.5.client_import
+sleep 2
+
+
 # Run post-profiling process
 echo "Running post-profiling flow..."
 python3 -m test_cases.projects.general.3.process_results
@@ -0,0 +1,48 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import src.client_interface.main as client_interface
+from src.client_interface import set_tag
+from src.target_agent import FunctionTimer, StackSampler
+
+
+def busy_work(duration: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        total += sum(range(1000))
+    return total
+
+
+@unittest.skipUnless(hasattr(sys, "monitoring"), "sys.monitoring requires Python 3.12+")
+class FunctionTimerAgentThreadsTest(unittest.TestCase):
+    def test_agent_thread_waits_are_not_timed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            listeners = list(client_interface._tag_listeners)
+            timer = FunctionTimer(directory=directory)
+            sampler = StackSampler(directory=directory, interval=0.001)
+            try:
+                timer.start()
+                sampler.start()
+                set_tag("start_work")
+                busy_work(0.3)
+                set_tag("finish_work")
+            finally:
+                sampler.stop()
+                timer.stop()
+                client_interface._tag_listeners[:] = listeners
+            with open(os.path.join(directory, f"{FunctionTimer.NAME}_{os.getpid()}.csv")) as table_file:
+                rows = list(csv.DictReader(table_file))
+
+        functions = {(os.path.basename(row["file"]), row["function"]) for row in rows}
+        self.assertIn((os.path.basename(__file__), "busy_work"), functions)
+        waits = [function for file, function in functions if file == "threading.py" and "wait" in function]
+        self.assertEqual(waits, [])
+
+
+if __name__ == "__main__":
+    unittest.main()